@@ -0,0 +1,58 @@
+"""
+JWT authentication without a user query per request.
+
+Users resolved from a token are kept in a small TTL/LRU cache keyed by user
+id. The receivers in accounts.receivers drop an entry as soon as the user
+is saved (deactivation, password change) or deleted. Other processes pick
+the change up when their entry expires after USER_CACHE_TTL seconds.
+The role comes from the token's ``role`` claim when present.
+"""
+import copy
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .caching import TTLCache
+from .credentials import role_for
+
+user_cache = TTLCache(
+    maxsize=getattr(settings, 'USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'USER_CACHE_TTL', 60),
+)
+
+
+def invalidate_user(user_id):
+    user_cache.delete(str(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = str(user_id)
+        user = user_cache.get(key)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(key, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        # Requests get their own copy, the cached instance is shared between threads.
+        user = copy.copy(user)
+        user.role = validated_token.get('role') or role_for(user.get_username())
+        return user
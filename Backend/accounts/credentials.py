@@ -0,0 +1,73 @@
+"""
+Pre-defined application users, their roles and the in-memory login state.
+
+Only password digests are configured (settings.PREDEFINED_USERS). The first
+successful login of a user in a process checks the digest; the password is
+then kept as an HMAC under a per-process key, so later logins cost one HMAC
+instead of a key derivation. Once a user has logged in, its id, password
+hash and is_active flag are kept in memory, so later logins make no query.
+The receivers in accounts.receivers forget a user as soon as it is saved or
+deleted; other processes reload it once their entry expires after
+USER_CACHE_TTL seconds.
+"""
+import hashlib
+import hmac
+import os
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from .caching import TTLCache
+
+# username -> {'role': ..., 'password': digest}
+PRE_DEFINED_USERS = getattr(settings, 'PREDEFINED_USERS', {})
+
+DEFAULT_ROLE = 'user'
+
+_KEY = os.urandom(32)
+
+
+def _digest(password):
+    return hmac.new(_KEY, (password or '').encode('utf-8'), hashlib.sha256).digest()
+
+
+# HMAC of the last password that matched each user's digest.
+_checked = {}
+
+_verified = TTLCache(
+    maxsize=max(1, len(PRE_DEFINED_USERS)),
+    ttl=getattr(settings, 'USER_CACHE_TTL', 60),
+)
+
+
+def role_for(username):
+    return PRE_DEFINED_USERS.get(username, {}).get('role', DEFAULT_ROLE)
+
+
+def check_password(username, password):
+    info = PRE_DEFINED_USERS.get(username)
+    if info is None:
+        # Same cost as a wrong password for a known user.
+        hashers.make_password(password)
+        return False
+    digest = _digest(password)
+    known = _checked.get(username)
+    if known is not None and hmac.compare_digest(known, digest):
+        return True
+    if not hashers.check_password(password, info['password']):
+        return False
+    _checked[username] = digest
+    return True
+
+
+def verified_user(username):
+    """(user id, password hash, is_active) of a user that already logged in, or None."""
+    return _verified.get(username)
+
+
+def remember_user(user):
+    _verified.set(user.get_username(), (user.pk, user.password, user.is_active))
+
+
+def forget_user(username):
+    _verified.delete(username)
@@ -0,0 +1,14 @@
+"""Drop cached users as soon as they change, see accounts.authentication and accounts.credentials."""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .credentials import forget_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+    forget_user(instance.get_username())
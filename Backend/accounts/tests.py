@@ -1,3 +1,103 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import credentials
+from .authentication import CachedJWTAuthentication, user_cache
+from .throttling import login_limiter
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user('alice', password='secret')
+        token = AccessToken.for_user(self.user)
+        token['role'] = 'manager'
+        self.raw_token = str(token)
+        self.authentication = CachedJWTAuthentication()
+
+    def authenticate(self):
+        return self.authentication.get_user(self.authentication.get_validated_token(self.raw_token))
+
+    def test_user_is_cached_after_the_first_request(self):
+        with self.assertNumQueries(1):
+            first = self.authenticate()
+        with self.assertNumQueries(0):
+            second = self.authenticate()
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertEqual(second.role, 'manager')
+        # Each request gets its own copy of the cached instance.
+        self.assertIsNot(first, second)
+
+    def test_entry_expires_after_the_ttl(self):
+        self.authenticate()
+        later = time.monotonic() + user_cache.ttl + 1
+        with mock.patch('accounts.caching.time.monotonic', return_value=later):
+            with self.assertNumQueries(1):
+                self.authenticate()
+
+    def test_saving_the_user_drops_the_entry(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleting_the_user_drops_the_entry(self):
+        self.authenticate()
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginTests(TestCase):
+    def setUp(self):
+        login_limiter.reset()
+        credentials.forget_user('tester')
+        users = {'tester': {'role': 'stock', 'password': make_password('secret')}}
+        patcher = mock.patch.dict(credentials.PRE_DEFINED_USERS, users)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, username='tester', password='secret', **extra):
+        return self.client.post('/auth/login/', {'username': username, 'password': password}, **extra)
+
+    def test_repeated_login_makes_no_query(self):
+        self.assertEqual(self.login().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user'], {'username': 'tester', 'role': 'stock'})
+
+    def test_wrong_and_unknown_credentials(self):
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+        self.assertEqual(self.login(username='nobody').status_code, 401)
+
+    def test_too_many_attempts(self):
+        for _ in range(login_limiter.capacity):
+            self.assertEqual(self.login(password='wrong').status_code, 401)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_ip_bucket_ignores_forwarded_for(self):
+        for attempt in range(login_limiter.capacity):
+            self.login(username=f'user{attempt}', HTTP_X_FORWARDED_FOR=f'10.0.0.{attempt}')
+        response = self.login(username='someone', HTTP_X_FORWARDED_FOR='10.0.0.99')
+        self.assertEqual(response.status_code, 429)
+
+    def test_inactive_users_are_rejected(self):
+        self.assertEqual(self.login().status_code, 200)
+        user = User.objects.get(username='tester')
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.login().status_code, 401)
+        # Also from the cached credentials.
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(credentials.verified_user('tester')[2], False)
@@ -0,0 +1,53 @@
+"""In-memory token-bucket rate limiting for the login endpoint."""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class TokenBucketLimiter:
+    """
+    One bucket of ``capacity`` tokens per key, refilled at ``rate`` tokens per second.
+    At most ``maxsize`` buckets are kept; the least recently used go first.
+    """
+
+    def __init__(self, capacity, rate, maxsize=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _level(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def consume(self, *keys):
+        """
+        Take one token from every bucket in ``keys``, all or nothing.
+        Returns 0 when allowed, otherwise the seconds to wait.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = {key: self._level(key, now) for key in keys}
+            short = [key for key, level in levels.items() if level < 1]
+            if short:
+                return max((1 - levels[key]) / self.rate for key in short)
+            for key, level in levels.items():
+                self._buckets[key] = (level - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return 0
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# Bursts of LOGIN_RATE_CAPACITY attempts, then one every 60 / LOGIN_RATE_PER_MINUTE seconds.
+login_limiter = TokenBucketLimiter(
+    capacity=getattr(settings, 'LOGIN_RATE_CAPACITY', 5),
+    rate=getattr(settings, 'LOGIN_RATE_PER_MINUTE', 5) / 60,
+)
@@ -5,13 +5,10 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
-
-# Pre-defined user credentials (you can change these)
-PRE_DEFINED_USERS = {
-    'admin': {'password': 'A8$!kWz7pF3qLx2', 'role': 'admin'},
-    'manager': {'password': 'M9#dZp4!uV6hRq8', 'role': 'manager'},
-    'stock': {'password': 'S7&nGt5^eX2bWp9', 'role': 'stock'}
-}
+import math
+from . import credentials
+from .credentials import role_for
+from .throttling import login_limiter
 
 
 @api_view(['POST'])
@@ -19,9 +16,26 @@ PRE_DEFINED_USERS = {
 def login(request):
     username = request.data.get('username')
     password = request.data.get('password')
+    if not isinstance(username, str) or not isinstance(password, str):
+        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    # Rejected before any password check or database work. Keyed on the peer
+    # address, X-Forwarded-For is set by the client and cannot be trusted here.
+    wait = login_limiter.consume(f'user:{username}', f"ip:{request.META.get('REMOTE_ADDR')}")
+    if wait:
+        response = Response({'error': 'Too many login attempts'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
 
     # Check against pre-defined users
-    if username in PRE_DEFINED_USERS and PRE_DEFINED_USERS[username]['password'] == password:
+    if not credentials.check_password(username, password):
+        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    verified = credentials.verified_user(username)
+    if verified is not None:
+        user_id, password_hash, is_active = verified
+        user = User(pk=user_id, username=username, password=password_hash, is_active=is_active)
+    else:
         # Get or create user in database
         user, created = User.objects.get_or_create(
             username=username,
@@ -31,24 +45,30 @@ def login(request):
         if created:
             user.set_password(password)
             user.save()
+        credentials.remember_user(user)
 
-        refresh = RefreshToken.for_user(user)
-        return Response({
-            'user': {
-                'username': user.username,
-                'role': PRE_DEFINED_USERS[username]['role']
-            },
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        })
+    if not user.is_active:
+        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-    return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+    role = role_for(username)
+    refresh = RefreshToken.for_user(user)
+    # Copied into the access token; read back by CachedJWTAuthentication.
+    refresh['role'] = role
+    return Response({
+        'user': {
+            'username': user.username,
+            'role': role
+        },
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user(request):
-    role = PRE_DEFINED_USERS.get(request.user.username, {}).get('role', 'user')
+    # Set from the token by CachedJWTAuthentication.
+    role = getattr(request.user, 'role', None) or role_for(request.user.username)
     return Response({
         'username': request.user.username,
         'role': role
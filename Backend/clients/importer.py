@@ -0,0 +1,224 @@
+"""
+Streaming CSV import of clients with batched upserts.
+
+Rows are validated in memory against the model choices, then written in
+batches: one query finds the existing clients by normalized tax ID, the
+rest is a bulk_update and a bulk_create. Only one batch and a capped list
+of errors are held in memory, whatever the file size. A dry run writes
+nothing, so it also keeps the normalized tax IDs it would have written with
+a hash of their values (not the rows), and a tax ID repeated in a later
+batch is counted as the real import would count it.
+
+A file that is not UTF-8 or not valid CSV stops the import with an
+ImportFileError naming the line. Batches before it are already saved.
+"""
+import csv
+import time
+
+from django.db import transaction
+
+from gestion.normalization import normalize_tax_id
+from .models import Client
+from .signals import client_types_changed
+
+COLUMNS = ('name', 'address', 'tax_identification', 'client_type', 'tax_regime', 'is_resident', 'is_vat_registered')
+UPDATE_FIELDS = list(COLUMNS)
+MAX_REPORTED_ERRORS = 1000
+
+TRUE_VALUES = {'1', 'true', 'yes', 'oui', 'o', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'non', 'n'}
+
+
+class ImportFileError(Exception):
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+
+def _decoded_lines(binary_file):
+    """Decode the file line by line, so an encoding error is reported on its own line."""
+    for number, raw in enumerate(binary_file, start=1):
+        try:
+            yield raw.decode('utf-8-sig' if number == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            raise ImportFileError(number, "Encodage invalide, le fichier doit être en UTF-8.")
+
+
+def read_csv(binary_file, delimiter=','):
+    """Rows of a binary CSV file as dicts keyed by the header row."""
+    reader = csv.DictReader(_decoded_lines(binary_file), delimiter=delimiter)
+    try:
+        yield from reader
+    except csv.Error as exc:
+        raise ImportFileError(reader.reader.line_num, f"CSV invalide: {exc}")
+
+
+def _choice_lookup(choices):
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    return lookup
+
+
+CLIENT_TYPES = _choice_lookup(Client.CLIENT_TYPE_CHOICES)
+TAX_REGIMES = _choice_lookup(Client.TAX_REGIME_CHOICES)
+
+
+def _parse_bool(value, default):
+    value = (value or '').strip().lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def validate_row(row):
+    """Return (cleaned values, None) or (None, {field: message})."""
+    errors = {}
+    name = (row.get('name') or '').strip()
+    if not name:
+        errors['name'] = "Champ obligatoire."
+    elif len(name) > 200:
+        errors['name'] = "200 caractères maximum."
+
+    tax_identification = (row.get('tax_identification') or '').strip()
+    if len(tax_identification) > 50:
+        errors['tax_identification'] = "50 caractères maximum."
+
+    client_type = CLIENT_TYPES.get((row.get('client_type') or '').strip().lower())
+    if client_type is None:
+        errors['client_type'] = f"Type de client invalide: {row.get('client_type')!r}."
+
+    raw_regime = (row.get('tax_regime') or '').strip()
+    tax_regime = TAX_REGIMES.get(raw_regime.lower(), None) if raw_regime else ''
+    if tax_regime is None:
+        errors['tax_regime'] = f"Régime fiscal invalide: {raw_regime!r}."
+
+    flags = {}
+    for field, default in (('is_resident', True), ('is_vat_registered', False)):
+        try:
+            flags[field] = _parse_bool(row.get(field), default)
+        except ValueError:
+            errors[field] = f"Booléen invalide: {row.get(field)!r}."
+
+    if errors:
+        return None, errors
+    return {
+        'name': name,
+        'address': (row.get('address') or '').strip(),
+        'tax_identification': tax_identification,
+        'client_type': client_type,
+        'tax_regime': tax_regime,
+        **flags,
+    }, None
+
+
+class ClientImporter:
+    def __init__(self, batch_size=1000, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.error_count = 0
+        self.errors = []
+        # Dry run only: normalized tax ID -> hash of the values an earlier batch would have written.
+        self._staged = {}
+
+    def _error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        # The last row wins when a file repeats a tax ID.
+        keyed = {}
+        anonymous = []
+        for values in batch:
+            key = normalize_tax_id(values['tax_identification'])
+            if key:
+                keyed[key] = values
+            else:
+                anonymous.append(values)
+
+        with transaction.atomic():
+            existing = {}
+            if keyed:
+                for client in Client.objects.filter(tax_identification_normalized__in=list(keyed)).order_by('id'):
+                    existing.setdefault(client.tax_identification_normalized, client)
+
+            to_update, to_create = [], []
+            updated = 0
+            # bulk_update sends no post_save: client_types_changed is sent instead.
+            type_changes = {}
+            for key, values in keyed.items():
+                client = existing.get(key)
+                row = hash(tuple(values[field] for field in UPDATE_FIELDS))
+                current = self._staged.get(key)
+                if current is None and client is not None:
+                    current = hash(tuple(getattr(client, field) for field in UPDATE_FIELDS))
+                if self.dry_run:
+                    self._staged[key] = row
+                if current is None:
+                    to_create.append(Client(tax_identification_normalized=key, **values))
+                elif current != row:
+                    updated += 1
+                    if client is not None:
+                        type_changes[client.pk] = (client.client_type, values['client_type'])
+                        for field, value in values.items():
+                            setattr(client, field, value)
+                        to_update.append(client)
+                else:
+                    self.unchanged += 1
+            to_create.extend(Client(tax_identification_normalized='', **values) for values in anonymous)
+
+            if not self.dry_run:
+                if to_update:
+                    Client.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=500)
+                    client_types_changed.send(sender=Client, changes=type_changes)
+                if to_create:
+                    Client.objects.bulk_create(to_create, batch_size=500)
+        self.updated += updated
+        self.created += len(to_create)
+
+    def run(self, rows):
+        """Import an iterable of dicts keyed by column name (e.g. a csv.DictReader)."""
+        started = time.perf_counter()
+        batch = []
+        # Line 1 is the header.
+        for line, row in enumerate(rows, start=2):
+            self.rows += 1
+            values, errors = validate_row(row)
+            if errors:
+                self._error(line, errors)
+                continue
+            batch.append(values)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        self._flush(batch)
+        return self.report(time.perf_counter() - started)
+
+    def run_csv(self, binary_file, delimiter=','):
+        """Import a binary CSV file; raises ImportFileError on undecodable or malformed input."""
+        return self.run(read_csv(binary_file, delimiter=delimiter))
+
+    def report(self, elapsed):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'dry_run': self.dry_run,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows / elapsed) if elapsed else None,
+        }
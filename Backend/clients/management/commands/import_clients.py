@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from clients.importer import ClientImporter, ImportFileError
+
+
+class Command(BaseCommand):
+    help = "Import clients from a CSV file, upserting on the normalized tax ID."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--delimiter', default=',')
+        parser.add_argument('--dry-run', action='store_true', help="Validate and count without writing.")
+
+    def handle(self, *args, **options):
+        importer = ClientImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], 'rb') as fh:
+                report = importer.run_csv(fh, delimiter=options['delimiter'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except ImportFileError as exc:
+            raise CommandError(
+                f"line {exc.line}: {exc} ({importer.created} created, {importer.updated} updated before it)"
+            )
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['rows']} rows in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s): "
+            f"{report['created']} created, {report['updated']} updated, "
+            f"{report['unchanged']} unchanged, {report['error_count']} error(s)."
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_alter_client_address'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['name', 'id'], name='clients_name_id_idx'),
+        ),
+    ]
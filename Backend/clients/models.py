@@ -1,5 +1,7 @@
 from django.db import models
 
+from gestion.normalization import normalize_tax_id
+
 
 class Client(models.Model):
     CLIENT_TYPE_CHOICES = [
@@ -19,13 +21,27 @@ class Client(models.Model):
     name = models.CharField(max_length=200)
     address = models.TextField(blank=True)
     tax_identification = models.CharField(max_length=50, blank=True)
+    tax_identification_normalized = models.CharField(max_length=50, blank=True, db_index=True, editable=False)
     client_type = models.CharField(max_length=20, choices=CLIENT_TYPE_CHOICES)
     tax_regime = models.CharField(max_length=20, choices=TAX_REGIME_CHOICES, blank=True)
     is_resident = models.BooleanField(default=True)
     is_vat_registered = models.BooleanField(default=False) #
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='clients_name_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.get_client_type_display()})"
+
+    def save(self, *args, **kwargs):
+        self.tax_identification_normalized = normalize_tax_id(self.tax_identification)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'tax_identification' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'tax_identification_normalized'}
+        super().save(*args, **kwargs)
+
     def is_public_client(self):
         """Check if client is a public entity (government or public entity)"""
         return self.client_type in ['GOVERNMENT', 'PUBLIC_ENTITY']
\ No newline at end of file
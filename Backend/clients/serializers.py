@@ -4,4 +4,10 @@ from .models import Client
 class ClientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Client
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class ClientStatsSerializer(ClientSerializer):
+    order_count = serializers.IntegerField(read_only=True)
+    last_order_date = serializers.DateTimeField(read_only=True)
+    lifetime_total_ttc = serializers.DecimalField(max_digits=14, decimal_places=3, read_only=True)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by clients.importer after a bulk_update, which bypasses Client.save()
+# and post_save. Receivers get ``changes``, {client id: (old type, new type)},
+# and run inside the import transaction.
+client_types_changed = Signal()
@@ -1,3 +1,173 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.models import PurchaseOrder, PurchaseOrderProduct
+from products.models import Product
+from .importer import ClientImporter
+from .models import Client
+
+
+class ClientAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='manager'))
+        self.product = Product.objects.create(name='P', prix_unit=1000)
+
+    def order(self, client, reference, status='DRAFT', quantity=1):
+        order = PurchaseOrder.objects.create(reference=reference, client=client, status=status)
+        PurchaseOrderProduct.objects.create(order=order, product=self.product, quantity=quantity)
+        order.refresh_from_db()
+        return order
+
+
+class ClientBalanceTests(ClientAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = Client.objects.create(name='Société', client_type='COMPANY')
+        self.draft = self.order(self.company, 'BC-1')
+        self.confirmed = self.order(self.company, 'BC-2', status='CONFIRMED', quantity=2)
+        self.delivered = self.order(self.company, 'BC-3', status='DELIVERED')
+        self.cancelled = self.order(self.company, 'BC-4', status='CANCELLED', quantity=5)
+
+    @staticmethod
+    def net(*orders):
+        return sum(order.total_ttc - order.withholding_tax_amount for order in orders)
+
+    def test_statement(self):
+        with self.assertNumQueries(3):
+            data = self.client.get(f'/clients/{self.company.pk}/statement/').data
+        self.assertEqual([order['reference'] for order in data['orders']], ['BC-1', 'BC-2', 'BC-3', 'BC-4'])
+        self.assertEqual(data['by_status']['CANCELLED']['count'], 1)
+        self.assertEqual(data['totals']['count'], 3)
+        self.assertEqual(
+            data['totals']['total_ttc'],
+            self.draft.total_ttc + self.confirmed.total_ttc + self.delivered.total_ttc,
+        )
+        self.assertEqual(data['outstanding'], self.net(self.confirmed, self.delivered))
+
+    def test_statement_of_a_client_without_orders(self):
+        other = Client.objects.create(name='Autre', client_type='INDIVIDUAL')
+        data = self.client.get(f'/clients/{other.pk}/statement/').data
+        self.assertEqual((data['orders'], data['by_status'], data['totals']['count']), ([], {}, 0))
+        self.assertEqual(self.client.get('/clients/999999/statement/').status_code, 404)
+
+    def test_balances(self):
+        government = Client.objects.create(name='Ministère', client_type='GOVERNMENT')
+        paid = self.order(government, 'BC-5', status='PAID')
+        with self.assertNumQueries(1):
+            balances = self.client.get('/clients/balances/').data
+        self.assertEqual([balance['client_name'] for balance in balances], ['Ministère', 'Société'])
+        self.assertEqual(balances[0]['outstanding'], 0)
+        self.assertEqual(balances[0]['totals']['net_to_pay'], self.net(paid))
+        self.assertEqual(balances[1]['outstanding'], self.net(self.confirmed, self.delivered))
+
+
+class ClientStatsTests(ClientAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.alpha = Client.objects.create(name='Alpha', client_type='COMPANY')
+        self.beta = Client.objects.create(name='Beta', client_type='COMPANY')
+        self.gamma = Client.objects.create(name='Gamma', client_type='COMPANY')
+        self.order(self.beta, 'BC-1', quantity=3)
+        self.order(self.beta, 'BC-2')
+        self.order(self.gamma, 'BC-3', quantity=10)
+
+    def names(self, url):
+        names = []
+        while url:
+            page = self.client.get(url).json()
+            names += [client['name'] for client in page['results']]
+            url = page['next']
+        return names
+
+    def test_statistics_in_one_query(self):
+        with self.assertNumQueries(1):
+            results = self.client.get('/clients/?with_stats=1').json()['results']
+        stats = {client['name']: (client['order_count'], client['lifetime_total_ttc']) for client in results}
+        self.assertEqual(stats['Alpha'], (0, '0.000'))
+        self.assertEqual(stats['Beta'][0], 2)
+        self.assertIsNotNone(results[1]['last_order_date'])
+
+    def test_ordering_on_statistics(self):
+        self.assertEqual(self.names('/clients/?with_stats=1&ordering=-order_count&page_size=1'), ['Beta', 'Gamma', 'Alpha'])
+        # Without with_stats too, ties broken on id across pages.
+        Client.objects.create(name='Delta', client_type='COMPANY')
+        self.assertEqual(
+            self.names('/clients/?ordering=lifetime_total_ttc&page_size=1'), ['Alpha', 'Delta', 'Beta', 'Gamma'],
+        )
+        self.assertEqual(self.client.get('/clients/?ordering=address').status_code, 400)
+
+
+class ClientDuplicateTests(ClientAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = Client.objects.create(name='Alpha Services', client_type='COMPANY', tax_identification='1234567/a/m/000')
+        self.second = Client.objects.create(name='Beta', client_type='COMPANY', tax_identification='1234567 A-M.000')
+        self.similar = Client.objects.create(name='STE Gamma Industries SARL', client_type='COMPANY')
+        self.other = Client.objects.create(name='Gamma Industrie', client_type='COMPANY')
+        Client.objects.create(name='Delta', client_type='INDIVIDUAL')
+
+    def test_lookup_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                '/clients/lookup/', {'tax_ids': ['1234567AM000', '999', '-']}, format='json',
+            )
+        results = response.json()['results']
+        self.assertEqual({client['id'] for client in results['1234567AM000']}, {self.first.pk, self.second.pk})
+        self.assertEqual((results['999'], results['-']), ([], []))
+        self.assertEqual(self.client.post('/clients/lookup/', {'tax_ids': []}, format='json').status_code, 400)
+
+    def test_find_duplicates(self):
+        out = StringIO()
+        call_command('find_duplicate_clients', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), [
+            {'ids': [self.first.pk, self.second.pk], 'reasons': ['tax_id']},
+            {'ids': [self.similar.pk, self.other.pk], 'reasons': ['name']},
+        ])
+
+
+class ClientImportTests(ClientAPITestCase):
+    HEADER = 'name,tax_identification,client_type,is_resident\n'
+
+    def upload(self, content, query=''):
+        upload = SimpleUploadedFile('clients.csv', content if isinstance(content, bytes) else content.encode())
+        return self.client.post(f'/clients/import/{query}', {'file': upload}, format='multipart')
+
+    def test_import_creates_and_updates(self):
+        Client.objects.create(name='Alpha', client_type='COMPANY', tax_identification='111/A')
+        data = self.upload(self.HEADER + 'Alpha SA,111a,COMPANY,\nBeta,222,government,non\n,333,COMPANY,\n').json()
+        self.assertEqual((data['rows'], data['created'], data['updated'], data['error_count']), (3, 1, 1, 1))
+        self.assertEqual(data['errors'], [{'line': 4, 'errors': {'name': 'Champ obligatoire.'}}])
+        beta = Client.objects.get(tax_identification_normalized='222')
+        self.assertEqual((beta.client_type, beta.is_resident), ('GOVERNMENT', False))
+        self.assertEqual(Client.objects.get(tax_identification_normalized='111A').name, 'Alpha SA')
+
+    def test_invalid_files_name_the_line(self):
+        response = self.upload(self.HEADER.encode() + b'Alpha,1,COMPANY,\nB\xe9ta,2,COMPANY,\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.json()['line'], response.json()['created']), (3, 0))
+        oversized = 'x' * (csv.field_size_limit() + 1)
+        self.assertEqual(self.upload(f'{self.HEADER}Alpha,1,COMPANY,\n"{oversized}",2,COMPANY,\n').json()['line'], 3)
+        self.assertEqual(self.client.post('/clients/import/').status_code, 400)
 
-# Create your tests here.
+    def test_dry_run_writes_nothing(self):
+        Client.objects.create(name='Alpha', client_type='COMPANY', tax_identification='1')
+        rows = [
+            {'name': 'Alpha', 'tax_identification': '1', 'client_type': 'COMPANY'},
+            {'name': 'Beta', 'tax_identification': '2', 'client_type': 'COMPANY'},
+            {'name': 'Beta', 'tax_identification': '2', 'client_type': 'COMPANY'},
+            {'name': 'Beta SA', 'tax_identification': '2', 'client_type': 'COMPANY'},
+        ]
+        # One row per batch: repeats are counted against what earlier batches would have written.
+        report = ClientImporter(batch_size=1, dry_run=True).run(rows)
+        self.assertEqual((report['created'], report['updated'], report['unchanged']), (1, 1, 2))
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertEqual(ClientImporter(batch_size=1).run(rows)['created'], 1)
+        self.assertEqual(Client.objects.get(tax_identification_normalized='2').name, 'Beta SA')
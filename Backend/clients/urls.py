@@ -1,9 +1,14 @@
 from django.urls import path
-from .views import ClientAPIView, ClientCountAPIView
+from .views import ClientAPIView, ClientCountAPIView, ClientBalancesAPIView, ClientStatementAPIView, \
+    ClientTaxIdLookupAPIView, ClientImportAPIView
 
 urlpatterns = [
     path('', ClientAPIView.as_view(), name='client-list'),
     path('<int:pk>/', ClientAPIView.as_view(), name='client-detail'),
     path('count/', ClientCountAPIView.as_view(), name='client-count'),  # new endpoint
+    path('import/', ClientImportAPIView.as_view(), name='client-import'),
+    path('lookup/', ClientTaxIdLookupAPIView.as_view(), name='client-tax-id-lookup'),
+    path('balances/', ClientBalancesAPIView.as_view(), name='client-balances'),
+    path('<int:pk>/statement/', ClientStatementAPIView.as_view(), name='client-statement'),
 
 ]
\ No newline at end of file
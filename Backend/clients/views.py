@@ -1,21 +1,113 @@
+from decimal import Decimal
+from datetime import datetime, timezone
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Coalesce
 from django.shortcuts import render, get_object_or_404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from gestion.listing import IndexedListMixin
+from gestion.normalization import resolve_tax_ids
+from gestion.serializers import TaxIdLookupSerializer
+from orders.models import PurchaseOrder
+from .importer import ClientImporter, ImportFileError
 from .models import Client
-from .serializers import ClientSerializer
+from .serializers import ClientSerializer, ClientStatsSerializer
 
+# Orders that are owed but not yet paid
+OUTSTANDING_STATUSES = ('CONFIRMED', 'DELIVERED')
+ZERO = Decimal('0.000')
+
+
+def _empty_totals():
+    return {'count': 0, 'total_ttc': ZERO, 'withholding_tax_amount': ZERO, 'net_to_pay': ZERO}
+
+
+def _add_totals(target, row):
+    target['count'] += row['count']
+    target['total_ttc'] += row['total_ttc'] or ZERO
+    target['withholding_tax_amount'] += row['withholding_tax_amount'] or ZERO
+    target['net_to_pay'] += row['net_to_pay']
+
+
+def client_balances(orders):
+    """
+    Group orders by client and status in a single query and return
+    {client_id: {'client_name', 'by_status', 'totals', 'outstanding'}}.
+    """
+    rows = (
+        orders.values('client_id', 'client__name', 'status')
+        .annotate(
+            count=Count('id'),
+            total_ttc=Sum('total_ttc'),
+            withholding_tax_amount=Sum('withholding_tax_amount'),
+        )
+        .order_by()
+    )
+    balances = {}
+    for row in rows:
+        row['net_to_pay'] = (row['total_ttc'] or ZERO) - (row['withholding_tax_amount'] or ZERO)
+        balance = balances.setdefault(row['client_id'], {
+            'client_id': row['client_id'],
+            'client_name': row['client__name'],
+            'by_status': {},
+            'totals': _empty_totals(),
+            'outstanding': ZERO,
+        })
+        status_totals = balance['by_status'].setdefault(row['status'], _empty_totals())
+        _add_totals(status_totals, row)
+        if row['status'] != 'CANCELLED':
+            _add_totals(balance['totals'], row)
+        if row['status'] in OUTSTANDING_STATUSES:
+            balance['outstanding'] += row['net_to_pay']
+    return balances
+
+
+def annotate_order_stats(clients):
+    """Add order_count, last_order_date and lifetime_total_ttc in the same query."""
+    return clients.annotate(
+        order_count=Count('purchaseorder'),
+        last_order_date=Max('purchaseorder__created_at'),
+        lifetime_total_ttc=Coalesce(Sum('purchaseorder__total_ttc'), Value(ZERO)),
+        # Clients without orders sort first instead of breaking the cursor on NULL.
+        last_order_key=Coalesce(Max('purchaseorder__created_at'), Value(datetime(1970, 1, 1, tzinfo=timezone.utc))),
+    )
+
+
+class ClientAPIView(IndexedListMixin, APIView):
+    """
+    Clients by name, ?with_stats=1 adds order statistics; the list can be sorted on them either way.
+    Example: /clients/?with_stats=1&ordering=-lifetime_total_ttc&page_size=100
+    """
+    list_model = Client
+    ordering_fields = {
+        'name': 'name',
+        'order_count': 'order_count',
+        'last_order_date': 'last_order_key',
+        'lifetime_total_ttc': 'lifetime_total_ttc',
+    }
+    # Annotations of annotate_order_stats(): sorting on them scans the orders,
+    # which the statistics need anyway.
+    computed_fields = ('order_count', 'last_order_key', 'lifetime_total_ttc')
+    default_ordering = ('name', 'id')
 
-class ClientAPIView(APIView):
     def get(self, request, pk=None):
+        with_stats = request.query_params.get('with_stats') in ('1', 'true')
+        ordering = (request.query_params.get('ordering') or '').lstrip('-')
+        clients = Client.objects.all()
+        serializer_class = ClientSerializer
+        if with_stats:
+            serializer_class = ClientStatsSerializer
+        if with_stats or self.ordering_fields.get(ordering) in self.computed_fields:
+            clients = annotate_order_stats(clients)
+
         if pk:
-            client = get_object_or_404(Client, pk=pk)
-            serializer = ClientSerializer(client)
+            client = get_object_or_404(clients, pk=pk)
+            serializer = serializer_class(client)
             return Response(serializer.data)
 
-        clients = Client.objects.all()
-        serializer = ClientSerializer(clients, many=True)
-        return Response(serializer.data)
+        return self.list_response(clients, serializer_class)
 
     def post(self, request):
         serializer = ClientSerializer(data=request.data)
@@ -41,4 +133,71 @@ class ClientAPIView(APIView):
 class ClientCountAPIView(APIView):
     def get(self, request):
         total_clients = Client.objects.count()
-        return Response({"total_clients": total_clients})
\ No newline at end of file
+        return Response({"total_clients": total_clients})
+
+
+class ClientBalancesAPIView(APIView):
+    """Totals and outstanding amounts by status for every client with orders."""
+    def get(self, request):
+        balances = client_balances(PurchaseOrder.objects.all())
+        return Response(sorted(balances.values(), key=lambda b: (b['client_name'], b['client_id'])))
+
+
+class ClientStatementAPIView(APIView):
+    """Account statement for one client: status totals and the list of orders."""
+    def get(self, request, pk):
+        client = get_object_or_404(Client, pk=pk)
+        orders = PurchaseOrder.objects.filter(client_id=client.pk)
+        balance = client_balances(orders).get(client.pk) or {
+            'by_status': {}, 'totals': _empty_totals(), 'outstanding': ZERO,
+        }
+        lines = orders.order_by('created_at', 'id').values(
+            'id', 'reference', 'status', 'order_type', 'created_at', 'payment_date',
+            'total_ttc', 'withholding_tax_amount',
+        ).annotate(net_to_pay=F('total_ttc') - F('withholding_tax_amount'))
+        return Response({
+            'client': ClientSerializer(client).data,
+            'by_status': balance['by_status'],
+            'totals': balance['totals'],
+            'outstanding': balance['outstanding'],
+            'orders': list(lines),
+        })
+
+
+class ClientTaxIdLookupAPIView(APIView):
+    """
+    Resolve a batch of tax IDs to existing clients in one query.
+    Example: POST /clients/lookup/ {"tax_ids": ["1234567/A/M/000", ...]}
+    """
+    def post(self, request):
+        serializer = TaxIdLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = resolve_tax_ids(
+            Client.objects.all(), 'tax_identification_normalized',
+            serializer.validated_data['tax_ids'], ('id', 'name', 'tax_identification'),
+        )
+        return Response({"results": results})
+
+
+class ClientImportAPIView(APIView):
+    """
+    Import clients from a CSV upload (multipart field "file"), upserting on the
+    normalized tax ID. Example: POST /clients/import/?dry_run=1
+    """
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Aucun fichier fourni"}, status=status.HTTP_400_BAD_REQUEST)
+        importer = ClientImporter(dry_run=request.query_params.get('dry_run') in ('1', 'true'))
+        try:
+            report = importer.run_csv(upload.file, delimiter=request.query_params.get('delimiter', ',')[:1] or ',')
+        except ImportFileError as exc:
+            return Response({
+                "error": str(exc),
+                "line": exc.line,
+                "created": importer.created,
+                "updated": importer.updated,
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Expiry tracking for company documents.
+
+Queries go through the indexes on CompanyDocument.valid_until. The
+scan_document_expiry command records one DocumentExpiryNotification per
+document, kind and expiry date, so dashboards read that small table
+instead of scanning documents.
+"""
+from datetime import date, timedelta
+
+from .models import CompanyDocument, DocumentExpiryNotification
+
+DEFAULT_DAYS = 30
+EXPIRY_FIELDS = ('id', 'company_id', 'document_type', 'title', 'valid_until')
+
+
+def expiring_documents(days=DEFAULT_DAYS, document_type=None, include_expired=False, today=None):
+    """Documents whose validity ends within ``days`` days, soonest first."""
+    today = today or date.today()
+    documents = CompanyDocument.objects.filter(valid_until__lte=today + timedelta(days=days))
+    if not include_expired:
+        documents = documents.filter(valid_until__gte=today)
+    if document_type:
+        documents = documents.filter(document_type=document_type)
+    return documents.order_by('valid_until', 'id')
+
+
+def expiry_row(values, today):
+    return {**values, 'days_left': (values['valid_until'] - today).days}
+
+
+def _record(batch):
+    """Insert the events of ``batch`` not recorded yet; return how many were new."""
+    recorded = set(
+        DocumentExpiryNotification.objects.filter(document_id__in={event.document_id for event in batch})
+        .values_list('document_id', 'kind', 'valid_until')
+    )
+    new = [event for event in batch if (event.document_id, event.kind, event.valid_until) not in recorded]
+    # A concurrent scan may insert the same events meanwhile: the unique
+    # constraint keeps one row and ignore_conflicts skips the others.
+    DocumentExpiryNotification.objects.bulk_create(new, ignore_conflicts=True)
+    return len(new)
+
+
+def scan(days=DEFAULT_DAYS, today=None, batch_size=500):
+    """Record expiry events for every document expired or expiring within ``days``; return the count created."""
+    today = today or date.today()
+    rows = expiring_documents(days, include_expired=True, today=today).values_list(
+        'id', 'document_type', 'title', 'valid_until',
+    )
+    created = 0
+    batch = []
+    for pk, document_type, title, valid_until in rows.iterator(chunk_size=2000):
+        batch.append(DocumentExpiryNotification(
+            document_id=pk,
+            kind='EXPIRED' if valid_until < today else 'EXPIRING',
+            document_type=document_type,
+            title=title,
+            valid_until=valid_until,
+        ))
+        if len(batch) >= batch_size:
+            created += _record(batch)
+            batch = []
+    if batch:
+        created += _record(batch)
+    return created
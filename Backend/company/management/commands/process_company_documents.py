@@ -0,0 +1,45 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from company import previews
+from company.models import CompanyDocument
+from company.storage import file_digest
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and extract text for queued company documents."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch', type=int, default=200, help="Previews claimed per batch.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new documents.")
+        parser.add_argument('--interval', type=float, default=10.0, help="Seconds between polls with --loop.")
+        parser.add_argument(
+            '--queue-existing', action='store_true',
+            help="Hash and queue every document first (documents uploaded before previews existed).",
+        )
+
+    def handle(self, *args, **options):
+        if options['queue_existing']:
+            for document in CompanyDocument.objects.iterator(chunk_size=500):
+                if not document.sha256 and document.file:
+                    with document.file.open('rb') as content:
+                        document.sha256 = file_digest(content)
+                    document.size = document.file.size
+                    CompanyDocument.objects.filter(pk=document.pk).update(sha256=document.sha256, size=document.size)
+                previews.queue(document)
+
+        total = 0
+        while True:
+            started = time.perf_counter()
+            handled = previews.process_pending(limit=options['batch'], workers=options['workers'])
+            total += handled
+            if handled:
+                self.stdout.write(f"{handled} document(s) processed in {time.perf_counter() - started:.2f}s.")
+            if handled < options['batch']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"{total} document(s) processed."))
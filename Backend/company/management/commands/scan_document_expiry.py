@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from company import expiry
+
+
+class Command(BaseCommand):
+    help = "Record expiry notifications for company documents (run daily)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=expiry.DEFAULT_DAYS,
+                            help="Warn this many days before expiry (default: %(default)s).")
+        parser.add_argument('--date', help="Scan as of this date (YYYY-MM-DD), today by default.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError("Invalid --date, expected YYYY-MM-DD.")
+        if options['days'] < 0:
+            raise CommandError("--days must be positive.")
+        created = expiry.scan(options['days'], today=today)
+        self.stdout.write(self.style.SUCCESS(f"{created} notification(s) recorded."))
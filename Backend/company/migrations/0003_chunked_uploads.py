@@ -0,0 +1,52 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:53
+
+import company.storage
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_alter_companyinfo_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companydocument',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='companydocument',
+            name='size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='companydocument',
+            name='file',
+            field=models.FileField(storage=company.storage.ContentAddressedStorage(), upload_to='company/documents/%Y/%m/%d/', verbose_name='Fichier'),
+        ),
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_type', models.CharField(choices=[('STATUTES', 'Statuts de la société'), ('TAX_CERTIFICATE', 'Attestation fiscale'), ('TRADE_REGISTER', 'Extrait registre de commerce'), ('IDENTITY', 'Pièce d identité du gérant'), ('OTHER', 'Autre document')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('received', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='company.companyinfo')),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='company.companydocument')),
+            ],
+            options={
+                'verbose_name': 'Téléversement en cours',
+                'verbose_name_plural': 'Téléversements en cours',
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0003_chunked_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentExpiryNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('EXPIRING', 'Expire bientôt'), ('EXPIRED', 'Expiré')], max_length=10)),
+                ('document_type', models.CharField(choices=[('STATUTES', 'Statuts de la société'), ('TAX_CERTIFICATE', 'Attestation fiscale'), ('TRADE_REGISTER', 'Extrait registre de commerce'), ('IDENTITY', 'Pièce d identité du gérant'), ('OTHER', 'Autre document')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('valid_until', models.DateField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': "Alerte d'expiration",
+                'verbose_name_plural': "Alertes d'expiration",
+            },
+        ),
+        migrations.AddIndex(
+            model_name='companydocument',
+            index=models.Index(fields=['valid_until'], name='company_doc_valid_until_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companydocument',
+            index=models.Index(fields=['document_type', 'valid_until'], name='company_doc_type_valid_idx'),
+        ),
+        migrations.AddField(
+            model_name='documentexpirynotification',
+            name='document',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiry_notifications', to='company.companydocument'),
+        ),
+        migrations.AddIndex(
+            model_name='documentexpirynotification',
+            index=models.Index(fields=['is_read', 'valid_until'], name='company_expiry_unread_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentexpirynotification',
+            constraint=models.UniqueConstraint(fields=('document', 'kind', 'valid_until'), name='company_expiry_event_uniq'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0004_document_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentPreview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('DONE', 'Terminé'), ('FAILED', 'Échec')], default='PENDING', max_length=10)),
+                ('has_thumbnail', models.BooleanField(default=False)),
+                ('text_length', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Aperçu de document',
+                'verbose_name_plural': 'Aperçus de documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='company.companydocument')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='documentpreview',
+            index=models.Index(fields=['status', 'id'], name='company_preview_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentsearchterm',
+            index=models.Index(fields=['term', 'document'], name='company_term_doc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentsearchterm',
+            constraint=models.UniqueConstraint(fields=('document', 'term'), name='company_search_term_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0005_document_previews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyinfo',
+            name='profile_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
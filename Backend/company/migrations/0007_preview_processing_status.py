@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0006_profile_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentpreview',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'En attente'), ('PROCESSING', 'En cours'), ('DONE', 'Terminé'), ('FAILED', 'Échec')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:36
+
+import company.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0007_preview_processing_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='companydocument',
+            name='file',
+            field=models.FileField(max_length=255, storage=company.storage.ContentAddressedStorage(), upload_to='company/documents/%Y/%m/%d/', verbose_name='Fichier'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.core.validators import RegexValidator
+import uuid
+
+from .storage import content_storage, file_digest
 
 
 class CompanyInfo(models.Model):
@@ -44,6 +47,8 @@ class CompanyInfo(models.Model):
     # Logo and branding
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped whenever the company or one of its documents changes, see company.profile.
+    profile_version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Information de l'entreprise"
@@ -65,7 +70,9 @@ class CompanyDocument(models.Model):
     company = models.ForeignKey(CompanyInfo, on_delete=models.CASCADE, related_name='documents')
     document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPES, verbose_name="Type de document")
     title = models.CharField(max_length=255, verbose_name="Titre du document")
-    file = models.FileField(upload_to='company/documents/%Y/%m/%d/', verbose_name="Fichier")
+    file = models.FileField(upload_to='company/documents/%Y/%m/%d/', storage=content_storage, max_length=255, verbose_name="Fichier")
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
+    size = models.BigIntegerField(null=True, blank=True, editable=False)
     description = models.TextField(blank=True, null=True, verbose_name="Description")
     upload_date = models.DateTimeField(auto_now_add=True)
     valid_until = models.DateField(blank=True, null=True, verbose_name="Valide jusqu'au")
@@ -73,6 +80,115 @@ class CompanyDocument(models.Model):
     class Meta:
         verbose_name = "Document de l'entreprise"
         verbose_name_plural = "Documents de l'entreprise"
+        indexes = [
+            models.Index(fields=['valid_until'], name='company_doc_valid_until_idx'),
+            models.Index(fields=['document_type', 'valid_until'], name='company_doc_type_valid_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.company.name}"
+
+    def save(self, *args, **kwargs):
+        if self.file and not self.file._committed:
+            # The storage names the file after this digest.
+            self.sha256 = file_digest(self.file.file)
+            self.size = self.file.size
+        super().save(*args, **kwargs)
+
+
+class DocumentUpload(models.Model):
+    """A chunked upload in progress, see company.uploads."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    company = models.ForeignKey(CompanyInfo, on_delete=models.CASCADE, related_name='uploads')
+    document_type = models.CharField(max_length=20, choices=CompanyDocument.DOCUMENT_TYPES)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    valid_until = models.DateField(blank=True, null=True)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    document = models.ForeignKey(CompanyDocument, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Téléversement en cours"
+        verbose_name_plural = "Téléversements en cours"
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+class DocumentExpiryNotification(models.Model):
+    """An expiry event recorded by the scan_document_expiry command."""
+    KIND_CHOICES = [
+        ('EXPIRING', 'Expire bientôt'),
+        ('EXPIRED', 'Expiré'),
+    ]
+
+    document = models.ForeignKey(CompanyDocument, on_delete=models.CASCADE, related_name='expiry_notifications')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Copied so the dashboard needs no join and a renewed document raises new events.
+    document_type = models.CharField(max_length=20, choices=CompanyDocument.DOCUMENT_TYPES)
+    title = models.CharField(max_length=255)
+    valid_until = models.DateField()
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Alerte d'expiration"
+        verbose_name_plural = "Alertes d'expiration"
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'kind', 'valid_until'], name='company_expiry_event_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['is_read', 'valid_until'], name='company_expiry_unread_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title} ({self.valid_until})"
+
+
+class DocumentPreview(models.Model):
+    """Thumbnail and text extraction state for one file content, see company.previews."""
+    STATUS_CHOICES = [
+        ('PENDING', 'En attente'),
+        ('PROCESSING', 'En cours'),
+        ('DONE', 'Terminé'),
+        ('FAILED', 'Échec'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    has_thumbnail = models.BooleanField(default=False)
+    text_length = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Aperçu de document"
+        verbose_name_plural = "Aperçus de documents"
+        indexes = [
+            models.Index(fields=['status', 'id'], name='company_preview_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.status})"
+
+
+class DocumentSearchTerm(models.Model):
+    """Inverted index of a document's title, description and extracted text."""
+    document = models.ForeignKey(CompanyDocument, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'term'], name='company_search_term_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'document'], name='company_term_doc_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.company.name}"
\ No newline at end of file
+        return self.term
@@ -0,0 +1,226 @@
+"""
+Thumbnails, text extraction and search index for company documents.
+
+Saving a document only queues a DocumentPreview for its content hash. The
+process_company_documents command does the work on a process pool, off the
+request path and outside any transaction: a batch is claimed (marked
+PROCESSING) in one short transaction and its results are saved in another.
+A claim older than STALE_AFTER is taken to be a crashed worker's and is
+claimed again. Results are cached on disk under the hash: a thumbnail PNG
+and the extracted text. Identical files are therefore processed once.
+Searches read DocumentSearchTerm, an inverted index of each document's
+title, description and extracted text.
+
+Pillow (images) and pypdf (PDF text) are optional. Without them the
+affected files simply get no thumbnail or no text.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from gestion.normalization import text_tokens
+from .models import CompanyDocument, DocumentPreview, DocumentSearchTerm
+from .storage import content_storage
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pragma: no cover - optional dependency
+    PdfReader = None
+
+THUMBNAIL_SIZE = (256, 256)
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+TEXT_EXTENSIONS = {'.txt', '.csv'}
+MAX_PDF_PAGES = 50
+MAX_TEXT_LENGTH = 200_000
+MAX_TERMS = 5000
+MAX_TERM_LENGTH = 64
+STALE_AFTER = timedelta(hours=1)
+
+
+def cache_dir():
+    return getattr(settings, 'COMPANY_PREVIEW_DIR', None) or os.path.join(content_storage.location, 'company', 'previews')
+
+
+def thumbnail_path(sha256):
+    return os.path.join(cache_dir(), sha256[:2], f'{sha256}.png')
+
+
+def text_path(sha256):
+    return os.path.join(cache_dir(), sha256[:2], f'{sha256}.txt')
+
+
+def cached_text(sha256):
+    try:
+        with open(text_path(sha256), encoding='utf-8') as source:
+            return source.read()
+    except FileNotFoundError:
+        return ''
+
+
+def _extract_text(path, extension):
+    if extension == '.pdf' and PdfReader is not None:
+        reader = PdfReader(path)
+        parts, length = [], 0
+        for page in reader.pages[:MAX_PDF_PAGES]:
+            part = page.extract_text() or ''
+            parts.append(part)
+            length += len(part)
+            if length >= MAX_TEXT_LENGTH:
+                break
+        return '\n'.join(parts)[:MAX_TEXT_LENGTH]
+    if extension in TEXT_EXTENSIONS:
+        with open(path, encoding='utf-8', errors='replace') as source:
+            return source.read(MAX_TEXT_LENGTH)
+    return ''
+
+
+def _make_thumbnail(path, extension, target):
+    if extension not in IMAGE_EXTENSIONS or Image is None:
+        return False
+    with Image.open(path) as image:
+        image.thumbnail(THUMBNAIL_SIZE)
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGB')
+        image.save(target, format='PNG', optimize=True)
+    return True
+
+
+def extract(job):
+    """
+    Pure worker function: job is (sha256, path, extension).
+    Returns (sha256, has_thumbnail, text, error); reuses the disk cache when present.
+    """
+    sha256, path, extension = job
+    thumbnail, text_file = thumbnail_path(sha256), text_path(sha256)
+    try:
+        if os.path.exists(text_file):
+            return sha256, os.path.exists(thumbnail), cached_text(sha256), ''
+        os.makedirs(os.path.dirname(text_file), exist_ok=True)
+        has_thumbnail = _make_thumbnail(path, extension, thumbnail)
+        text = _extract_text(path, extension)
+        # Written last: its presence marks the cache entry complete.
+        with open(text_file, 'w', encoding='utf-8') as target:
+            target.write(text)
+        return sha256, has_thumbnail, text, ''
+    except Exception as exc:
+        return sha256, False, '', f'{type(exc).__name__}: {exc}'
+
+
+def document_terms(title, description, text):
+    terms = []
+    seen = set()
+    for source in (title, description, text):
+        for token in text_tokens(source):
+            token = token[:MAX_TERM_LENGTH]
+            if token not in seen:
+                seen.add(token)
+                terms.append(token)
+                if len(terms) >= MAX_TERMS:
+                    return terms
+    return terms
+
+
+def index_documents(documents, text):
+    """Replace the search terms of ``documents`` (sharing one content) with their current terms."""
+    documents = list(documents)
+    DocumentSearchTerm.objects.filter(document__in=documents).delete()
+    DocumentSearchTerm.objects.bulk_create([
+        DocumentSearchTerm(document=document, term=term)
+        for document in documents
+        for term in document_terms(document.title, document.description, text)
+    ], batch_size=1000)
+
+
+def queue(document):
+    """Queue processing for a saved document and index what is already known about it."""
+    preview = None
+    if document.sha256:
+        preview, _ = DocumentPreview.objects.get_or_create(sha256=document.sha256)
+    text = cached_text(document.sha256) if preview is not None and preview.status == 'DONE' else ''
+    index_documents([document], text)
+
+
+def claim_pending(limit):
+    """Mark up to ``limit`` pending (or abandoned) previews as PROCESSING and return their hashes."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            DocumentPreview.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='PENDING') | Q(status='PROCESSING', updated_at__lt=now - STALE_AFTER))
+            .order_by('id').values_list('sha256', flat=True)[:limit]
+        )
+        DocumentPreview.objects.filter(sha256__in=claimed).update(status='PROCESSING', updated_at=now)
+    return claimed
+
+
+def save_results(results):
+    """Store the (sha256, has_thumbnail, text, error) results and reindex the documents of each content."""
+    shas = [result[0] for result in results]
+    now = timezone.now()
+    with transaction.atomic():
+        previews = {preview.sha256: preview for preview in DocumentPreview.objects.filter(sha256__in=shas)}
+        documents = {}
+        for document in CompanyDocument.objects.filter(sha256__in=shas).only('id', 'sha256', 'title', 'description'):
+            documents.setdefault(document.sha256, []).append(document)
+        for sha256, has_thumbnail, text, error in results:
+            preview = previews.get(sha256)
+            if preview is None:
+                continue
+            preview.status = 'FAILED' if error else 'DONE'
+            preview.has_thumbnail = has_thumbnail
+            preview.text_length = len(text)
+            preview.error = error
+            preview.updated_at = now
+            index_documents(documents.get(sha256, []), text)
+        DocumentPreview.objects.bulk_update(
+            previews.values(), ['status', 'has_thumbnail', 'text_length', 'error', 'updated_at'], batch_size=500,
+        )
+
+
+def process_pending(limit=200, workers=None):
+    """Process up to ``limit`` pending previews; return how many were handled."""
+    claimed = claim_pending(limit)
+    files = {}
+    for sha256, name in CompanyDocument.objects.filter(sha256__in=claimed).values_list('sha256', 'file'):
+        files.setdefault(sha256, name)
+    jobs = [
+        (sha256, content_storage.path(files[sha256]), os.path.splitext(files[sha256])[1].lower())
+        for sha256 in claimed if sha256 in files
+    ]
+    # Content no longer referenced by any document.
+    DocumentPreview.objects.filter(sha256__in=[sha256 for sha256 in claimed if sha256 not in files]).delete()
+
+    if workers and workers > 1 and len(jobs) > 1:
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(extract, jobs))
+    else:
+        results = [extract(job) for job in jobs]
+
+    save_results(results)
+    return len(results)
+
+
+def with_preview_flag(documents):
+    return documents.annotate(has_preview=Exists(
+        DocumentPreview.objects.filter(sha256=OuterRef('sha256'), has_thumbnail=True),
+    ))
+
+
+def search(documents, query):
+    """Documents matching every word of ``query`` by prefix, through the term index."""
+    for token in text_tokens(query)[:10]:
+        matching = DocumentSearchTerm.objects.filter(term__startswith=token[:MAX_TERM_LENGTH]).values('document_id')
+        documents = documents.filter(pk__in=matching)
+    return documents
@@ -0,0 +1,91 @@
+"""
+Process-wide cache of the company profile.
+
+CompanyInfo holds a single row that invoices, certificates and exports all
+display. It is loaded once per process together with its documents and
+reused while the row's (id, updated_at, profile_version) is unchanged:
+saving the company moves updated_at, and company.receivers bumps
+profile_version whenever one of its documents is saved or deleted. Every
+worker sees the change through one primary-key query, whatever cache
+backend is configured.
+"""
+import hashlib
+import json
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Prefetch
+
+from .models import CompanyInfo, CompanyDocument
+
+_lock = threading.Lock()
+_state = {'version': None, 'snapshot': None}
+
+
+class CompanySnapshot:
+    """The company row with its documents prefetched, plus a plain copy of its fields."""
+    __slots__ = ('instance', 'fields', 'etag')
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.fields = {}
+        if instance is not None:
+            self.fields = {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+        documents = [
+            (document.pk, document.file.name, str(document.valid_until))
+            for document in (instance.documents.all() if instance is not None else ())
+        ]
+        digest = hashlib.sha1(
+            json.dumps([self.fields, documents], cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        self.etag = f'"{digest}"'
+
+
+def _current_version():
+    return CompanyInfo.objects.order_by('id').values_list('id', 'updated_at', 'profile_version').first()
+
+
+def _load():
+    instance = (
+        CompanyInfo.objects
+        .prefetch_related(Prefetch('documents', queryset=CompanyDocument.objects.order_by('id')))
+        .order_by('id')
+        .first()
+    )
+    return CompanySnapshot(instance)
+
+
+def company_snapshot():
+    version = _current_version()
+    snapshot = _state['snapshot']
+    if snapshot is not None and _state['version'] == version:
+        return snapshot
+    with _lock:
+        if _state['snapshot'] is None or _state['version'] != version:
+            _state['snapshot'] = _load()
+            _state['version'] = version
+        return _state['snapshot']
+
+
+def get_company():
+    """The CompanyInfo instance (documents prefetched), or None. Treat it as read-only."""
+    return company_snapshot().instance
+
+
+def company_fields(*names):
+    """Plain dict of the company's field values, '' for every field when no company exists yet."""
+    fields = company_snapshot().fields
+    names = names or [field.attname for field in CompanyInfo._meta.concrete_fields]
+    return {name: fields.get(name, '') for name in names}
+
+
+def bump(company_id):
+    """Make every process reload the profile of ``company_id`` on its next read."""
+    CompanyInfo.objects.filter(pk=company_id).update(profile_version=F('profile_version') + 1)
+
+
+def invalidate():
+    """Drop this process's copy, e.g. when the row itself was deleted."""
+    with _lock:
+        _state['snapshot'] = None
+        _state['version'] = None
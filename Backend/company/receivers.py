@@ -0,0 +1,31 @@
+"""Drop the cached company profile and queue document previews when documents change."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import previews, profile
+from .models import CompanyInfo, CompanyDocument
+
+
+@receiver(post_save, sender=CompanyDocument)
+@receiver(post_delete, sender=CompanyDocument)
+def bump_company_profile(sender, instance, raw=False, **kwargs):
+    # Committed with the document, other workers notice it on their next read.
+    if not raw:
+        profile.bump(instance.company_id)
+
+
+@receiver(post_save, sender=CompanyInfo)
+@receiver(post_delete, sender=CompanyInfo)
+@receiver(post_save, sender=CompanyDocument)
+@receiver(post_delete, sender=CompanyDocument)
+def invalidate_company_profile(sender, **kwargs):
+    # This process may have reloaded the old row inside the transaction.
+    transaction.on_commit(profile.invalidate)
+
+
+@receiver(post_save, sender=CompanyDocument)
+def queue_document_preview(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: previews.queue(instance))
@@ -1,12 +1,26 @@
 from rest_framework import serializers
-from .models import CompanyInfo, CompanyDocument
+from rest_framework.reverse import reverse
+from .models import CompanyInfo, CompanyDocument, DocumentUpload
+from .transfer import CHUNK_SIZE, MAX_UPLOAD_SIZE
 
 
 class CompanyDocumentSerializer(serializers.ModelSerializer):
+    preview_url = serializers.SerializerMethodField()
+
     class Meta:
         model = CompanyDocument
         fields = '__all__'
-        read_only_fields = ('upload_date',)
+        read_only_fields = ('upload_date', 'sha256', 'size')
+
+    def get_preview_url(self, obj):
+        # Only set on querysets annotated by previews.with_preview_flag().
+        if not getattr(obj, 'has_preview', False):
+            return None
+        url = reverse(
+            'company-documents-thumbnail', kwargs={'company_pk': obj.company_id, 'pk': obj.pk},
+            request=self.context.get('request'),
+        )
+        return f'{url}?v={obj.sha256[:12]}'
 
 
 class CompanyInfoSerializer(serializers.ModelSerializer):
@@ -14,5 +28,25 @@ class CompanyInfoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CompanyInfo
-        fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at')
\ No newline at end of file
+        exclude = ('profile_version',)
+        read_only_fields = ('created_at', 'updated_at')
+
+
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DocumentUpload
+        fields = (
+            'id', 'document_type', 'title', 'description', 'valid_until', 'filename', 'size',
+            'received', 'chunk_size', 'document', 'created_at', 'updated_at',
+        )
+        read_only_fields = ('received', 'document', 'created_at', 'updated_at')
+
+    def get_chunk_size(self, obj):
+        return CHUNK_SIZE
+
+    def validate_size(self, value):
+        if value < 0 or value > MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(f"Taille invalide (maximum {MAX_UPLOAD_SIZE} octets).")
+        return value
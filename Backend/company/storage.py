@@ -0,0 +1,64 @@
+"""
+Content-addressed storage for company documents.
+
+Files are stored under their SHA-256 digest, so uploading the same
+certificate twice keeps a single copy on disk. Callers that already know
+the digest (the chunked upload assembles and hashes the file itself) can
+attach it to the content to avoid reading the file again.
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# Hashed names are 95 characters before the extension, see CompanyDocument.file.
+MAX_EXTENSION_LENGTH = 16
+
+
+def file_digest(content):
+    """SHA-256 hex digest of a File, read in chunks and remembered on the object."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        sha.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    content.sha256 = sha.hexdigest()
+    return content.sha256
+
+
+class AssembledFile(File):
+    """A finished upload on local disk; the storage moves it into place instead of copying it."""
+
+    def __init__(self, path, sha256, name=None):
+        super().__init__(open(path, 'rb'), name=name or os.path.basename(path))
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    prefix = 'company/documents/sha256'
+
+    def hashed_name(self, digest, original_name):
+        extension = os.path.splitext(original_name)[1].lower()[:MAX_EXTENSION_LENGTH]
+        return f'{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def _save(self, name, content):
+        name = self.hashed_name(file_digest(content), name)
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+content_storage = ContentAddressedStorage()
@@ -1,3 +1,204 @@
-from django.test import TestCase
+import hashlib
+import shutil
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import expiry, previews, profile
+from .models import CompanyDocument, CompanyInfo, DocumentExpiryNotification, DocumentPreview, DocumentUpload
+
+
+class CompanyAPITestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        profile.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='manager'))
+        self.company = CompanyInfo.objects.create(
+            name='Atelier', company_type='SARL', tax_identification='1234567/A/M/000',
+            phone_number='+21671000000', email='contact@atelier.tn',
+        )
+
+    def add_document(self, content=b'contenu', filename='attestation.pdf', **fields):
+        fields.setdefault('title', 'Attestation')
+        # Assigned like an upload, so save() hashes it. Previews are queued on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            return CompanyDocument.objects.create(
+                company=self.company, document_type='OTHER', file=ContentFile(content, name=filename), **fields,
+            )
+
+
+class CompanyProfileTests(CompanyAPITestCase):
+    def test_served_from_the_cache_with_an_etag(self):
+        first = self.client.get('/company/')
+        self.assertEqual(first.json()[0]['name'], 'Atelier')
+        # Only the version check once the profile is cached.
+        with self.assertNumQueries(1):
+            second = self.client.get(f'/company/{self.company.pk}/')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json()['tax_identification'], '1234567/A/M/000')
+
+    def test_not_modified(self):
+        etag = self.client.get('/company/')['ETag']
+        response = self.client.get('/company/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_saving_the_company_or_a_document_changes_the_etag(self):
+        etags = [self.client.get('/company/')['ETag']]
+        self.company.name = 'Atelier Nord'
+        self.company.save()
+        etags.append(self.client.get('/company/')['ETag'])
+        self.assertEqual(profile.company_fields('name'), {'name': 'Atelier Nord'})
+        self.add_document()
+        response = self.client.get('/company/', HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()[0]['documents']), 1)
+        etags.append(response['ETag'])
+        self.assertEqual(len(set(etags)), 3)
+
+
+class DocumentTransferTests(CompanyAPITestCase):
+    CONTENT = b'0123456789' * 10
+
+    def open_upload(self, size=len(CONTENT)):
+        response = self.client.post(f'/company/{self.company.pk}/uploads/', {
+            'filename': 'Attestation fiscale.pdf', 'size': size, 'document_type': 'TAX_CERTIFICATE',
+            'title': 'Attestation fiscale 2025',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return f"/company/{self.company.pk}/uploads/{response.json()['id']}/"
+
+    def send(self, url, offset, data, **extra):
+        return self.client.generic(
+            'PATCH', url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset), **extra,
+        )
+
+    def test_upload_in_chunks_and_resume(self):
+        url = self.open_upload()
+        self.assertEqual(self.send(url, 0, self.CONTENT[:40])['Upload-Offset'], '40')
+        # A chunk sent again, or skipping ahead, is refused with the offset to resume from.
+        for offset in (0, 60):
+            response = self.send(url, offset, self.CONTENT[offset:offset + 20])
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.json()['error'], 'Décalage attendu: 40.')
+        self.assertEqual(self.client.get(url)['Upload-Offset'], '40')
+
+        data = self.send(url, 40, self.CONTENT[40:]).json()
+        self.assertEqual(data['received'], len(self.CONTENT))
+        document = CompanyDocument.objects.get(pk=data['document'])
+        self.assertEqual(document.sha256, hashlib.sha256(self.CONTENT).hexdigest())
+        self.assertEqual(document.file.read(), self.CONTENT)
+        self.assertTrue(document.file.name.endswith(f'{document.sha256}.pdf'))
+        self.assertEqual(self.send(url, len(self.CONTENT), b'x').status_code, 409)
+
+    def test_chunk_limits(self):
+        url = self.open_upload()
+        self.assertEqual(self.send(url, 0, self.CONTENT + b'!').status_code, 413)
+        self.assertEqual(self.send(url, 'x', self.CONTENT).status_code, 400)
+        self.assertEqual(self.send(url, 0, self.CONTENT, CONTENT_LENGTH='').status_code, 411)
+        self.assertEqual(DocumentUpload.objects.get().received, 0)
+
+    def test_identical_files_share_storage(self):
+        first = self.add_document(self.CONTENT)
+        second = self.add_document(self.CONTENT)
+        self.assertEqual(first.file.name, second.file.name)
+
+    def test_ranged_download(self):
+        document = self.add_document(self.CONTENT)
+        url = f'/company/{self.company.pk}/documents/{document.pk}/download/'
+        response = self.client.get(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.CONTENT)}')
+
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-5').streaming_content), self.CONTENT[-5:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=500-').status_code, 416)
+        # A stale If-Range gets the whole file.
+        whole = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+        self.assertEqual(whole.status_code, 200)
+        self.assertIn('Attestation.pdf', whole['Content-Disposition'])
+
+        document.file.delete(save=False)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class DocumentExpiryTests(CompanyAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = date.today()
+        self.expired = self.add_document(b'a', valid_until=self.today - timedelta(days=3))
+        self.expiring = self.add_document(b'b', valid_until=self.today + timedelta(days=10))
+        self.add_document(b'c', valid_until=self.today + timedelta(days=90))
+        self.add_document(b'd')
+
+    def test_expiring_documents(self):
+        url = f'/company/{self.company.pk}/documents/expiring/'
+        rows = self.client.get(url).json()
+        self.assertEqual([(row['id'], row['days_left']) for row in rows], [(self.expiring.pk, 10)])
+        rows = self.client.get(f'{url}?include_expired=1').json()
+        self.assertEqual([row['id'] for row in rows], [self.expired.pk, self.expiring.pk])
+        self.assertEqual(self.client.get(f'{url}?days=-1').status_code, 400)
+
+    def test_scan_records_each_event_once(self):
+        self.assertEqual(expiry.scan(today=self.today, batch_size=1), 2)
+        self.assertEqual(expiry.scan(today=self.today), 0)
+        self.assertEqual(
+            set(DocumentExpiryNotification.objects.values_list('document_id', 'kind')),
+            {(self.expired.pk, 'EXPIRED'), (self.expiring.pk, 'EXPIRING')},
+        )
+        # The same document expiring again later is a new event.
+        self.expiring.valid_until += timedelta(days=5)
+        self.expiring.save()
+        self.assertEqual(expiry.scan(today=self.today), 1)
+
+    def test_notifications_are_marked_read(self):
+        expiry.scan(today=self.today)
+        unread = self.client.get('/company/notifications/?unread=1').json()
+        self.assertEqual([row['document_id'] for row in unread], [self.expired.pk, self.expiring.pk])
+        self.assertEqual(self.client.post('/company/notifications/', {'ids': [unread[0]['id']]}, format='json').json(),
+                         {'updated': 1})
+        self.assertEqual(self.client.post('/company/notifications/', {'all': True}, format='json').json(),
+                         {'updated': 1})
+        self.assertEqual(self.client.get('/company/notifications/?unread=1').json(), [])
+        self.assertEqual(self.client.post('/company/notifications/', {'ids': 'x'}, format='json').status_code, 400)
+
+
+class DocumentPreviewTests(CompanyAPITestCase):
+    def test_claims_are_not_handed_out_twice(self):
+        first = self.add_document(b'premier', filename='a.txt')
+        second = self.add_document(b'second', filename='b.txt')
+        self.assertEqual(previews.claim_pending(1), [first.sha256])
+        self.assertEqual(previews.claim_pending(10), [second.sha256])
+        self.assertEqual(previews.claim_pending(10), [])
+        # A claim left behind by a crashed worker is taken again once stale.
+        DocumentPreview.objects.filter(sha256=first.sha256).update(
+            updated_at=timezone.now() - previews.STALE_AFTER - timedelta(minutes=1),
+        )
+        self.assertEqual(previews.claim_pending(10), [first.sha256])
+
+    def test_processing_indexes_the_extracted_text(self):
+        document = self.add_document(b'Quittance loyer janvier', filename='quittance.txt', title='Bail')
+        url = f'/company/{self.company.pk}/documents/?search='
+        self.assertEqual(self.client.get(f'{url}bail').json()['results'][0]['id'], document.pk)
+        self.assertEqual(self.client.get(f'{url}quitt').json()['results'], [])
+
+        self.assertEqual(previews.process_pending(), 1)
+        preview = DocumentPreview.objects.get(sha256=document.sha256)
+        self.assertEqual((preview.status, preview.text_length), ('DONE', 23))
+        self.assertEqual([row['id'] for row in self.client.get(f'{url}quitt janv').json()['results']], [document.pk])
+        # Identical content uploaded later is indexed from the cached text.
+        copy = self.add_document(b'Quittance loyer janvier', filename='copie.txt', title='Copie')
+        self.assertEqual(previews.process_pending(), 0)
+        self.assertEqual(len(self.client.get(f'{url}loyer').json()['results']), 2)
+        self.assertEqual(DocumentPreview.objects.count(), 1)
+        self.assertTrue(CompanyDocument.objects.filter(pk=copy.pk, search_terms__term='loyer').exists())
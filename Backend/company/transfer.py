@@ -0,0 +1,240 @@
+"""
+Chunked, resumable uploads and ranged downloads of company documents.
+
+An upload is opened with its final size, then its bytes are sent in order
+with PATCH requests carrying an ``Upload-Offset`` header. Each chunk is
+streamed from the request into a temporary file, then appended to the
+upload's part file under a short row lock. A client that lost
+its connection asks for the upload's ``received`` offset and carries on
+from there. The last chunk triggers the assembly: the part file is hashed
+once and moved into the content-addressed storage (see company.storage).
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.text import get_valid_filename
+
+from .models import CompanyDocument, DocumentUpload
+from .storage import AssembledFile, content_storage
+
+MAX_UPLOAD_SIZE = 500 * 1024 * 1024
+CHUNK_SIZE = 5 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+IO_BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def upload_dir():
+    return getattr(settings, 'COMPANY_UPLOAD_DIR', None) or os.path.join(content_storage.location, 'company', 'uploads')
+
+
+def part_path(upload):
+    return os.path.join(upload_dir(), f'{upload.pk}.part')
+
+
+def _copy(stream, target, limit):
+    """Copy at most ``limit`` bytes from ``stream`` to ``target``; return the count."""
+    copied = 0
+    while copied < limit:
+        block = stream.read(min(IO_BLOCK_SIZE, limit - copied))
+        if not block:
+            break
+        target.write(block)
+        copied += len(block)
+    return copied
+
+
+def _chunk_limit(upload, offset, length):
+    """Bytes the chunk at ``offset`` may carry; UploadError when it does not fit the upload."""
+    if upload.document_id is not None:
+        raise UploadError("Ce téléversement est déjà terminé.", status=409)
+    if offset != upload.received:
+        raise UploadError(f"Décalage attendu: {upload.received}.", status=409)
+    remaining = upload.size - upload.received
+    if length is not None and length > remaining:
+        raise UploadError("Le fragment dépasse la taille annoncée.", status=413)
+    return min(remaining, MAX_CHUNK_SIZE if length is None else length)
+
+
+def append_chunk(upload_id, stream, offset, length=None):
+    """
+    Write one chunk at ``offset`` and return the upload, assembled if it is complete.
+    The body is received into a temporary file first, so the row is only locked
+    while the offset is checked again and the chunk is appended to the part file.
+    """
+    limit = _chunk_limit(DocumentUpload.objects.get(pk=upload_id), offset, length)
+    os.makedirs(upload_dir(), exist_ok=True)
+    fd, chunk_path = tempfile.mkstemp(dir=upload_dir(), prefix=f'{upload_id}.', suffix='.chunk')
+    try:
+        with os.fdopen(fd, 'wb') as chunk:
+            written = _copy(stream, chunk, limit)
+        if length is not None and written != length:
+            raise UploadError("Fragment incomplet, reprenez au dernier décalage.", status=400)
+
+        with transaction.atomic():
+            upload = DocumentUpload.objects.select_for_update().get(pk=upload_id)
+            # Another request may have sent this chunk meanwhile.
+            _chunk_limit(upload, offset, written)
+            path = part_path(upload)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as part, open(chunk_path, 'rb') as chunk:
+                # Drop whatever an interrupted chunk left behind.
+                part.seek(offset)
+                part.truncate()
+                shutil.copyfileobj(chunk, part, IO_BLOCK_SIZE)
+            upload.received += written
+            upload.save(update_fields=['received', 'updated_at'])
+    finally:
+        os.remove(chunk_path)
+    if upload.received == upload.size:
+        assemble(upload)
+    return upload
+
+
+def _hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def assemble(upload):
+    """
+    Move a complete part file into storage and create its CompanyDocument.
+    The file is hashed before the row is locked: a complete upload takes no more
+    chunks. A concurrent call that assembled it first wins.
+    """
+    path = part_path(upload)
+    if upload.size == 0 and not os.path.exists(path):
+        open(path, 'wb').close()
+    try:
+        digest = _hash_file(path)
+    except FileNotFoundError:
+        # Already moved into storage by a concurrent call, checked below.
+        digest = None
+
+    with transaction.atomic():
+        locked = DocumentUpload.objects.select_for_update().select_related('document').get(pk=upload.pk)
+        if locked.document_id is not None:
+            upload.document = locked.document
+            return locked.document
+        if digest is None:
+            raise UploadError("Fichier du téléversement introuvable.", status=409)
+        content = AssembledFile(path, digest, name=upload.filename)
+        try:
+            name = content_storage.save(upload.filename, content)
+        finally:
+            content.close()
+        if os.path.exists(path):
+            # Identical content was already stored.
+            os.remove(path)
+
+        document = CompanyDocument(
+            company_id=upload.company_id,
+            document_type=upload.document_type,
+            title=upload.title,
+            description=upload.description,
+            valid_until=upload.valid_until,
+            sha256=digest,
+            size=upload.size,
+        )
+        document.file.name = name
+        document.save()
+        upload.document = document
+        upload.save(update_fields=['document', 'updated_at'])
+    return document
+
+
+def discard(upload):
+    path = part_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    upload.delete()
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single ``bytes=`` range, None to serve everything, or False."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: fall back to the whole file.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _read_range(fieldfile, start, length):
+    with fieldfile.storage.open(fieldfile.name, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            block = source.read(min(IO_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def ranged_file_response(request, document):
+    """Stream a document's file, honouring a single-range ``Range`` header."""
+    fieldfile = document.file
+    try:
+        size = fieldfile.size
+    except FileNotFoundError:
+        raise Http404
+    etag = f'"{document.sha256}"' if document.sha256 else None
+    # Stored names are digests, offer the title instead.
+    extension = os.path.splitext(fieldfile.name)[1]
+    try:
+        filename = get_valid_filename(document.title) + extension
+    except SuspiciousFileOperation:
+        # Nothing usable left of the title.
+        filename = os.path.basename(fieldfile.name)
+
+    requested = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if requested and (if_range is None or (etag and if_range == etag)):
+        byte_range = _parse_range(requested, size)
+    else:
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(fieldfile.open('rb'), as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(fieldfile, start, end - start + 1), status=206)
+        response['Content-Type'] = 'application/octet-stream'
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Disposition'] = f"attachment; filename*=utf-8''{quote(filename)}"
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
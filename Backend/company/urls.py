@@ -5,7 +5,9 @@ from . import views
 router = DefaultRouter()
 router.register(r'', views.CompanyInfoViewSet, basename='company')
 router.register(r'(?P<company_pk>\d+)/documents', views.CompanyDocumentViewSet, basename='company-documents')
+router.register(r'(?P<company_pk>\d+)/uploads', views.DocumentUploadViewSet, basename='company-uploads')
 
 urlpatterns = [
+    path('notifications/', views.DocumentExpiryNotificationAPIView.as_view(), name='company-notifications'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
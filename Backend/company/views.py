@@ -1,9 +1,15 @@
+import io
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from datetime import date
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
-from .models import CompanyInfo, CompanyDocument
-from .serializers import CompanyInfoSerializer, CompanyDocumentSerializer
+from django.utils.cache import patch_cache_control
+from . import expiry, previews, profile, transfer
+from .models import CompanyInfo, CompanyDocument, DocumentUpload, DocumentExpiryNotification
+from .serializers import CompanyInfoSerializer, CompanyDocumentSerializer, DocumentUploadSerializer
 
 
 class CompanyInfoViewSet(viewsets.ModelViewSet):
@@ -14,6 +20,29 @@ class CompanyInfoViewSet(viewsets.ModelViewSet):
         # In a real application, you might want to filter by current user/company
         return CompanyInfo.objects.all()
 
+    def _cached_response(self, request, snapshot, data):
+        if snapshot.etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = snapshot.etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        # Served from the process-wide profile cache, see company.profile.
+        snapshot = profile.company_snapshot()
+        company = snapshot.instance
+        data = [self.get_serializer(company).data] if company is not None else []
+        return self._cached_response(request, snapshot, data)
+
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = profile.company_snapshot()
+        company = snapshot.instance
+        if company is None or str(company.pk) != str(kwargs.get(self.lookup_field)):
+            return super().retrieve(request, *args, **kwargs)
+        return self._cached_response(request, snapshot, self.get_serializer(company).data)
+
     def create(self, request, *args, **kwargs):
         # Only allow one company info instance
         if CompanyInfo.objects.exists():
@@ -43,14 +72,144 @@ class CompanyInfoViewSet(viewsets.ModelViewSet):
 class CompanyDocumentViewSet(viewsets.ModelViewSet):
     queryset = CompanyDocument.objects.all()
     serializer_class = CompanyDocumentSerializer
+    filter_fields = {'document_type': 'document_type'}
 
     def get_queryset(self):
         company_id = self.kwargs.get('company_pk')
+        documents = CompanyDocument.objects.all()
         if company_id:
-            return CompanyDocument.objects.filter(company_id=company_id)
-        return CompanyDocument.objects.all()
+            documents = documents.filter(company_id=company_id)
+        search = self.request.query_params.get('search')
+        if search:
+            # Title, description and extracted text, through the term index.
+            documents = previews.search(documents, search)
+        return previews.with_preview_flag(documents)
 
     def perform_create(self, serializer):
         company_id = self.kwargs.get('company_pk')
         company = get_object_or_404(CompanyInfo, id=company_id)
-        serializer.save(company=company)
\ No newline at end of file
+        serializer.save(company=company)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None, company_pk=None):
+        """Stream the file, with single-range ``Range`` requests answered by 206."""
+        return transfer.ranged_file_response(request, self.get_object())
+
+    @action(detail=True, methods=['get'])
+    def thumbnail(self, request, pk=None, company_pk=None):
+        document = self.get_object()
+        path = previews.thumbnail_path(document.sha256) if document.sha256 else None
+        if not path or not getattr(document, 'has_preview', False):
+            raise Http404
+        response = FileResponse(open(path, 'rb'), content_type='image/png')
+        # preview_url carries the content hash, so the image never changes under it.
+        patch_cache_control(response, private=True, max_age=60 * 60 * 24 * 365, immutable=True)
+        return response
+
+    @action(detail=False, methods=['get'])
+    def expiring(self, request, company_pk=None):
+        """
+        Documents expiring within ?days= (default 30), optionally by ?document_type=.
+        ?include_expired=1 also returns documents already expired.
+        """
+        try:
+            days = int(request.query_params.get('days', expiry.DEFAULT_DAYS))
+        except ValueError:
+            days = -1
+        if days < 0:
+            return Response({"error": "Nombre de jours invalide."}, status=status.HTTP_400_BAD_REQUEST)
+        document_type = request.query_params.get('document_type')
+        if document_type and document_type not in dict(CompanyDocument.DOCUMENT_TYPES):
+            return Response({"error": "Type de document invalide."}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = date.today()
+        documents = expiry.expiring_documents(
+            days, document_type=document_type, today=today,
+            include_expired=request.query_params.get('include_expired') in ('1', 'true'),
+        )
+        if company_pk:
+            documents = documents.filter(company_id=company_pk)
+        rows = [expiry.expiry_row(values, today) for values in documents.values(*expiry.EXPIRY_FIELDS)]
+        return Response(rows)
+
+
+class DocumentUploadViewSet(viewsets.ViewSet):
+    """
+    Chunked, resumable upload of a company document, see company.transfer.
+    POST   /company/<company_pk>/uploads/            {filename, size, document_type, title, ...}
+    PATCH  /company/<company_pk>/uploads/<id>/       raw bytes, header Upload-Offset
+    GET    /company/<company_pk>/uploads/<id>/       current offset, to resume
+    DELETE /company/<company_pk>/uploads/<id>/       abort
+    """
+
+    def _get_upload(self, company_pk, pk):
+        return get_object_or_404(DocumentUpload, pk=pk, company_id=company_pk)
+
+    def create(self, request, company_pk=None):
+        company = get_object_or_404(CompanyInfo, id=company_pk)
+        serializer = DocumentUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.save(company=company)
+        if upload.size == 0:
+            transfer.assemble(upload)
+        return Response(DocumentUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None, company_pk=None):
+        upload = self._get_upload(company_pk, pk)
+        response = Response(DocumentUploadSerializer(upload).data)
+        response['Upload-Offset'] = str(upload.received)
+        return response
+
+    def partial_update(self, request, pk=None, company_pk=None):
+        upload = self._get_upload(company_pk, pk)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({"error": "En-tête Upload-Offset manquant ou invalide."}, status=status.HTTP_400_BAD_REQUEST)
+        length = request.headers.get('Content-Length')
+        if not length or not length.isdigit():
+            # Without it the body cannot be read (request.stream is None).
+            return Response({"error": "En-tête Content-Length requis."}, status=status.HTTP_411_LENGTH_REQUIRED)
+        length = int(length)
+        if length > transfer.MAX_CHUNK_SIZE:
+            return Response({"error": "Fragment trop volumineux."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        try:
+            # request.data is never touched: the body is read as a stream.
+            upload = transfer.append_chunk(upload.pk, request.stream or io.BytesIO(), offset, length)
+        except transfer.UploadError as exc:
+            return Response({"error": str(exc)}, status=exc.status)
+        response = Response(DocumentUploadSerializer(upload).data)
+        response['Upload-Offset'] = str(upload.received)
+        return response
+
+    def destroy(self, request, pk=None, company_pk=None):
+        transfer.discard(self._get_upload(company_pk, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+
+class DocumentExpiryNotificationAPIView(APIView):
+    """
+    Expiry alerts recorded by scan_document_expiry, unread first.
+    GET  /company/notifications/?unread=1
+    POST /company/notifications/ {"ids": [..]} or {"all": true} marks them as read.
+    """
+    LIMIT = 200
+
+    def get(self, request):
+        notifications = DocumentExpiryNotification.objects.all()
+        if request.query_params.get('unread') in ('1', 'true'):
+            notifications = notifications.filter(is_read=False)
+        rows = notifications.order_by('is_read', 'valid_until', 'id').values(
+            'id', 'document_id', 'kind', 'document_type', 'title', 'valid_until', 'is_read', 'created_at',
+        )[:self.LIMIT]
+        return Response(list(rows))
+
+    def post(self, request):
+        notifications = DocumentExpiryNotification.objects.filter(is_read=False)
+        if not request.data.get('all'):
+            ids = request.data.get('ids')
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return Response({"error": "Liste d'identifiants attendue."}, status=status.HTTP_400_BAD_REQUEST)
+            notifications = notifications.filter(pk__in=ids)
+        return Response({'updated': notifications.update(is_read=True)})
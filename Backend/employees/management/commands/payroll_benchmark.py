@@ -0,0 +1,81 @@
+import random
+import time
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from employees import payroll
+from employees.models import Employee
+
+
+class Rollback(Exception):
+    pass
+
+
+def row_by_row(salaries, rules=payroll.DEFAULT_RULES):
+    """Reference implementation in Decimal, one employee at a time; net pay in millimes."""
+    millime = Decimal('0.001')
+    brackets = [(Decimal(str(lower)), Decimal(str(rate))) for lower, rate in rules.brackets]
+    results = []
+    for salary in salaries:
+        gross = Decimal(str(salary))
+        contributions = (gross * Decimal(str(rules.employee_rate))).quantize(millime, ROUND_HALF_UP)
+        base = (gross - contributions) * 12
+        expenses = (base * Decimal(str(rules.professional_expense_rate))).quantize(millime, ROUND_HALF_UP)
+        taxable = max(base - min(expenses, Decimal(str(rules.professional_expense_cap))), 0)
+        tax = Decimal(0)
+        for index, (lower, rate) in enumerate(brackets):
+            upper = brackets[index + 1][0] if index + 1 < len(brackets) else taxable
+            if taxable > lower:
+                tax += (min(taxable, upper) - lower) * rate
+        tax = (tax / 12).quantize(millime, ROUND_HALF_UP)
+        results.append(payroll.to_millimes(gross - contributions - tax))
+    return results
+
+
+class Command(BaseCommand):
+    help = "Benchmark the vectorized payroll engine against a row-by-row computation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=10_000)
+        parser.add_argument(
+            '--db', action='store_true',
+            help="Also create the employees and store a full payroll run (rolled back).",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        count = options['employees']
+        salaries = [rng.randint(450_000, 9_000_000) / 1000 for _ in range(count)]
+
+        started = time.perf_counter()
+        expected = row_by_row(salaries)
+        serial = time.perf_counter() - started
+
+        gross = [payroll.to_millimes(salary) for salary in salaries]
+        started = time.perf_counter()
+        amounts = payroll.compute(gross)
+        vectorized = time.perf_counter() - started
+
+        mismatches = sum(1 for a, b in zip(expected, amounts['net'].tolist()) if a != b)
+        self.stdout.write(f"Row by row: {count} employees in {serial:.4f}s")
+        self.stdout.write(f"Vectorized: {count} employees in {vectorized:.4f}s ({serial / vectorized:,.0f}x)")
+        self.stdout.write(f"Net pay mismatches: {mismatches}")
+
+        if options['db']:
+            try:
+                with transaction.atomic():
+                    Employee.objects.bulk_create(
+                        [Employee(name=f"BENCH {i:05d}", salary=f"{salary:.2f}") for i, salary in enumerate(salaries)],
+                        batch_size=1000,
+                    )
+                    started = time.perf_counter()
+                    run = payroll.run_payroll(date(1999, 1, 1), replace=True)
+                    self.stdout.write(
+                        f"Stored run for {run.employee_count} employees in {time.perf_counter() - started:.3f}s"
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
@@ -0,0 +1,54 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_remove_employee_email_remove_employee_notes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(unique=True, verbose_name='Mois')),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('total_gross', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('total_employee_contributions', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('total_employer_contributions', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('total_income_tax', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('total_net', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-period'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PayrollLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_name', models.CharField(max_length=100)),
+                ('gross', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('employee_contributions', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('employer_contributions', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('professional_expenses', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('taxable_income', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('income_tax', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('net', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('employee', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_lines', to='employees.employee')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='employees.payrollrun')),
+            ],
+            options={
+                'ordering': ['employee_name', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='payrollline',
+            constraint=models.UniqueConstraint(fields=('run', 'employee'), name='employees_payroll_line_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_payroll_runs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['name', 'id'], name='employees_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['is_active', 'name', 'id'], name='employees_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['position', 'name', 'id'], name='employees_position_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['hire_date'], name='employees_hire_date_idx'),
+        ),
+    ]
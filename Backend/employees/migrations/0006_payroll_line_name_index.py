@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payrollline',
+            index=models.Index(fields=['run', 'employee_name', 'id'], name='employees_line_run_name_idx'),
+        ),
+    ]
@@ -15,3 +15,53 @@ class Employee(models.Model):
 
     class Meta:
         ordering = ['name']
+        # Directory pages are keyed on (name, id), alone or behind an equality filter.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='employees_name_id_idx'),
+            models.Index(fields=['is_active', 'name', 'id'], name='employees_active_name_idx'),
+            models.Index(fields=['position', 'name', 'id'], name='employees_position_name_idx'),
+            models.Index(fields=['hire_date'], name='employees_hire_date_idx'),
+        ]
+
+
+class PayrollRun(models.Model):
+    """Payroll computed for every active employee for one month, see employees.payroll."""
+    period = models.DateField(unique=True, verbose_name="Mois")  # first day of the month
+    employee_count = models.PositiveIntegerField(default=0)
+    total_gross = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    total_employee_contributions = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    total_employer_contributions = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    total_income_tax = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    total_net = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Paie {self.period:%Y-%m}"
+
+    class Meta:
+        ordering = ['-period']
+
+
+class PayrollLine(models.Model):
+    run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name='lines')
+    employee = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, related_name='payroll_lines')
+    employee_name = models.CharField(max_length=100)
+    gross = models.DecimalField(max_digits=10, decimal_places=3)
+    employee_contributions = models.DecimalField(max_digits=10, decimal_places=3)
+    employer_contributions = models.DecimalField(max_digits=10, decimal_places=3)
+    professional_expenses = models.DecimalField(max_digits=10, decimal_places=3)
+    taxable_income = models.DecimalField(max_digits=10, decimal_places=3)
+    income_tax = models.DecimalField(max_digits=10, decimal_places=3)
+    net = models.DecimalField(max_digits=10, decimal_places=3)
+
+    def __str__(self):
+        return f"{self.employee_name} - {self.run}"
+
+    class Meta:
+        ordering = ['employee_name', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'employee'], name='employees_payroll_line_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['run', 'employee_name', 'id'], name='employees_line_run_name_idx'),
+        ]
@@ -0,0 +1,150 @@
+"""
+Vectorized monthly payroll.
+
+Active employees are loaded with one query into NumPy arrays and gross to
+net is computed for the whole set at once:
+
+    employee contributions  = gross * employee rate (CNSS)
+    professional expenses   = 10 % of the annual net of contributions, capped
+    income tax              = progressive brackets on the annual taxable
+                              income, divided by twelve
+    net                     = gross - contributions - income tax
+
+Amounts are int64 millimes and rates integer millionths, so the arithmetic
+is exact; every division rounds half up to the millime, like
+Decimal.quantize(ROUND_HALF_UP). The bracket tax is a single matrix
+product: each employee's income is split across the bracket widths and
+multiplied by the bracket rates.
+"""
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .models import Employee, PayrollLine, PayrollRun
+
+MILLIME = 3
+# Rates are applied in millionths.
+RATE_SCALE = 1_000_000
+
+
+class PayrollError(Exception):
+    pass
+
+
+def to_millimes(amount):
+    return int((Decimal(str(amount)) * 1000).to_integral_value())
+
+
+def _rate(rate):
+    return int((Decimal(str(rate)) * RATE_SCALE).to_integral_value())
+
+
+def _divide(numerator, denominator):
+    """Non-negative integer division rounded half up (``denominator`` is even)."""
+    return (numerator + denominator // 2) // denominator
+
+
+class PayrollRules:
+    """Rates and annual brackets (lower bound, rate); defaults follow the 2025 Tunisian scale."""
+
+    def __init__(self, employee_rate=0.0918, employer_rate=0.1657, professional_expense_rate=0.10,
+                 professional_expense_cap=2000, brackets=None):
+        self.employee_rate = employee_rate
+        self.employer_rate = employer_rate
+        self.professional_expense_rate = professional_expense_rate
+        self.professional_expense_cap = professional_expense_cap
+        self.brackets = brackets or (
+            (0, 0.00), (5000, 0.15), (10000, 0.25), (20000, 0.30),
+            (30000, 0.33), (40000, 0.36), (50000, 0.38), (70000, 0.40),
+        )
+        lower = np.array([to_millimes(bound) for bound, _ in self.brackets], dtype=np.int64)
+        self.lower = lower
+        self.widths = np.append(np.diff(lower), np.iinfo(np.int64).max)
+        self.rates = np.array([_rate(rate) for _, rate in self.brackets], dtype=np.int64)
+
+
+DEFAULT_RULES = PayrollRules()
+
+
+def annual_income_tax(taxable, rules=DEFAULT_RULES):
+    """Progressive tax, in millimes times RATE_SCALE, for an array of annual taxable incomes in millimes."""
+    per_bracket = np.clip(taxable[:, None] - rules.lower[None, :], 0, rules.widths[None, :])
+    return per_bracket @ rules.rates
+
+
+def compute(gross, rules=DEFAULT_RULES):
+    """Monthly gross salaries in millimes (array) -> dict of monthly amount arrays in millimes."""
+    gross = np.asarray(gross, dtype=np.int64)
+    employee_contributions = _divide(gross * _rate(rules.employee_rate), RATE_SCALE)
+    employer_contributions = _divide(gross * _rate(rules.employer_rate), RATE_SCALE)
+    annual_base = (gross - employee_contributions) * 12
+    annual_expenses = np.minimum(
+        _divide(annual_base * _rate(rules.professional_expense_rate), RATE_SCALE),
+        to_millimes(rules.professional_expense_cap),
+    )
+    annual_taxable = np.maximum(annual_base - annual_expenses, 0)
+    income_tax = _divide(annual_income_tax(annual_taxable, rules), 12 * RATE_SCALE)
+    return {
+        'gross': gross,
+        'employee_contributions': employee_contributions,
+        'employer_contributions': employer_contributions,
+        'professional_expenses': _divide(annual_expenses, 12),
+        'taxable_income': _divide(annual_taxable, 12),
+        'income_tax': income_tax,
+        'net': gross - employee_contributions - income_tax,
+    }
+
+
+def _decimal(millimes):
+    return Decimal(int(millimes)).scaleb(-MILLIME)
+
+
+def active_payroll_inputs():
+    """(ids, names, gross millimes array) for active employees with a salary, in one query."""
+    rows = list(
+        Employee.objects.filter(is_active=True, salary__isnull=False)
+        .order_by('id').values_list('id', 'name', 'salary')
+    )
+    ids = [row[0] for row in rows]
+    names = [row[1] for row in rows]
+    gross = np.fromiter((to_millimes(row[2]) for row in rows), dtype=np.int64, count=len(rows))
+    return ids, names, gross
+
+
+@transaction.atomic
+def run_payroll(period, rules=DEFAULT_RULES, replace=False):
+    """Compute and store the payroll of the month starting at ``period``."""
+    period = date(period.year, period.month, 1)
+    existing = PayrollRun.objects.filter(period=period)
+    if existing.exists():
+        if not replace:
+            raise PayrollError(f"La paie de {period:%Y-%m} existe déjà.")
+        existing.delete()
+
+    ids, names, gross = active_payroll_inputs()
+    amounts = compute(gross, rules)
+    columns = list(amounts)
+    totals = {column: _decimal(amounts[column].sum()) for column in columns}
+    run = PayrollRun.objects.create(
+        period=period,
+        employee_count=len(ids),
+        total_gross=totals['gross'],
+        total_employee_contributions=totals['employee_contributions'],
+        total_employer_contributions=totals['employer_contributions'],
+        total_income_tax=totals['income_tax'],
+        total_net=totals['net'],
+    )
+    # tolist() turns the whole matrix into Python ints in one call.
+    matrix = np.column_stack([amounts[column] for column in columns]).tolist() if ids else []
+    PayrollLine.objects.bulk_create([
+        PayrollLine(
+            run=run,
+            employee_id=employee_id,
+            employee_name=name,
+            **{column: _decimal(value) for column, value in zip(columns, values)},
+        )
+        for employee_id, name, values in zip(ids, names, matrix)
+    ], batch_size=1000)
+    return run
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Employee
+from .models import Employee, PayrollRun, PayrollLine
 
 class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,4 +14,23 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'matricule': {'required': False},
             'email': {'required': False},
             'notes': {'required': False},
-        }
\ No newline at end of file
+        }
+
+
+class EmployeeDirectorySerializer(serializers.ModelSerializer):
+    """List projection without address and salary."""
+    class Meta:
+        model = Employee
+        fields = ('id', 'name', 'position', 'hire_date', 'phone', 'is_active')
+
+
+class PayrollRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayrollRun
+        fields = '__all__'
+
+
+class PayrollLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayrollLine
+        exclude = ('run',)
@@ -1,3 +1,151 @@
-from django.test import TestCase
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from . import payroll
+from .models import Employee, PayrollLine, PayrollRun
+
+MILLIME = Decimal('0.001')
+
+
+def reference(salary, rules=payroll.DEFAULT_RULES):
+    """One employee's payroll computed in Decimal, rounded half up to the millime."""
+    def decimal(value):
+        return Decimal(str(value))
+
+    def quantize(value):
+        return value.quantize(MILLIME, ROUND_HALF_UP)
+
+    gross = decimal(salary)
+    employee_contributions = quantize(gross * decimal(rules.employee_rate))
+    employer_contributions = quantize(gross * decimal(rules.employer_rate))
+    base = (gross - employee_contributions) * 12
+    expenses = min(quantize(base * decimal(rules.professional_expense_rate)), decimal(rules.professional_expense_cap))
+    taxable = max(base - expenses, Decimal(0))
+    tax = Decimal(0)
+    for index, (lower, rate) in enumerate(rules.brackets):
+        upper = decimal(rules.brackets[index + 1][0]) if index + 1 < len(rules.brackets) else taxable
+        if taxable > decimal(lower):
+            tax += (min(taxable, upper) - decimal(lower)) * decimal(rate)
+    income_tax = quantize(tax / 12)
+    return {
+        'gross': gross,
+        'employee_contributions': employee_contributions,
+        'employer_contributions': employer_contributions,
+        'professional_expenses': quantize(expenses / 12),
+        'taxable_income': quantize(taxable / 12),
+        'income_tax': income_tax,
+        'net': gross - employee_contributions - income_tax,
+    }
+
+
+class PayrollComputeTests(SimpleTestCase):
+    def test_matches_the_decimal_reference(self):
+        # Includes a tie (7.50), the expense cap and the top bracket.
+        salaries = ['0', '1.00', '7.50', '123.45', '450.00', '999.99', '1512.34', '1815.26',
+                    '2500.50', '4321.09', '9000.00', '25000.00']
+        amounts = payroll.compute([payroll.to_millimes(salary) for salary in salaries])
+        for index, salary in enumerate(salaries):
+            expected = reference(salary)
+            for column, value in expected.items():
+                self.assertEqual(payroll._decimal(amounts[column][index]), value, (salary, column))
+
+    def test_rounds_half_up(self):
+        # 7.50 * 9.18 % = 0.6885, half to even would give 0.688.
+        amounts = payroll.compute([payroll.to_millimes('7.50')])
+        self.assertEqual(int(amounts['employee_contributions'][0]), 689)
+
+
+class EmployeeAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='rh'))
+
+
+class PayrollRunTests(EmployeeAPITestCase):
+    SALARIES = {'Amine': '1512.34', 'Béchir': '450.00', 'Chiraz': '7.50'}
+
+    def setUp(self):
+        super().setUp()
+        for name, salary in self.SALARIES.items():
+            Employee.objects.create(name=name, salary=salary)
+        Employee.objects.create(name='Dora', salary='3000.00', is_active=False)
+        Employee.objects.create(name='Elyes')
+
+    def test_run_totals_match_the_lines_and_the_reference(self):
+        response = self.client.post('/employees/payroll/runs/', {'month': '2025-06'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        run = PayrollRun.objects.get()
+        self.assertEqual((run.period.isoformat(), run.employee_count), ('2025-06-01', 3))
+
+        expected = {name: reference(salary) for name, salary in self.SALARIES.items()}
+        for line in PayrollLine.objects.all():
+            self.assertEqual(
+                {column: getattr(line, column) for column in expected[line.employee_name]},
+                expected[line.employee_name],
+            )
+        for column in ('gross', 'employee_contributions', 'employer_contributions', 'income_tax', 'net'):
+            self.assertEqual(
+                getattr(run, f'total_{column}'), sum(amounts[column] for amounts in expected.values()), column,
+            )
+
+        lines = self.client.get(f'/employees/payroll/runs/{run.pk}/lines/?page_size=2').json()
+        self.assertEqual([line['employee_name'] for line in lines['results']], ['Amine', 'Béchir'])
+        self.assertIsNotNone(lines['next'])
+
+    def test_a_month_is_computed_once_unless_replaced(self):
+        self.client.post('/employees/payroll/runs/', {'month': '2025-06'}, format='json')
+        response = self.client.post('/employees/payroll/runs/', {'month': '2025-06'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        Employee.objects.filter(name='Dora').update(is_active=True)
+        response = self.client.post('/employees/payroll/runs/?replace=1', {'month': '2025-06'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['employee_count'], 4)
+        self.assertEqual(PayrollLine.objects.count(), 4)
+        self.assertEqual(self.client.post('/employees/payroll/runs/', {}, format='json').status_code, 400)
+
+
+class EmployeeDirectoryTests(EmployeeAPITestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            ('Ben Salah', 'Technicien', date(2019, 3, 1), True),
+            ('Benali', 'Technicien', date(2021, 9, 15), True),
+            ('Ben Salah', 'Comptable', date(2022, 1, 10), False),
+            ('Zied', 'Technicien', date(2023, 5, 2), True),
+        ]
+        self.employees = [
+            Employee.objects.create(name=name, position=position, hire_date=hired, is_active=active,
+                                    address='Sfax', salary='1200.00')
+            for name, position, hired, active in rows
+        ]
+
+    def ids(self, query):
+        ids, url = [], f'/employees/{query}'
+        while url:
+            page = self.client.get(url).json()
+            ids += [employee['id'] for employee in page['results']]
+            url = page['next']
+        return ids
+
+    def test_pages_keep_name_ties_in_id_order(self):
+        first, second, third, fourth = self.employees
+        self.assertEqual(self.ids('?page_size=1'), [first.pk, third.pk, second.pk, fourth.pk])
+        self.assertEqual(self.ids('?page_size=1&ordering=-name'), [fourth.pk, second.pk, third.pk, first.pk])
+
+    def test_filters(self):
+        first, second, third, fourth = self.employees
+        self.assertEqual(self.ids('?is_active=false'), [third.pk])
+        self.assertEqual(self.ids('?position=Technicien&is_active=true&name=ben'), [first.pk, second.pk])
+        self.assertEqual(self.ids('?hire_date_from=2021-01-01&hire_date_to=2022-12-31'), [third.pk, second.pk])
+        self.assertEqual(self.client.get('/employees/?hire_date_from=hier').status_code, 400)
+
+    def test_private_fields_only_on_request(self):
+        listed = self.client.get('/employees/').json()['results'][0]
+        self.assertNotIn('salary', listed)
+        self.assertNotIn('address', listed)
+        listed = self.client.get('/employees/?include=private').json()['results'][0]
+        self.assertEqual((listed['salary'], listed['address']), ('1200.00', 'Sfax'))
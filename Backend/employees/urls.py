@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import EmployeeAPIView
+from .views import EmployeeAPIView, PayrollRunAPIView, PayrollLineAPIView
 
 urlpatterns = [
     path('', EmployeeAPIView.as_view(), name='employee-list'),
     path('<int:pk>/', EmployeeAPIView.as_view(), name='employee-detail'),
+    path('payroll/runs/', PayrollRunAPIView.as_view(), name='payroll-run-list'),
+    path('payroll/runs/<int:pk>/', PayrollRunAPIView.as_view(), name='payroll-run-detail'),
+    path('payroll/runs/<int:pk>/lines/', PayrollLineAPIView.as_view(), name='payroll-run-lines'),
 ]
\ No newline at end of file
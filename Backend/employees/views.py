@@ -2,20 +2,49 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from .models import Employee
-from .serializers import EmployeeSerializer
+from gestion.listing import IndexedListMixin
+from gestion.periods import month_param
+from . import payroll
+from .models import Employee, PayrollRun, PayrollLine
+from .serializers import (
+    EmployeeSerializer, EmployeeDirectorySerializer, PayrollRunSerializer, PayrollLineSerializer,
+)
 
 
-class EmployeeAPIView(APIView):
+PRIVATE_FIELDS = ('address', 'salary')
+
+
+class EmployeeAPIView(IndexedListMixin, APIView):
+    """
+    Employee directory.
+    Example: ?is_active=true&position=Technicien&hire_date_from=2020-01-01&hire_date_to=2024-12-31&name=Ben
+    """
+    list_model = Employee
+    filter_fields = {
+        'is_active': 'is_active',
+        'position': 'position',
+        'hire_date_from': 'hire_date__gte',
+        'hire_date_to': 'hire_date__lte',
+        # Prefix match, so the (name, id) indexes apply.
+        'name': 'name__istartswith',
+    }
+    ordering_fields = {'name': 'name'}
+    default_ordering = ('name', 'id')
+
     def get(self, request, pk=None):
         if pk:
             employee = get_object_or_404(Employee, pk=pk)
             serializer = EmployeeSerializer(employee)
             return Response(serializer.data)
 
-        employees = Employee.objects.all()
-        serializer = EmployeeSerializer(employees, many=True)
-        return Response(serializer.data)
+        employees = self.filter_list(Employee.objects.all())
+        # address and salary only with ?include=private
+        if 'private' in request.query_params.get('include', '').split(','):
+            serializer_class = EmployeeSerializer
+        else:
+            employees = employees.defer(*PRIVATE_FIELDS)
+            serializer_class = EmployeeDirectorySerializer
+        return self.list_response(employees, serializer_class)
 
     def post(self, request):
         serializer = EmployeeSerializer(data=request.data)
@@ -35,4 +64,48 @@ class EmployeeAPIView(APIView):
     def delete(self, request, pk):
         employee = get_object_or_404(Employee, pk=pk)
         employee.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PayrollRunAPIView(IndexedListMixin, APIView):
+    """
+    GET  /employees/payroll/runs/                         runs, newest first
+    GET  /employees/payroll/runs/<pk>/                    totals of one run
+    POST /employees/payroll/runs/ {"month": "2025-06"}    compute a run (?replace=1 recomputes it)
+    """
+    list_model = PayrollRun
+    default_ordering = ('-period',)
+
+    def get(self, request, pk=None):
+        if pk:
+            return Response(PayrollRunSerializer(get_object_or_404(PayrollRun, pk=pk)).data)
+        return self.list_response(PayrollRun.objects.all(), PayrollRunSerializer)
+
+    def post(self, request):
+        period, _ = month_param(request.data, required=True)
+        replace = request.query_params.get('replace') in ('1', 'true')
+        try:
+            run = payroll.run_payroll(period, replace=replace)
+        except payroll.PayrollError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(PayrollRunSerializer(run).data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, pk):
+        get_object_or_404(PayrollRun, pk=pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PayrollLineAPIView(IndexedListMixin, APIView):
+    """
+    Lines of a payroll run by employee name.
+    Example: /employees/payroll/runs/3/lines/?page_size=500&cursor=<opaque>
+    """
+    list_model = PayrollLine
+    default_ordering = ('employee_name', 'id')
+    index_prefix = ('run',)
+    page_size = 100
+    max_page_size = 1000
+
+    def get(self, request, pk):
+        run = get_object_or_404(PayrollRun, pk=pk)
+        return self.list_response(run.lines.all(), PayrollLineSerializer)
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from fournisseurs.models import Fournisseur
+from gestion.duplicates import find_duplicates
+
+
+class Command(BaseCommand):
+    help = "List groups of suppliers that look like duplicates (same tax ID or similar name)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=0.88, help="Name similarity ratio (0-1).")
+        parser.add_argument('--json', action='store_true', help="Print the groups as JSON.")
+
+    def handle(self, *args, **options):
+        rows = Fournisseur.objects.values_list('id', 'nom', 'matricule_fiscal_normalized')
+        groups = find_duplicates(rows.iterator(chunk_size=5000), threshold=options['threshold'])
+        if options['json']:
+            self.stdout.write(json.dumps(groups))
+            return
+
+        names = dict(Fournisseur.objects.filter(pk__in={pk for g in groups for pk in g['ids']}).values_list('id', 'nom'))
+        for group in groups:
+            members = ', '.join(f"#{pk} {names.get(pk)}" for pk in group['ids'])
+            self.stdout.write(f"[{'/'.join(group['reasons'])}] {members}")
+        self.stdout.write(self.style.SUCCESS(f"{len(groups)} duplicate group(s) found."))
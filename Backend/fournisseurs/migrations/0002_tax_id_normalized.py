@@ -0,0 +1,38 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:45
+
+import re
+
+from django.db import migrations, models
+
+_TAX_ID_SEPARATORS = re.compile(r'[\s/\-.]+')
+
+
+def normalize_tax_id(value):
+    # Frozen copy of gestion.normalization.normalize_tax_id as of this migration.
+    if not value:
+        return ''
+    return _TAX_ID_SEPARATORS.sub('', value).upper()
+
+
+def populate_normalized(apps, schema_editor):
+    Fournisseur = apps.get_model('fournisseurs', 'Fournisseur')
+    rows = list(Fournisseur.objects.only('id', 'matricule_fiscal'))
+    for row in rows:
+        row.matricule_fiscal_normalized = normalize_tax_id(row.matricule_fiscal)
+    Fournisseur.objects.bulk_update(rows, ['matricule_fiscal_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fournisseurs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fournisseur',
+            name='matricule_fiscal_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50),
+        ),
+        migrations.RunPython(populate_normalized, migrations.RunPython.noop),
+    ]
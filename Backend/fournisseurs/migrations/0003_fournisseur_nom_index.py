@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fournisseurs', '0002_tax_id_normalized'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fournisseur',
+            index=models.Index(fields=['nom', 'id'], name='fournisseurs_nom_id_idx'),
+        ),
+    ]
@@ -1,12 +1,27 @@
 from django.db import models
 
+from gestion.normalization import normalize_tax_id
+
 class Fournisseur(models.Model):
     nom = models.CharField(max_length=255)
     matricule_fiscal = models.CharField(max_length=50, unique=True)
+    matricule_fiscal_normalized = models.CharField(max_length=50, blank=True, db_index=True, editable=False)
     adresse = models.TextField(blank=True, null=True)
     telephone = models.CharField(max_length=20, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['nom', 'id'], name='fournisseurs_nom_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nom} - {self.matricule_fiscal}"
 
+    def save(self, *args, **kwargs):
+        self.matricule_fiscal_normalized = normalize_tax_id(self.matricule_fiscal)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'matricule_fiscal' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'matricule_fiscal_normalized'}
+        super().save(*args, **kwargs)
+
@@ -5,3 +5,17 @@ class FournisseurSerializer(serializers.ModelSerializer):
     class Meta:
         model = Fournisseur
         fields = '__all__'
+
+
+
+class FournisseurSpendSerializer(FournisseurSerializer):
+    total_spend = serializers.DecimalField(max_digits=18, decimal_places=2, read_only=True)
+    line_count = serializers.IntegerField(read_only=True)
+
+
+SPEND_AMOUNT = serializers.DecimalField(max_digits=18, decimal_places=2, read_only=True)
+
+
+def spend_amount(value):
+    """A spend amount rendered like total_spend above: a string with two decimals."""
+    return SPEND_AMOUNT.to_representation(value)
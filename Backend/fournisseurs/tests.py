@@ -1,3 +1,38 @@
+from datetime import date
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from stock.models import Article, Document
+from .models import Fournisseur
+
+
+class FournisseurSpendTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='manager'))
+        self.fournisseur = Fournisseur.objects.create(nom='Alpha', matricule_fiscal='1')
+        document = Document.objects.create(date=date(2025, 6, 3), fournisseur=self.fournisseur, type='FACTURE')
+        Article.objects.create(document=document, quantite=3, prix_unitaire='12.50')
+
+    def test_spend_amounts_are_strings(self):
+        data = self.client.get(f'/fournisseurs/{self.fournisseur.pk}/spend/').json()
+        self.assertEqual(data['total'], '37.50')
+        self.assertEqual(data['months'], [
+            {'month': '2025-06', 'total': '37.50', 'FACTURE': {'amount': '37.50', 'line_count': 1}},
+        ])
+        listed = self.client.get('/fournisseurs/').json()['results']
+        self.assertEqual(listed[0]['total_spend'], '37.50')
+
 
-# Create your tests here.
+class FournisseurLookupTests(TestCase):
+    def test_lookup_normalizes_tax_ids(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='manager'))
+        fournisseur = Fournisseur.objects.create(nom='Alpha', matricule_fiscal='0001234/b/n/000')
+        self.assertEqual(fournisseur.matricule_fiscal_normalized, '0001234BN000')
+        response = client.post('/fournisseurs/lookup/', {'tax_ids': ['0001234 B N 000']}, format='json')
+        self.assertEqual(response.json()['results'], {
+            '0001234 B N 000': [{'id': fournisseur.pk, 'nom': 'Alpha', 'matricule_fiscal': '0001234/b/n/000'}],
+        })
@@ -2,15 +2,81 @@ from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
+from django.db.models import Sum, Value
+from django.db.models.functions import Coalesce
+from gestion.normalization import resolve_tax_ids
+from gestion.serializers import TaxIdLookupSerializer
+from stock import spend
+from stock.models import SupplierSpendRollup
 from .models import Fournisseur
-from .serializers import FournisseurSerializer
+from .serializers import FournisseurSerializer, FournisseurSpendSerializer, spend_amount
+
+
+def annotate_spend(fournisseurs, params):
+    """total_spend and line_count from the spend rollups, restricted by ?from=&to=&type=."""
+    condition = spend.rollup_filter(params, prefix='spend_rollups__')
+    return fournisseurs.annotate(
+        total_spend=Coalesce(Sum('spend_rollups__amount', filter=condition), Value(spend.ZERO)),
+        line_count=Coalesce(Sum('spend_rollups__line_count', filter=condition), Value(0)),
+    )
+
 
 class FournisseurViewSet(viewsets.ModelViewSet):
     queryset = Fournisseur.objects.all()
     serializer_class = FournisseurSerializer
+    ordering_fields = {'nom': 'nom', 'total_spend': 'total_spend'}
+    default_ordering = ('nom', 'id')
+    computed_fields = ('total_spend',)
+
+    def get_queryset(self):
+        if self.action != 'list':
+            return Fournisseur.objects.all()
+        # One grouped query over the rollups, e.g. ?ordering=-total_spend&from=2025-01&type=FACTURE
+        return annotate_spend(Fournisseur.objects.all(), self.request.query_params)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return FournisseurSpendSerializer
+        return FournisseurSerializer
 
     @action(detail=False, methods=['get'])
     def count(self, request):
         total = Fournisseur.objects.count()
         return Response({"total_fournisseurs": total})
 
+    @action(detail=False, methods=['post'])
+    def lookup(self, request):
+        """Resolve a batch of matricules fiscaux to existing suppliers in one query."""
+        serializer = TaxIdLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = resolve_tax_ids(
+            Fournisseur.objects.all(), 'matricule_fiscal_normalized',
+            serializer.validated_data['tax_ids'], ('id', 'nom', 'matricule_fiscal'),
+        )
+        return Response({"results": results})
+
+    @action(detail=True, methods=['get'])
+    def spend(self, request, pk=None):
+        """Spend of one supplier by month and document type, ?from=YYYY-MM&to=YYYY-MM&type=."""
+        fournisseur = self.get_object()
+        rows = (
+            SupplierSpendRollup.objects.filter(fournisseur=fournisseur)
+            .filter(spend.rollup_filter(request.query_params))
+            .order_by('period', 'doc_type')
+            .values('period', 'doc_type', 'amount', 'line_count')
+        )
+        months = {}
+        for row in rows:
+            month = months.setdefault(row['period'], {'month': row['period'].strftime('%Y-%m'), 'total': spend.ZERO})
+            month[row['doc_type']] = {'amount': spend_amount(row['amount']), 'line_count': row['line_count']}
+            month['total'] += row['amount']
+        total = sum((month['total'] for month in months.values()), spend.ZERO)
+        for month in months.values():
+            month['total'] = spend_amount(month['total'])
+        return Response({
+            'fournisseur_id': fournisseur.pk,
+            'nom': fournisseur.nom,
+            'total': spend_amount(total),
+            'months': list(months.values()),
+        })
+
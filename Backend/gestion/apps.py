@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class GestionConfig(AppConfig):
+    name = 'gestion'
+
+    def ready(self):
+        from . import checks  # noqa: F401
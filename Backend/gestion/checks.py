@@ -0,0 +1,121 @@
+"""
+System check: every filter and ordering field a list view declares must be
+backed by an index (see gestion.listing).
+
+A field is covered when it is the primary key, unique, db_index (foreign
+keys included) or the leading column of a Meta.indexes entry, a unique
+constraint or unique_together. Columns listed in the view's
+``index_prefix`` may precede it, for lists always filtered on a parent.
+Only the leading ordering field is checked for an index, the fields after
+it (the id tie-break) follow it in the composite index.
+
+Every ordering field must also be NOT NULL, or listed in
+``non_null_fields`` when the view's queryset excludes NULLs: the cursor
+holds the value of each of them and compares rows with < and =, so rows
+with a NULL in any of them would never be reached.
+"""
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+from django.urls import get_resolver
+
+from .listing import lookup_field
+
+
+def _views(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from _views(pattern.url_patterns)
+            continue
+        view = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+        if view is not None:
+            yield view
+
+
+def _list_model(view):
+    model = getattr(view, 'list_model', None)
+    if model is None and getattr(view, 'queryset', None) is not None:
+        model = view.queryset.model
+    return model
+
+
+def _index_columns(model):
+    """Column lists of every composite index and unique set of ``model``."""
+    meta = model._meta
+    columns = [[name.lstrip('-') for name in index.fields] for index in meta.indexes]
+    columns += [list(constraint.fields) for constraint in meta.constraints if getattr(constraint, 'fields', None)]
+    columns += [list(fields) for fields in meta.unique_together]
+    return columns
+
+
+def is_indexed(model, field, prefix=()):
+    if field.primary_key or field.unique or field.db_index:
+        return True
+    for columns in _index_columns(model):
+        for position, name in enumerate(columns):
+            if name == field.name:
+                if set(columns[:position]) <= set(prefix):
+                    return True
+                break
+    return False
+
+
+def _declared_fields(view):
+    """(label, lookup) pairs the view lets clients filter and sort on."""
+    for name, lookup in (getattr(view, 'filter_fields', None) or {}).items():
+        yield f"filter '{name}'", lookup
+    for name, field in (getattr(view, 'ordering_fields', None) or {}).items():
+        yield f"ordering '{name}'", field
+    for position, field in enumerate(getattr(view, 'default_ordering', None) or ()):
+        yield ('default_ordering' if position == 0 else f'default_ordering[{position}]'), field.lstrip('-')
+
+
+def _is_ordering(label):
+    return not label.startswith('filter')
+
+
+def _needs_index(label):
+    return not label.startswith('default_ordering[')
+
+
+@checks.register('listing')
+def check_list_indexes(app_configs=None, **kwargs):
+    errors = []
+    for view in set(_views(get_resolver().url_patterns)):
+        declared = list(_declared_fields(view))
+        if not declared:
+            continue
+        model = _list_model(view)
+        if model is None:
+            errors.append(checks.Error(
+                f"{view.__name__} declares list fields but no list_model or queryset.",
+                obj=view, id='gestion.E002',
+            ))
+            continue
+        computed = set(getattr(view, 'computed_fields', None) or ())
+        prefix = tuple(getattr(view, 'index_prefix', None) or ())
+        non_null = set(getattr(view, 'non_null_fields', None) or ())
+        for label, lookup in declared:
+            if lookup in computed:
+                continue
+            try:
+                field_model, field = lookup_field(model, lookup)
+            except FieldDoesNotExist:
+                errors.append(checks.Error(
+                    f"{view.__name__}: {label} refers to unknown field '{lookup}' of {model.__name__}.",
+                    obj=view, id='gestion.E003',
+                ))
+                continue
+            if _needs_index(label) and not is_indexed(field_model, field, prefix if field_model is model else ()):
+                errors.append(checks.Error(
+                    f"{view.__name__}: {label} ('{lookup}') is not the leading column of an index "
+                    f"on {field_model.__name__}.",
+                    hint="Add a Meta.indexes entry starting with this field, or drop it from the view.",
+                    obj=view, id='gestion.E001',
+                ))
+            if _is_ordering(label) and field.null and lookup not in non_null:
+                errors.append(checks.Error(
+                    f"{view.__name__}: {label} ('{lookup}') is nullable and cannot key a cursor.",
+                    hint="Order on a NOT NULL field, or on a Coalesce() annotation listed in computed_fields.",
+                    obj=view, id='gestion.E004',
+                ))
+    return errors
@@ -0,0 +1,90 @@
+"""
+Near-linear duplicate detection for clients and suppliers.
+
+Records sharing a normalized tax ID are grouped directly. Names are only
+compared inside small blocks of records sharing a name-token prefix, so the
+number of comparisons grows with the data instead of with its square.
+"""
+from difflib import SequenceMatcher
+
+from .normalization import normalize_name
+
+BLOCK_PREFIX = 4
+MIN_TOKEN = 3
+# Prefixes shared by more records than this ("tuni", "inte"...) say nothing.
+MAX_BLOCK_SIZE = 200
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def find_duplicates(records, threshold=0.88, max_block_size=MAX_BLOCK_SIZE):
+    """
+    ``records`` is an iterable of (id, name, normalized tax id).
+    Returns a list of groups, each {'ids': [...], 'reasons': {...}}.
+    """
+    names = {}
+    by_tax_id = {}
+    blocks = {}
+    for pk, name, tax_key in records:
+        normalized = normalize_name(name)
+        names[pk] = normalized
+        if tax_key:
+            by_tax_id.setdefault(tax_key, []).append(pk)
+        for token in set(normalized.split()):
+            if len(token) >= MIN_TOKEN:
+                blocks.setdefault(token[:BLOCK_PREFIX], []).append(pk)
+
+    groups = _UnionFind()
+    reasons = {}
+
+    for tax_key, ids in by_tax_id.items():
+        for pk in ids[1:]:
+            groups.union(ids[0], pk)
+            reasons[(ids[0], pk)] = 'tax_id'
+
+    compared = set()
+    matcher = SequenceMatcher(autojunk=False)
+    for ids in blocks.values():
+        if len(ids) < 2 or len(ids) > max_block_size:
+            continue
+        for i, a in enumerate(ids):
+            matcher.set_seq2(names[a])
+            for b in ids[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                matcher.set_seq1(names[b])
+                if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold \
+                        and matcher.ratio() >= threshold:
+                    groups.union(a, b)
+                    reasons.setdefault(pair, 'name')
+
+    members = {}
+    for pk in list(groups.parent):
+        members.setdefault(groups.find(pk), []).append(pk)
+    kinds = {}
+    for pair, reason in reasons.items():
+        kinds.setdefault(groups.find(next(iter(pair))), set()).add(reason)
+
+    result = []
+    for root, ids in members.items():
+        if len(ids) < 2:
+            continue
+        result.append({'ids': sorted(ids), 'reasons': sorted(kinds.get(root, ()))})
+    result.sort(key=lambda group: group['ids'][0])
+    return result
@@ -0,0 +1,251 @@
+"""
+Shared list layer: keyset pagination with whitelisted filters and ordering.
+
+A list view declares what may be filtered and sorted on:
+
+    class ToolAPIView(IndexedListMixin, APIView):
+        list_model = Tool
+        filter_fields = {'location': 'location'}           # ?location=...  -> .filter(location=...)
+        ordering_fields = {'name': 'name'}                  # ?ordering=-name
+        default_ordering = ('name', 'id')
+
+and answers with ``self.list_response(queryset, serializer_class)``. Router
+viewsets get the same behaviour from DEFAULT_PAGINATION_CLASS and
+DEFAULT_FILTER_BACKENDS and declare the same attributes (their model comes
+from ``queryset``). The gestion.E001 system check (gestion.checks) rejects
+a declared field that does not lead an index, so a list never falls back to
+a full scan and sort.
+"""
+import datetime
+import json
+import operator
+from decimal import Decimal
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import models
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import Cursor, CursorPagination
+
+from .periods import date_param
+
+TRUE_VALUES = ('1', 'true', 'True')
+FALSE_VALUES = ('0', 'false', 'False')
+
+
+def lookup_field(model, lookup):
+    """(model, field) named by the leading path of ``lookup``, e.g. 'hire_date__gte' -> (Employee, hire_date)."""
+    field = None
+    for part in lookup.split(LOOKUP_SEP):
+        target = model
+        if field is not None:
+            if not field.is_relation:
+                break
+            target = field.related_model
+        try:
+            candidate = target._meta.pk if part == 'pk' else target._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        model, field = target, candidate
+    if field is None:
+        raise FieldDoesNotExist(f"{model.__name__} has no field for lookup '{lookup}'")
+    return model, field
+
+
+def filter_value(field, params, name):
+    """Convert the query parameter ``name`` for ``field``, 400 on malformed input."""
+    value = params.get(name).strip()
+    if isinstance(field, models.DateField) and not isinstance(field, models.DateTimeField):
+        return date_param(params, name)
+    if isinstance(field, models.BooleanField):
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        raise ValidationError({name: f"Booléen invalide: {value}"})
+    if field.choices and value not in dict(field.flatchoices):
+        raise ValidationError({name: f"Valeur non supportée: {value}"})
+    try:
+        return field.to_python(value)
+    except DjangoValidationError:
+        raise ValidationError({name: f"Valeur invalide: {value}"})
+
+
+def apply_filters(queryset, params, filter_fields):
+    """Apply every whitelisted filter present in ``params`` (query parameter -> ORM lookup)."""
+    for name, lookup in filter_fields.items():
+        if not (params.get(name) or '').strip():
+            continue
+        _, field = lookup_field(queryset.model, lookup)
+        queryset = queryset.filter(**{lookup: filter_value(field, params, name)})
+    return queryset
+
+
+def with_tiebreak(ordering):
+    """Append id to ``ordering`` so the order is total and no two rows share a cursor position."""
+    ordering = tuple(ordering)
+    if ordering[-1].lstrip('-') in ('id', 'pk'):
+        return ordering
+    return ordering + (('-' if ordering[-1].startswith('-') else '') + 'id',)
+
+
+def _flip(field):
+    return field[1:] if field.startswith('-') else '-' + field
+
+
+def keyset_filter(ordering, position):
+    """
+    Rows strictly after ``position`` (one value per field of ``ordering``):
+    (a > x) OR (a = x AND b > y) OR ..., behind a range on the first field so
+    the index scan starts at the position.
+    """
+    equal = {}
+    branches = []
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        branches.append(Q(**equal, **{f"{name}__{'lt' if field.startswith('-') else 'gt'}": value}))
+        equal[name] = value
+    first = ordering[0]
+    start = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+    return start & reduce(operator.or_, branches)
+
+
+def _position_value(instance, field):
+    value = instance
+    for part in field.lstrip('-').split(LOOKUP_SEP):
+        value = value[part] if isinstance(value, dict) else getattr(value, part)
+    if isinstance(value, (datetime.date, datetime.time)):
+        # Full precision, DjangoJSONEncoder would cut microseconds.
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class IndexedCursorPagination(CursorPagination):
+    """
+    Keyset pagination for every list endpoint. The view may set ``page_size``,
+    ``max_page_size`` and ``default_ordering``; ?ordering=<name> or -<name> is
+    restricted to its ``ordering_fields`` (public name -> field).
+    Example: /clients/?ordering=-name&page_size=100&cursor=<opaque>
+
+    DRF's CursorPagination positions on the first ordering field only and
+    skips rows that tie with it by offset. Here the cursor holds the value of
+    every ordering field of the last row (id included, see with_tiebreak) and
+    the next page is keyset_filter() on them, so ties cost nothing and a page
+    is one range scan of the matching composite index.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = getattr(view, 'page_size', None) or self.page_size
+        self.max_page_size = getattr(view, 'max_page_size', None) or self.max_page_size
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self._decode_position(self.cursor.position) if self.cursor else None
+
+        # A previous page is read backwards from its first row, then put back in order.
+        ordering = tuple(map(_flip, self.ordering)) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(keyset_filter(ordering, position))
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get('ordering')
+        if not value:
+            return with_tiebreak(getattr(view, 'default_ordering', None) or self.ordering)
+        field = (getattr(view, 'ordering_fields', None) or {}).get(value.lstrip('-'))
+        if field is None:
+            raise ValidationError({'ordering': f"Tri non supporté: {value}"})
+        prefix = '-' if value.startswith('-') else ''
+        return with_tiebreak((prefix + field,))
+
+    def _encode_position(self, instance):
+        return json.dumps([_position_value(instance, field) for field in self.ordering], separators=(',', ':'))
+
+    def _decode_position(self, encoded):
+        try:
+            position = json.loads(encoded)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            # Malformed, or made for another ordering.
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._encode_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self._encode_position(self.page[0])))
+
+
+class IndexedFilterBackend(BaseFilterBackend):
+    """Applies the view's ``filter_fields`` to router viewsets."""
+
+    def filter_queryset(self, request, queryset, view):
+        return apply_filters(queryset, request.query_params, getattr(view, 'filter_fields', None) or {})
+
+
+class IndexedListMixin:
+    """
+    List behaviour for hand-written APIViews.
+
+    ``list_model``        model the fields below belong to
+    ``filter_fields``     query parameter -> ORM lookup
+    ``ordering_fields``   ?ordering= name -> field
+    ``default_ordering``  ordering without ?ordering=, id is appended as tie-break
+    ``index_prefix``      fields always filtered on by equality (e.g. the parent
+                          from the URL), which may precede a field in its index
+    ``computed_fields``   annotations, exempt from the index check
+    ``non_null_fields``   nullable fields the view's queryset always filters on,
+                          so they can key the cursor
+    """
+    pagination_class = IndexedCursorPagination
+    list_model = None
+    filter_fields = {}
+    ordering_fields = {}
+    default_ordering = None
+    index_prefix = ()
+    computed_fields = ()
+    non_null_fields = ()
+
+    def filter_list(self, queryset):
+        return apply_filters(queryset, self.request.query_params, self.filter_fields)
+
+    def list_response(self, queryset, serializer_class, **serializer_kwargs):
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        return paginator.get_paginated_response(serializer_class(page, many=True, **serializer_kwargs).data)
@@ -0,0 +1,46 @@
+"""Normalization helpers shared by clients, fournisseurs and document search."""
+import re
+import unicodedata
+
+_TAX_ID_SEPARATORS = re.compile(r'[\s/\-.]+')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Legal forms carry no identity, "Ste Alpha SARL" and "Alpha" are the same name.
+LEGAL_FORMS = {
+    'sarl', 'sa', 'snc', 'scs', 'sca', 'suarl', 'eurl', 'ste', 'societe', 'ets', 'etablissement', 'etablissements',
+}
+
+
+def normalize_tax_id(value):
+    """'1234567/a/m/000 ' -> '1234567AM000'."""
+    if not value:
+        return ''
+    return _TAX_ID_SEPARATORS.sub('', value).upper()
+
+
+def text_tokens(value):
+    """Lowercase, accent-free alphanumeric tokens, in order."""
+    if not value:
+        return []
+    ascii_value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', ascii_value.lower()).split()
+
+
+def normalize_name(value):
+    """Lowercase, accent-free tokens without legal forms, joined by single spaces."""
+    return ' '.join(token for token in text_tokens(value) if token not in LEGAL_FORMS)
+
+
+def resolve_tax_ids(queryset, normalized_field, tax_ids, fields):
+    """
+    Resolve a batch of raw tax IDs against ``normalized_field`` in one query.
+    Returns {raw tax id: [matching rows as dicts]}, empty lists for unknown IDs.
+    """
+    keys = {raw: normalize_tax_id(raw) for raw in tax_ids}
+    matches = {}
+    wanted = {key for key in keys.values() if key}
+    if wanted:
+        rows = queryset.filter(**{f'{normalized_field}__in': wanted}).values(normalized_field, *fields)
+        for row in rows:
+            matches.setdefault(row.pop(normalized_field), []).append(row)
+    return {raw: matches.get(key, []) for raw, key in keys.items()}
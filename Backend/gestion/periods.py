@@ -0,0 +1,40 @@
+"""Parsing helpers for the date filters used by list and report endpoints."""
+import calendar
+import re
+from datetime import date
+
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+def month_bounds(value):
+    """Return (first day, last day) for a 'YYYY-MM' string, or None if malformed."""
+    match = re.fullmatch(r'(\d{4})-(\d{2})', value or '')
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def date_param(params, name):
+    """Parse an optional YYYY-MM-DD query parameter, 400 on malformed input."""
+    value = params.get(name)
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValidationError({name: "Date invalide, format attendu AAAA-MM-JJ."})
+    return parsed
+
+
+def month_param(params, name='month', required=False):
+    """Parse an optional YYYY-MM query parameter into (first day, last day)."""
+    value = params.get(name)
+    if not value and not required:
+        return None
+    bounds = month_bounds(value)
+    if bounds is None:
+        raise ValidationError({name: "Mois invalide, format attendu AAAA-MM."})
+    return bounds
@@ -0,0 +1,183 @@
+"""
+Per-request SQL profiling.
+
+SQLProfilingMiddleware counts and times the queries of a request through
+connection.execute_wrapper, groups them by shape (SQL with literals and
+IN lists folded) and times serializer output. A shape repeated
+SQL_PROFILING_REPEAT_THRESHOLD times or more is the N+1 signature of a
+serializer walking a relation row by row.
+
+With SQL_PROFILING off the middleware removes itself at startup and costs
+nothing. When it is on, SQL_PROFILING_SAMPLE_RATE of the requests are
+profiled and logged as one JSON line on the ``gestion.profiling`` logger.
+If SQL_PROFILING_HEADERS is set (default: DEBUG), every request is profiled
+and the figures are returned as X-SQL-* and Server-Timing headers. Queries
+run while a streaming response is consumed are not counted.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('gestion.profiling')
+
+_current = contextvars.ContextVar('gestion_sql_profile', default=None)
+
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'\((?:%s, )*%s\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_SELECT_LIST = re.compile(r'^SELECT .*? FROM ')
+
+
+def query_shape(sql):
+    """SQL with parameters, numbers and string literals folded, so repeated lookups compare equal."""
+    shape = _WHITESPACE.sub(' ', sql).strip()
+    shape = _IN_LIST.sub('(...)', shape)
+    shape = _QUOTED.sub('?', shape)
+    return _NUMBER.sub('?', shape)
+
+
+def shape_id(shape):
+    return hashlib.sha1(shape.encode('utf-8')).hexdigest()[:12]
+
+
+def shape_summary(shape, length=300):
+    """Shape without its column list, which hides the FROM and WHERE that identify it."""
+    return _SELECT_LIST.sub('SELECT ... FROM ', shape)[:length]
+
+
+class RequestProfile:
+    """Queries and serializer time of one request. Used as the execute wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.shapes = Counter()
+        self.serializer_time = 0.0
+        self.serializer_queries = 0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.shapes[query_shape(sql)] += 1
+            if self.serializing:
+                self.serializer_queries += 1
+
+    def repeated(self, threshold):
+        """[(shape, count)] run at least ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def _profiled_data(fget):
+    @wraps(fget)
+    def data(serializer):
+        profile = _current.get()
+        # Only the outermost .data is timed, nested serializers are part of it.
+        if profile is None or profile.serializing:
+            return fget(serializer)
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return fget(serializer)
+        finally:
+            profile.serializer_time += time.perf_counter() - started
+            profile.serializing = False
+    data.profiled = True
+    return data
+
+
+def instrument_serializers():
+    """Time BaseSerializer.data, which every Serializer and ListSerializer goes through."""
+    prop = BaseSerializer.data
+    if not getattr(prop.fget, 'profiled', False):
+        BaseSerializer.data = property(_profiled_data(prop.fget))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class SQLProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'SQL_PROFILING_SAMPLE_RATE', 0.01)
+        self.threshold = getattr(settings, 'SQL_PROFILING_REPEAT_THRESHOLD', 5)
+        self.headers = getattr(settings, 'SQL_PROFILING_HEADERS', settings.DEBUG)
+        instrument_serializers()
+
+    def __call__(self, request):
+        sampled = random.random() < self.sample_rate
+        if not (sampled or self.headers):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        repeated = profile.repeated(self.threshold)
+        if self.headers:
+            self.add_headers(response, profile, repeated)
+        if sampled or (self.headers and repeated):
+            self.log(request, response, profile, repeated, elapsed)
+        return response
+
+    def add_headers(self, response, profile, repeated):
+        response['X-SQL-Queries'] = str(profile.queries)
+        response['X-SQL-Time-Ms'] = str(_ms(profile.sql_time))
+        response['X-Serializer-Time-Ms'] = str(_ms(profile.serializer_time))
+        response['X-Serializer-Queries'] = str(profile.serializer_queries)
+        if repeated:
+            response['X-SQL-Repeated'] = ', '.join(f"{shape_id(shape)}={count}" for shape, count in repeated[:5])
+        response['Server-Timing'] = (
+            f'sql;dur={_ms(profile.sql_time)};desc="{profile.queries} queries", '
+            f'serializer;dur={_ms(profile.serializer_time)}'
+        )
+
+    def log(self, request, response, profile, repeated, elapsed):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': _ms(elapsed),
+            'queries': profile.queries,
+            'sql_ms': _ms(profile.sql_time),
+            'serializer_ms': _ms(profile.serializer_time),
+            'serializer_queries': profile.serializer_queries,
+            'distinct_shapes': len(profile.shapes),
+            'repeated': [
+                {'id': shape_id(shape), 'count': count, 'sql': shape_summary(shape)}
+                for shape, count in repeated[:5]
+            ],
+        }
+        level = logging.WARNING if repeated else logging.INFO
+        logger.log(level, json.dumps(record))
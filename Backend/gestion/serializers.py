@@ -0,0 +1,8 @@
+"""Serializers shared by several apps."""
+from rest_framework import serializers
+
+
+class TaxIdLookupSerializer(serializers.Serializer):
+    tax_ids = serializers.ListField(
+        child=serializers.CharField(max_length=50), allow_empty=False, max_length=1000,
+    )
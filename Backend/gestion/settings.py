@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 from datetime import timedelta
 import dj_database_url
 
@@ -30,6 +31,7 @@ INSTALLED_APPS = [
     'tools',
     'stock',
     'employees',
+    'gestion',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -41,6 +43,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # must be top
     'django.middleware.security.SecurityMiddleware',
+    'gestion.profiling.SQLProfilingMiddleware',  # removes itself unless SQL_PROFILING
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -52,8 +55,62 @@ MIDDLEWARE = [
 # REST framework + JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+        "accounts.authentication.CachedJWTAuthentication",
+    ),
+    # Every list is cursor paginated and filtered through gestion.listing.
+    # This bounds each request only: the frontend screens that search and
+    # page client-side still walk every page (frontend/src/lib/fetch-all.ts).
+    "DEFAULT_PAGINATION_CLASS": "gestion.listing.IndexedCursorPagination",
+    "DEFAULT_FILTER_BACKENDS": (
+        "gestion.listing.IndexedFilterBackend",
+    ),
+}
+
+# Pre-defined application users, see accounts.credentials. Only password
+# digests are kept (django.contrib.auth.hashers format). Replace them with
+# PREDEFINED_USERS="username:role:digest,..." in the environment.
+PREDEFINED_USERS = {
+    'admin': {
+        'role': 'admin',
+        'password': 'pbkdf2_sha256$390000$vl7xrKFjBOlKqDO66s4VWs$rgxDh7C7vipS9CM7MmPB5i0kW8HUJBRjxljmhq/ZbCQ=',
+    },
+    'manager': {
+        'role': 'manager',
+        'password': 'pbkdf2_sha256$390000$Wjo2kUkbyTm67sWhur3tkA$nhJM5gTVU/osRx3jgB8Bqvak0UjXgu5ieuwk80wAzKY=',
+    },
+    'stock': {
+        'role': 'stock',
+        'password': 'pbkdf2_sha256$390000$G11dXKphpDDtEFE09M7U2T$x/8meGf1WGykPqojKlf1875Z+9/a0xxn4mNd0yycWos=',
+    },
+}
+if os.getenv('PREDEFINED_USERS'):
+    PREDEFINED_USERS = {
+        username: {'role': role, 'password': digest}
+        for username, role, digest in (
+            entry.strip().split(':', 2) for entry in os.environ['PREDEFINED_USERS'].split(',') if entry.strip()
+        )
+    }
+
+# Disk cache of rendered withholding-tax certificates, see taxes.certificates.
+TAX_CERTIFICATE_DIR = os.environ.get(
+    'TAX_CERTIFICATE_DIR', os.path.join(tempfile.gettempdir(), 'gestion', 'tax-certificates')
+)
+
+# Per-request SQL profiling, see gestion.profiling
+SQL_PROFILING = os.environ.get('SQL_PROFILING', 'False') == 'True'
+SQL_PROFILING_SAMPLE_RATE = float(os.environ.get('SQL_PROFILING_SAMPLE_RATE', '0.01'))
+SQL_PROFILING_REPEAT_THRESHOLD = 5
+SQL_PROFILING_HEADERS = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'gestion.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 SIMPLE_JWT = {
@@ -0,0 +1,166 @@
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import include, path
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from employees.models import PayrollLine
+from tools.models import Tool
+from .checks import check_list_indexes
+from .listing import IndexedListMixin
+from .profiling import query_shape
+
+
+class ToolDescriptionList(IndexedListMixin, APIView):
+    list_model = Tool
+    filter_fields = {'description': 'description'}
+
+
+class UnknownModelList(IndexedListMixin, APIView):
+    filter_fields = {'name': 'name'}
+
+
+class UnknownFieldList(IndexedListMixin, APIView):
+    list_model = Tool
+    ordering_fields = {'brand': 'brand'}
+
+
+class NullableOrderingList(IndexedListMixin, APIView):
+    list_model = Tool
+    default_ordering = ('next_maintenance_due', 'id')
+
+
+class DueToolList(NullableOrderingList):
+    non_null_fields = ('next_maintenance_due',)
+
+
+class LinesWithoutRunList(IndexedListMixin, APIView):
+    list_model = PayrollLine
+    default_ordering = ('employee_name', 'id')
+
+
+class RunLinesList(LinesWithoutRunList):
+    index_prefix = ('run',)
+
+
+class ToolList(IndexedListMixin, APIView):
+    list_model = Tool
+    filter_fields = {'location': 'location'}
+    ordering_fields = {'name': 'name', 'due': 'next_maintenance_due'}
+    default_ordering = ('name', 'id')
+
+
+views = [
+    ToolDescriptionList, UnknownModelList, UnknownFieldList, NullableOrderingList, DueToolList,
+    LinesWithoutRunList, RunLinesList, ToolList,
+]
+
+
+def tool_by_tool(request):
+    # The N+1 shape: one lookup per row.
+    for tool in Tool.objects.all():
+        Tool.objects.filter(pk=tool.pk).exists()
+    return HttpResponse()
+
+
+urlpatterns = [path(f'{view.__name__}/', view.as_view()) for view in views] + [
+    path('tool_by_tool/', tool_by_tool),
+    path('tools/', include('tools.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ListIndexCheckTests(SimpleTestCase):
+    def test_errors(self):
+        errors = {(error.obj.__name__, error.id) for error in check_list_indexes()}
+        self.assertEqual(errors, {
+            ('ToolDescriptionList', 'gestion.E001'),
+            ('UnknownModelList', 'gestion.E002'),
+            ('UnknownFieldList', 'gestion.E003'),
+            ('NullableOrderingList', 'gestion.E004'),
+            ('LinesWithoutRunList', 'gestion.E001'),
+            # ordering_fields may name a nullable field too.
+            ('ToolList', 'gestion.E004'),
+        })
+
+    @override_settings(ROOT_URLCONF='gestion.urls')
+    def test_project_lists_are_indexed(self):
+        self.assertEqual(check_list_indexes(), [])
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='manager'))
+        # Many ties on name: the cursor must carry the id as well.
+        names = ['Cle', 'Cle', 'Cle', 'Etau', 'Etau', 'Pince', 'Cle', 'Scie']
+        self.tools = [Tool.objects.create(name=name, location='Atelier') for name in names]
+
+    def walk(self, url, link='next'):
+        pages = []
+        while url:
+            page = self.client.get(url).json()
+            pages.append([tool['id'] for tool in page['results']])
+            url = page[link]
+        return pages
+
+    def test_forwards_and_backwards_over_ties(self):
+        expected = [tool.pk for tool in sorted(self.tools, key=lambda tool: (tool.name, tool.pk))]
+        pages = self.walk('/tools/?page_size=3')
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+
+        last = self.client.get('/tools/?page_size=3').json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+        backwards = self.walk(last['previous'], link='previous')
+        self.assertEqual(backwards, pages[-2::-1])
+
+    def test_descending_order_and_filters(self):
+        expected = [tool.pk for tool in sorted(self.tools, key=lambda tool: (tool.name, tool.pk), reverse=True)]
+        self.assertEqual(sum(self.walk('/tools/?page_size=2&ordering=-name'), []), expected)
+        self.assertEqual(self.walk('/tools/?location=Ailleurs'), [[]])
+
+    def test_invalid_cursor_and_ordering(self):
+        self.assertEqual(self.client.get('/tools/?cursor=garbage').status_code, 404)
+        self.assertEqual(self.client.get('/tools/?ordering=description').status_code, 400)
+
+
+@override_settings(
+    ROOT_URLCONF=__name__, SQL_PROFILING=True, SQL_PROFILING_HEADERS=True, SQL_PROFILING_SAMPLE_RATE=0,
+    SQL_PROFILING_REPEAT_THRESHOLD=5,
+)
+class SQLProfilingTests(TestCase):
+    def setUp(self):
+        # The middleware is set up with the client's handler, under the settings above.
+        self.client = APIClient()
+
+    def test_query_shape(self):
+        self.assertEqual(
+            query_shape("SELECT  a FROM t WHERE id = 12 AND name = 'l''atelier' AND k IN (%s, %s, %s)"),
+            "SELECT a FROM t WHERE id = ? AND name = ? AND k IN (...)",
+        )
+
+    def test_headers_and_repeated_shapes(self):
+        for name in ('Cle', 'Etau', 'Pince', 'Scie', 'Marteau'):
+            Tool.objects.create(name=name)
+        with self.assertLogs('gestion.profiling', 'WARNING') as logs:
+            response = self.client.get('/tool_by_tool/')
+        self.assertEqual(response['X-SQL-Queries'], '6')
+        self.assertRegex(response['X-SQL-Repeated'], r'^[0-9a-f]{12}=5$')
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertIn('"count": 5', logs.output[0])
+
+    def test_serializer_time_and_queries(self):
+        self.client.force_authenticate(User.objects.create(username='manager'))
+        Tool.objects.bulk_create([Tool(name=f'Outil {number}') for number in range(50)])
+        with self.assertNoLogs('gestion.profiling', 'WARNING'):
+            response = self.client.get('/tools/')
+        self.assertNotIn('X-SQL-Repeated', response)
+        self.assertEqual(response['X-Serializer-Queries'], '0')
+        self.assertGreater(float(response['X-Serializer-Time-Ms']), 0)
+
+    @override_settings(SQL_PROFILING=False)
+    def test_off_by_default(self):
+        self.assertNotIn('X-SQL-Queries', APIClient().get('/tool_by_tool/'))
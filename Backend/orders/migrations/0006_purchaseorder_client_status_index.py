@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_purchaseorderproduct_total_ht_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['client', 'status'], name='orders_po_client_status_idx'),
+        ),
+    ]
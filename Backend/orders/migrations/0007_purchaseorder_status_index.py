@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_purchaseorder_client_status_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['status', 'id'], name='orders_po_status_id_idx'),
+        ),
+    ]
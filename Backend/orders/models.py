@@ -53,6 +53,10 @@ class PurchaseOrder(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Bon de commande'
         verbose_name_plural = 'Bons de commande'
+        indexes = [
+            models.Index(fields=['client', 'status'], name='orders_po_client_status_idx'),
+            models.Index(fields=['status', 'id'], name='orders_po_status_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.reference} - {self.client.name}"
@@ -1,25 +1,39 @@
 # views.py
-from django.db.models import Sum, Count
+from django.db.models import Count, Prefetch, Sum
 from django.db.models.functions import TruncMonth
 from django.shortcuts import render, get_object_or_404
 from django.utils.timezone import now
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from gestion.listing import IndexedListMixin
 from .models import PurchaseOrder, PurchaseOrderProduct
 from .serializers import PurchaseOrderSerializer, PurchaseOrderProductSerializer
 
 
-class PurchaseOrderAPIView(APIView):
+def with_items(orders):
+    """Load client, items and item products with the orders, as PurchaseOrderSerializer reads them."""
+    return orders.select_related('client').prefetch_related(
+        Prefetch('items', queryset=PurchaseOrderProduct.objects.select_related('product').order_by('id'))
+    )
+
+
+class PurchaseOrderAPIView(IndexedListMixin, APIView):
+    """Example: /orders/?client=4&status=CONFIRMED"""
+    list_model = PurchaseOrder
+    filter_fields = {'client': 'client', 'status': 'status'}
+    # Newest first. created_at is nullable on old rows, so the cursor runs on id.
+    ordering_fields = {'id': 'id'}
+    default_ordering = ('-id',)
+
     def get(self, request, pk=None):
         if pk:
-            order = get_object_or_404(PurchaseOrder, pk=pk)
+            order = get_object_or_404(with_items(PurchaseOrder.objects.all()), pk=pk)
             serializer = PurchaseOrderSerializer(order)
             return Response(serializer.data)
 
-        orders = PurchaseOrder.objects.all()
-        serializer = PurchaseOrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        orders = with_items(self.filter_list(PurchaseOrder.objects.all()))
+        return self.list_response(orders, PurchaseOrderSerializer)
 
     def post(self, request):
         serializer = PurchaseOrderSerializer(data=request.data)
@@ -42,16 +56,18 @@ class PurchaseOrderAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class PurchaseOrderProductAPIView(APIView):
+class PurchaseOrderProductAPIView(IndexedListMixin, APIView):
+    list_model = PurchaseOrderProduct
+    default_ordering = ('id',)
+
     def get(self, request, order_pk, pk=None):
         if pk:
             item = get_object_or_404(PurchaseOrderProduct, pk=pk, order_id=order_pk)
             serializer = PurchaseOrderProductSerializer(item)
             return Response(serializer.data)
 
-        items = PurchaseOrderProduct.objects.filter(order_id=order_pk)
-        serializer = PurchaseOrderProductSerializer(items, many=True)
-        return Response(serializer.data)
+        items = PurchaseOrderProduct.objects.filter(order_id=order_pk).select_related('product')
+        return self.list_response(items, PurchaseOrderProductSerializer)
 
     def post(self, request, order_pk):
         request.data['order'] = order_pk
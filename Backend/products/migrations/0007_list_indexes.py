@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_alter_product_prix_unit'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name', 'id'], name='products_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['code', 'id'], name='products_code_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productcategory',
+            index=models.Index(fields=['name', 'id'], name='products_category_name_idx'),
+        ),
+    ]
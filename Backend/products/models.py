@@ -7,6 +7,11 @@ class ProductCategory(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='products_category_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -30,5 +35,11 @@ class Product(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='products_name_id_idx'),
+            models.Index(fields=['code', 'id'], name='products_code_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.category})" if self.category else self.name
\ No newline at end of file
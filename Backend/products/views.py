@@ -4,20 +4,27 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from gestion.listing import IndexedListMixin
 from .models import Product, ProductCategory
 from .serializers import ProductSerializer, ProductCategorySerializer
 
 
-class ProductAPIView(APIView):
+class ProductAPIView(IndexedListMixin, APIView):
+    """Example: /products/?category=2&ordering=-name&page_size=100"""
+    list_model = Product
+    filter_fields = {'category': 'category', 'code': 'code'}
+    # ?ordering=-id lists the newest products first (dashboard).
+    ordering_fields = {'name': 'name', 'id': 'id'}
+    default_ordering = ('name', 'id')
+
     def get(self, request, pk=None):
         if pk:
             product = get_object_or_404(Product, pk=pk)
             serializer = ProductSerializer(product)
             return Response(serializer.data)
 
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        products = self.filter_list(Product.objects.select_related('category'))
+        return self.list_response(products, ProductSerializer)
 
     def post(self, request):
         serializer = ProductSerializer(data=request.data)
@@ -40,16 +47,18 @@ class ProductAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ProductCategoryAPIView(APIView):
+class ProductCategoryAPIView(IndexedListMixin, APIView):
+    list_model = ProductCategory
+    ordering_fields = {'name': 'name'}
+    default_ordering = ('name', 'id')
+
     def get(self, request, pk=None):
         if pk:
             category = get_object_or_404(ProductCategory, pk=pk)
             serializer = ProductCategorySerializer(category)
             return Response(serializer.data)
 
-        categories = ProductCategory.objects.all()
-        serializer = ProductCategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return self.list_response(ProductCategory.objects.all(), ProductCategorySerializer)
 
     def post(self, request):
         serializer = ProductCategorySerializer(data=request.data)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from stock import spend
+
+
+class Command(BaseCommand):
+    help = "Recompute the supplier spend rollups from every article."
+
+    def handle(self, *args, **options):
+        created = spend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{created} spend rollup row(s) rebuilt."))
@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.utils.encoders import JSONEncoder
+
+from gestion.periods import month_bounds
+from stock import reconciliation
+
+
+class Command(BaseCommand):
+    help = "Reconcile a month of supplier invoices against delivery notes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', help="Month to reconcile (YYYY-MM).")
+        parser.add_argument('--fournisseur', type=int, help="Limit to one supplier id.")
+        parser.add_argument('--output', help="Write the full JSON report to this file.")
+
+    def handle(self, *args, **options):
+        bounds = month_bounds(options['month'])
+        if bounds is None:
+            raise CommandError("Invalid month, expected YYYY-MM.")
+        report = reconciliation.reconcile(*bounds, fournisseur_id=options['fournisseur'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, cls=JSONEncoder, ensure_ascii=False, indent=2)
+
+        for supplier in report['suppliers']:
+            self.stdout.write(
+                f"{supplier['fournisseur']}: over-billed {supplier['over_billed']}, "
+                f"under-billed {supplier['under_billed']}, price variance {supplier['price_variance']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(report['suppliers'])} supplier(s) reconciled."))
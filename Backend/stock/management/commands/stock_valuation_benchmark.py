@@ -0,0 +1,82 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from stock import valuation
+from stock.models import Article, Document
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark the weighted average cost valuation engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=1_000_000)
+        parser.add_argument('--codes', type=int, default=5_000)
+        parser.add_argument('--per-document', type=int, default=1_000)
+        parser.add_argument(
+            '--db', action='store_true',
+            help="Also load the articles into the database (rolled back) and time reports.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        count, codes = options['articles'], options['codes']
+        movements = [
+            (f"ART{rng.randrange(codes):05d}", rng.randint(1, 50), Decimal(rng.randint(100, 100_000)) / 100)
+            for _ in range(count)
+        ]
+
+        ledger = valuation.ValuationLedger()
+        started = time.perf_counter()
+        for code, quantite, prix in movements:
+            ledger.add(code, quantite, quantite * prix)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"In-memory replay: {count} articles in {elapsed:.2f}s ({count / elapsed:,.0f} articles/s)"
+        )
+
+        if options['db']:
+            try:
+                with transaction.atomic():
+                    self._benchmark_db(movements, options['per_document'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _timed(self, label, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.stdout.write(f"{label}: {time.perf_counter() - started:.3f}s")
+        return result
+
+    def _benchmark_db(self, movements, per_document):
+        start = date(2020, 1, 1)
+        document_count = (len(movements) + per_document - 1) // per_document
+        documents = Document.objects.bulk_create(
+            [Document(ref=f"BENCH-{i}", date=start + timedelta(days=i), type='BON') for i in range(document_count)]
+        )
+        if documents[0].pk is None:
+            documents = list(Document.objects.filter(ref__startswith='BENCH-').order_by('date'))
+
+        def load():
+            for index, document in enumerate(documents):
+                chunk = movements[index * per_document:(index + 1) * per_document]
+                Article.objects.bulk_create(
+                    [Article(document=document, code=c, quantite=q, prix_unitaire=p) for c, q, p in chunk],
+                    batch_size=per_document,
+                )
+        self._timed(f"Load {len(movements)} articles", load)
+
+        end = documents[-1].date
+        middle = documents[len(documents) * 9 // 10].date
+        self._timed("Full replay report", valuation.valuation_at, end)
+        self._timed(f"Checkpoint at {middle}", valuation.build_checkpoint, middle)
+        self._timed("Checkpoint + replay report", valuation.valuation_at, end)
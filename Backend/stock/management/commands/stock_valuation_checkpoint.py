@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from django.utils.dateparse import parse_date
+
+from stock import valuation
+from stock.models import StockPosition, ValuationCheckpoint
+
+
+def month_ends(start, end):
+    """Last day of every month from ``start`` up to and including ``end``."""
+    current = start
+    while True:
+        next_month = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+        month_end = next_month - timedelta(days=1)
+        if month_end > end:
+            return
+        yield month_end
+        current = next_month
+
+
+class Command(BaseCommand):
+    help = "Build stock valuation checkpoints (end of last month by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Checkpoint date (YYYY-MM-DD).")
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Recompute running positions and every month-end checkpoint up to --date.",
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            as_of = parse_date(options['date'])
+            if as_of is None:
+                raise CommandError("Invalid --date, expected YYYY-MM-DD.")
+        else:
+            as_of = date.today().replace(day=1) - timedelta(days=1)
+
+        if not options['rebuild']:
+            valuation.build_checkpoint(as_of)
+            self.stdout.write(self.style.SUCCESS(f"Checkpoint built for {as_of}."))
+            return
+
+        with transaction.atomic():
+            StockPosition.objects.all().delete()
+            valuation.apply_deltas(valuation.replay(valuation.ValuationLedger()))
+            ValuationCheckpoint.objects.all().delete()
+
+        first = valuation.incoming_articles().aggregate(first=Min('document__date'))['first']
+        built = 0
+        if first is not None:
+            # Each month replays only from the previous checkpoint.
+            for month_end in month_ends(first, as_of):
+                valuation.build_checkpoint(month_end)
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"Positions rebuilt, {built} checkpoint(s) built up to {as_of}."))
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0005_document_remove_facture_fournisseur_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['date', 'id'], name='stock_doc_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['fournisseur', 'date', 'id'], name='stock_doc_fourn_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['type', 'date', 'id'], name='stock_doc_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0006_document_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockPosition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True)),
+                ('quantite', models.BigIntegerField(default=0)),
+                ('valeur', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ValuationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-as_of'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ValuationCheckpointLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50)),
+                ('quantite', models.BigIntegerField()),
+                ('valeur', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('checkpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='stock.valuationcheckpoint')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='valuationcheckpointline',
+            constraint=models.UniqueConstraint(fields=('checkpoint', 'code'), name='stock_checkpoint_code_uniq'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:01
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    Article = apps.get_model('stock', 'Article')
+    SupplierSpendRollup = apps.get_model('stock', 'SupplierSpendRollup')
+    line_value = ExpressionWrapper(
+        F('quantite') * F('prix_unitaire'), output_field=DecimalField(max_digits=18, decimal_places=2),
+    )
+    rows = (
+        Article.objects.filter(document__fournisseur__isnull=False)
+        .annotate(period=TruncMonth('document__date'))
+        .values('document__fournisseur', 'period', 'document__type')
+        .annotate(amount=Sum(line_value), lines=Count('id'))
+        .order_by()
+    )
+    SupplierSpendRollup.objects.bulk_create([
+        SupplierSpendRollup(
+            fournisseur_id=row['document__fournisseur'], period=row['period'], doc_type=row['document__type'],
+            amount=row['amount'] or 0, line_count=row['lines'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fournisseurs', '0002_tax_id_normalized'),
+        ('stock', '0007_stock_valuation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierSpendRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('doc_type', models.CharField(choices=[('BON', 'Bon de livraison'), ('FACTURE', 'Facture')], max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('line_count', models.IntegerField(default=0)),
+                ('fournisseur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spend_rollups', to='fournisseurs.fournisseur')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='supplierspendrollup',
+            index=models.Index(fields=['period', 'doc_type'], name='stock_spend_period_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='supplierspendrollup',
+            constraint=models.UniqueConstraint(fields=('fournisseur', 'period', 'doc_type'), name='stock_spend_rollup_uniq'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
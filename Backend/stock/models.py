@@ -15,6 +15,13 @@ class Document(models.Model):
     )
     type = models.CharField(max_length=10, choices=TYPE_CHOICES, default='BON')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='stock_doc_date_id_idx'),
+            models.Index(fields=['fournisseur', 'date', 'id'], name='stock_doc_fourn_date_idx'),
+            models.Index(fields=['type', 'date', 'id'], name='stock_doc_type_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_type_display()} {self.ref} - {self.fournisseur.nom if self.fournisseur else 'Sans fournisseur'}"
 
@@ -33,3 +40,58 @@ class Article(models.Model):
     prix_unitaire = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True, null=True)
 
+
+
+class StockPosition(models.Model):
+    """Running incoming quantity and value per article code (weighted average cost)."""
+    code = models.CharField(max_length=50, unique=True)
+    quantite = models.BigIntegerField(default=0)
+    valeur = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.code}: {self.quantite} ({self.valeur})"
+
+
+class ValuationCheckpoint(models.Model):
+    """Snapshot of every StockPosition as of the end of a day, used as a replay base."""
+    as_of = models.DateField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-as_of']
+
+    def __str__(self):
+        return f"Valorisation au {self.as_of}"
+
+
+class ValuationCheckpointLine(models.Model):
+    checkpoint = models.ForeignKey(ValuationCheckpoint, on_delete=models.CASCADE, related_name='lines')
+    code = models.CharField(max_length=50)
+    quantite = models.BigIntegerField()
+    valeur = models.DecimalField(max_digits=18, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['checkpoint', 'code'], name='stock_checkpoint_code_uniq'),
+        ]
+
+
+class SupplierSpendRollup(models.Model):
+    """Value of a supplier's article lines per month and document type, see stock.spend."""
+    fournisseur = models.ForeignKey(Fournisseur, on_delete=models.CASCADE, related_name='spend_rollups')
+    period = models.DateField()  # first day of the month
+    doc_type = models.CharField(max_length=10, choices=Document.TYPE_CHOICES)
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    line_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fournisseur', 'period', 'doc_type'], name='stock_spend_rollup_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'doc_type'], name='stock_spend_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fournisseur_id} {self.period:%Y-%m} {self.doc_type}: {self.amount}"
@@ -0,0 +1,154 @@
+"""Keep StockPosition, valuation checkpoints and supplier spend rollups in step with articles."""
+from django.db.models import QuerySet, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import spend, valuation
+from .models import Article, Document
+from .signals import articles_bulk_created
+
+
+def _is_incoming(doc_type):
+    return doc_type in valuation.INCOMING_TYPES
+
+
+def _document_ledger(document, sign):
+    ledger = valuation.ValuationLedger()
+    rows = (
+        document.articles.exclude(code__isnull=True).exclude(code='')
+        .values('code').annotate(q=Sum('quantite'), v=Sum(valuation.LINE_VALUE)).order_by()
+    )
+    for row in rows:
+        ledger.add(row['code'], sign * row['q'], sign * (row['v'] or valuation.ZERO))
+    return ledger
+
+
+@receiver(pre_save, sender=Article)
+def remember_previous_article(sender, instance, raw=False, **kwargs):
+    instance._valuation_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._valuation_previous = (
+        Article.objects.filter(pk=instance.pk)
+        .values('code', 'quantite', 'prix_unitaire', 'document__type', 'document__date', 'document__fournisseur')
+        .first()
+    )
+
+
+def _article_spend_key(values):
+    return spend.spend_key(values['document__fournisseur'], values['document__date'], values['document__type'])
+
+
+@receiver(post_save, sender=Article)
+def record_article(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ledger = valuation.ValuationLedger()
+    spend_deltas = spend.SpendDeltas()
+    dates = []
+
+    previous = getattr(instance, '_valuation_previous', None)
+    if previous:
+        spend_deltas.add_line(_article_spend_key(previous), previous['quantite'], previous['prix_unitaire'], sign=-1)
+        if previous['code'] and _is_incoming(previous['document__type']):
+            ledger.add(previous['code'], -previous['quantite'], -previous['quantite'] * previous['prix_unitaire'])
+            dates.append(previous['document__date'])
+
+    document = instance.document
+    if document is not None:
+        key = spend.spend_key(document.fournisseur_id, document.date, document.type)
+        spend_deltas.add_line(key, instance.quantite, instance.prix_unitaire)
+        if _is_incoming(document.type):
+            ledger.add_article(instance)
+            dates.append(document.date)
+
+    valuation.apply_deltas(ledger)
+    spend_deltas.apply()
+    if dates:
+        valuation.invalidate_checkpoints(min(dates))
+
+
+@receiver(post_delete, sender=Article)
+def forget_article(sender, instance, origin=None, **kwargs):
+    # Deleting a whole document is reversed in one go by forget_document.
+    if isinstance(origin, Document) or (isinstance(origin, QuerySet) and origin.model is Document):
+        return
+    if instance.document_id is None:
+        return
+    document = Document.objects.filter(pk=instance.document_id).values('type', 'date', 'fournisseur').first()
+    if document is None:
+        return
+    spend_deltas = spend.SpendDeltas()
+    spend_deltas.add_line(
+        spend.spend_key(document['fournisseur'], document['date'], document['type']),
+        instance.quantite, instance.prix_unitaire, sign=-1,
+    )
+    spend_deltas.apply()
+    if not instance.code or not _is_incoming(document['type']):
+        return
+    ledger = valuation.ValuationLedger()
+    ledger.add_article(instance, sign=-1)
+    valuation.apply_deltas(ledger)
+    valuation.invalidate_checkpoints(document['date'])
+
+
+@receiver(pre_save, sender=Document)
+def remember_previous_document(sender, instance, raw=False, **kwargs):
+    instance._valuation_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._valuation_previous = (
+        Document.objects.filter(pk=instance.pk).values('type', 'date', 'fournisseur').first()
+    )
+
+
+@receiver(post_save, sender=Document)
+def record_document_change(sender, instance, created=False, raw=False, **kwargs):
+    previous = getattr(instance, '_valuation_previous', None)
+    if raw or created or previous is None:
+        return
+    old_key = spend.spend_key(previous['fournisseur'], previous['date'], previous['type'])
+    new_key = spend.spend_key(instance.fournisseur_id, instance.date, instance.type)
+    if old_key != new_key:
+        amount, lines = spend.document_totals(instance.pk)
+        spend_deltas = spend.SpendDeltas()
+        spend_deltas.add(old_key, -amount, -lines)
+        spend_deltas.add(new_key, amount, lines)
+        spend_deltas.apply()
+
+    was_incoming, is_incoming = _is_incoming(previous['type']), _is_incoming(instance.type)
+    if was_incoming != is_incoming:
+        valuation.apply_deltas(_document_ledger(instance, 1 if is_incoming else -1))
+    if (was_incoming or is_incoming) and (was_incoming != is_incoming or previous['date'] != instance.date):
+        valuation.invalidate_checkpoints(min(previous['date'], instance.date))
+
+
+@receiver(pre_delete, sender=Document)
+def forget_document(sender, instance, **kwargs):
+    key = spend.spend_key(instance.fournisseur_id, instance.date, instance.type)
+    if key is not None:
+        amount, lines = spend.document_totals(instance.pk)
+        spend_deltas = spend.SpendDeltas()
+        spend_deltas.add(key, -amount, -lines)
+        spend_deltas.apply()
+    if not _is_incoming(instance.type):
+        return
+    valuation.apply_deltas(_document_ledger(instance, -1))
+    valuation.invalidate_checkpoints(instance.date)
+
+
+@receiver(articles_bulk_created, sender=Document)
+def record_bulk_articles(sender, document, articles, **kwargs):
+    key = spend.spend_key(document.fournisseur_id, document.date, document.type)
+    if key is not None:
+        spend_deltas = spend.SpendDeltas()
+        for article in articles:
+            spend_deltas.add_line(key, article.quantite, article.prix_unitaire)
+        spend_deltas.apply()
+    if not _is_incoming(document.type):
+        return
+    ledger = valuation.ValuationLedger()
+    for article in articles:
+        ledger.add_article(article)
+    valuation.apply_deltas(ledger)
+    valuation.invalidate_checkpoints(document.date)
@@ -0,0 +1,122 @@
+"""
+Match supplier invoices (FACTURE) against delivery notes (BON) by article code.
+
+Documents are no longer linked explicitly, so lines are matched per supplier
+and code. Open quantities carried from before the period come from one
+grouped query; the period's lines are then indexed per supplier in a dict
+keyed by code, so every line is visited once.
+"""
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+
+from fournisseurs.models import Fournisseur
+from .models import Article
+from .valuation import LINE_VALUE
+
+ZERO = Decimal('0.00')
+PRICE_PRECISION = Decimal('0.001')
+
+BON = Q(document__type='BON')
+FACTURE = Q(document__type='FACTURE')
+
+
+class OpenLine:
+    """Delivered vs billed quantities and values for one supplier and code."""
+    __slots__ = ('carried', 'carried_value', 'delivered', 'delivered_value', 'billed', 'billed_value')
+
+    def __init__(self):
+        self.carried = 0
+        self.carried_value = ZERO
+        self.delivered = 0
+        self.delivered_value = ZERO
+        self.billed = 0
+        self.billed_value = ZERO
+
+    @property
+    def open_quantity(self):
+        return self.carried + self.delivered - self.billed
+
+    def reference_price(self):
+        # Quantities billed ahead of delivery carry no delivery price.
+        quantity = max(self.carried, 0) + self.delivered
+        if quantity <= 0:
+            return None
+        return (self.carried_value + self.delivered_value) / quantity
+
+    def report(self, code):
+        reference = self.reference_price()
+        invoice_price = self.billed_value / self.billed if self.billed else None
+        variance = None
+        if reference is not None and self.billed:
+            variance = (self.billed_value - self.billed * reference).quantize(PRICE_PRECISION)
+        open_quantity = self.open_quantity
+        return {
+            'code': code,
+            'carried_over': self.carried,
+            'delivered': self.delivered,
+            'billed': self.billed,
+            'over_billed': max(0, -open_quantity),
+            'under_billed': max(0, open_quantity),
+            'delivery_price': reference.quantize(PRICE_PRECISION) if reference is not None else None,
+            'invoice_price': invoice_price.quantize(PRICE_PRECISION) if invoice_price is not None else None,
+            'price_variance': variance,
+        }
+
+
+def _lines(queryset):
+    return queryset.exclude(code__isnull=True).exclude(code='').filter(document__fournisseur__isnull=False)
+
+
+def reconcile(start, end, fournisseur_id=None):
+    """Reconcile every supplier's invoices against deliveries for [start, end]."""
+    history = _lines(Article.objects.filter(document__date__lt=start))
+    period = _lines(Article.objects.filter(document__date__gte=start, document__date__lte=end))
+    if fournisseur_id is not None:
+        history = history.filter(document__fournisseur_id=fournisseur_id)
+        period = period.filter(document__fournisseur_id=fournisseur_id)
+
+    # supplier id -> {code -> OpenLine}
+    index = {}
+
+    carried = (
+        history.values('document__fournisseur', 'code')
+        .annotate(
+            bon_q=Sum('quantite', filter=BON),
+            bon_v=Sum(LINE_VALUE, filter=BON),
+            fac_q=Sum('quantite', filter=FACTURE),
+        )
+        .order_by()
+    )
+    for row in carried:
+        delivered, billed = row['bon_q'] or 0, row['fac_q'] or 0
+        if delivered == billed:
+            continue
+        line = index.setdefault(row['document__fournisseur'], {}).setdefault(row['code'], OpenLine())
+        line.carried = delivered - billed
+        if delivered and line.carried > 0:
+            line.carried_value = (row['bon_v'] or ZERO) * line.carried / delivered
+
+    rows = period.values_list('document__fournisseur', 'document__type', 'code', 'quantite', 'prix_unitaire')
+    for supplier_id, doc_type, code, quantite, prix in rows.iterator(chunk_size=2000):
+        line = index.setdefault(supplier_id, {}).setdefault(code, OpenLine())
+        if doc_type == 'BON':
+            line.delivered += quantite
+            line.delivered_value += quantite * prix
+        else:
+            line.billed += quantite
+            line.billed_value += quantite * prix
+
+    names = dict(Fournisseur.objects.filter(pk__in=index).values_list('id', 'nom'))
+    suppliers = []
+    for supplier_id in sorted(index, key=lambda pk: (names.get(pk, ''), pk)):
+        lines = [line.report(code) for code, line in sorted(index[supplier_id].items())]
+        suppliers.append({
+            'fournisseur_id': supplier_id,
+            'fournisseur': names.get(supplier_id),
+            'over_billed': sum(line['over_billed'] for line in lines),
+            'under_billed': sum(line['under_billed'] for line in lines),
+            'price_variance': sum((line['price_variance'] or ZERO for line in lines), ZERO),
+            'lines': lines,
+        })
+    return {'start': start, 'end': end, 'suppliers': suppliers}
@@ -1,5 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Document, Article
+from .signals import articles_bulk_created
 from fournisseurs.models import Fournisseur
 
 
@@ -10,6 +12,10 @@ class FournisseurSerializer(serializers.ModelSerializer):
 
 
 class ArticleSerializer(serializers.ModelSerializer):
+    # Explicit: the range validator Django derives for PositiveIntegerField
+    # depends on the database backend, and bulk_create relies on this check.
+    quantite = serializers.IntegerField(min_value=0)
+
     class Meta:
         model = Article
         fields = '__all__'
@@ -39,3 +45,34 @@ class DocumentSerializer(serializers.ModelSerializer):
             'type_display',
             'articles'
         ]
+
+
+class DocumentListSerializer(DocumentSerializer):
+    """Same as DocumentSerializer with a line count instead of the nested line items, for list pages."""
+    article_count = serializers.IntegerField(read_only=True)
+
+    class Meta(DocumentSerializer.Meta):
+        fields = [field for field in DocumentSerializer.Meta.fields if field != 'articles'] + ['article_count']
+
+
+class DocumentBulkSerializer(DocumentSerializer):
+    """
+    Creates a document together with all of its articles in one transaction.
+    Lines are validated with ArticleSerializer and inserted with bulk_create.
+    """
+    MAX_ARTICLES = 5000
+    BATCH_SIZE = 500
+
+    articles = ArticleSerializer(many=True, allow_empty=False, max_length=MAX_ARTICLES)
+
+    def create(self, validated_data):
+        lines = validated_data.pop('articles')
+        with transaction.atomic():
+            document = Document.objects.create(**validated_data)
+            articles = [
+                Article(**{**line, 'document': document})
+                for line in lines
+            ]
+            Article.objects.bulk_create(articles, batch_size=self.BATCH_SIZE)
+            articles_bulk_created.send(sender=Document, document=document, articles=articles)
+        return document
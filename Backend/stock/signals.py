@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent once per document after its articles were inserted with bulk_create,
+# which bypasses Article.save() and post_save. Receivers get ``document`` and
+# ``articles`` and run inside the ingestion transaction.
+articles_bulk_created = Signal()
@@ -0,0 +1,112 @@
+"""
+Supplier spend per month and document type.
+
+SupplierSpendRollup holds the value (quantite * prix_unitaire) and line
+count of every (supplier, month, document type). The receivers in
+stock.receivers adjust it as articles and documents change. Reports and
+the supplier list therefore read a few rows per supplier, however long the
+document history is. ``rebuild`` recomputes everything with one grouped
+query.
+"""
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from rest_framework.exceptions import ValidationError
+
+from gestion.periods import month_param
+from .models import Article, Document, SupplierSpendRollup
+from .valuation import LINE_VALUE, ZERO, as_decimal
+
+
+def spend_key(fournisseur_id, day, doc_type):
+    if fournisseur_id is None or day is None:
+        return None
+    return fournisseur_id, date(day.year, day.month, 1), doc_type
+
+
+class SpendDeltas:
+    """Accumulates (amount, line count) changes per rollup key before writing them."""
+
+    def __init__(self):
+        self.deltas = {}
+
+    def add(self, key, amount, lines):
+        if key is None:
+            return
+        current_amount, current_lines = self.deltas.get(key, (ZERO, 0))
+        self.deltas[key] = (current_amount + amount, current_lines + lines)
+
+    def add_line(self, key, quantite, prix_unitaire, sign=1):
+        self.add(key, sign * int(quantite) * as_decimal(prix_unitaire), sign)
+
+    def apply(self):
+        for key, (amount, lines) in self.deltas.items():
+            if amount or lines:
+                _add_to_rollup(key, amount, lines)
+        self.deltas = {}
+
+
+def _add_to_rollup(key, amount, lines):
+    fournisseur_id, period, doc_type = key
+    rows = SupplierSpendRollup.objects.filter(fournisseur_id=fournisseur_id, period=period, doc_type=doc_type)
+    updates = {'amount': F('amount') + amount, 'line_count': F('line_count') + lines}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            SupplierSpendRollup.objects.create(
+                fournisseur_id=fournisseur_id, period=period, doc_type=doc_type, amount=amount, line_count=lines,
+            )
+    except IntegrityError:
+        # Created concurrently, the update now finds it.
+        rows.update(**updates)
+
+
+def rollup_filter(params, prefix=''):
+    """
+    Q over SupplierSpendRollup (through ``prefix``) for ?from=YYYY-MM&to=YYYY-MM&type=BON|FACTURE.
+    """
+    condition = Q()
+    start = month_param(params, 'from')
+    if start:
+        condition &= Q(**{f'{prefix}period__gte': start[0]})
+    end = month_param(params, 'to')
+    if end:
+        condition &= Q(**{f'{prefix}period__lte': end[0]})
+    doc_type = params.get('type')
+    if doc_type:
+        if doc_type not in dict(Document.TYPE_CHOICES):
+            raise ValidationError({'type': "Type de document invalide."})
+        condition &= Q(**{f'{prefix}doc_type': doc_type})
+    return condition
+
+
+def document_totals(document_id):
+    """(amount, line count) of one document's articles."""
+    totals = Article.objects.filter(document_id=document_id).aggregate(amount=Sum(LINE_VALUE), lines=Count('id'))
+    return totals['amount'] or ZERO, totals['lines']
+
+
+@transaction.atomic
+def rebuild():
+    SupplierSpendRollup.objects.all().delete()
+    rows = (
+        Article.objects.filter(document__fournisseur__isnull=False)
+        .annotate(period=TruncMonth('document__date'))
+        .values('document__fournisseur', 'period', 'document__type')
+        .annotate(amount=Sum(LINE_VALUE), lines=Count('id'))
+        .order_by()
+    )
+    created = SupplierSpendRollup.objects.bulk_create([
+        SupplierSpendRollup(
+            fournisseur_id=row['document__fournisseur'],
+            period=row['period'],
+            doc_type=row['document__type'],
+            amount=row['amount'] or ZERO,
+            line_count=row['lines'],
+        )
+        for row in rows
+    ], batch_size=1000)
+    return len(created)
@@ -1,3 +1,274 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from fournisseurs.models import Fournisseur
+from . import reconciliation, spend, valuation
+from .models import Article, Document, StockPosition, SupplierSpendRollup
+from .serializers import DocumentBulkSerializer
+
+
+def spend_rows():
+    """Non-empty spend rollup rows, as comparable tuples."""
+    return set(
+        SupplierSpendRollup.objects.exclude(amount=0, line_count=0)
+        .values_list('fournisseur_id', 'period', 'doc_type', 'amount', 'line_count')
+    )
+
+
+def positions():
+    """Non-empty StockPosition rows, as comparable tuples."""
+    return set(StockPosition.objects.exclude(quantite=0, valeur=0).values_list('code', 'quantite', 'valeur'))
+
+
+def replayed(until=None):
+    """What the positions should be, recomputed from the articles."""
+    ledger = valuation.replay(valuation.ValuationLedger(), until=until)
+    return {(code, quantite, valeur) for code, (quantite, valeur) in ledger.positions.items() if quantite or valeur}
+
+
+class StockPositionTests(TestCase):
+    def setUp(self):
+        self.january = Document.objects.create(date=date(2025, 1, 10), type='BON')
+        self.february = Document.objects.create(date=date(2025, 2, 10), type='BON')
+
+    def assertMatchesReplay(self):
+        self.assertEqual(positions(), replayed())
+        # A checkpoint that a change made stale must not be used any more.
+        as_of = date(2025, 1, 31)
+        ledger, _ = valuation.valuation_at(as_of)
+        self.assertEqual(ledger.report(), valuation.replay(valuation.ValuationLedger(), until=as_of).report())
+
+    def test_articles_created_with_string_prices(self):
+        # The receivers see the raw '12.50' the instance was created with.
+        Article.objects.create(document=self.january, code='A', quantite=2, prix_unitaire='12.50')
+        self.assertEqual(positions(), {('A', 2, Decimal('25.00'))})
+
+    def test_articles(self):
+        article = Article.objects.create(document=self.january, code='A', quantite=10, prix_unitaire='2.00')
+        Article.objects.create(document=self.february, code='A', quantite=10, prix_unitaire='4.00')
+        valuation.build_checkpoint(date(2025, 1, 31))
+        self.assertMatchesReplay()
+
+        article.quantite = 5
+        article.prix_unitaire = '3.00'
+        article.save()
+        self.assertMatchesReplay()
+
+        article.code = 'B'
+        article.save()
+        self.assertMatchesReplay()
+
+        article.document = self.february
+        article.save()
+        self.assertMatchesReplay()
+
+        article.delete()
+        self.assertMatchesReplay()
+
+    def test_documents(self):
+        Article.objects.create(document=self.january, code='A', quantite=10, prix_unitaire='2.00')
+        Article.objects.create(document=self.january, code='B', quantite=1, prix_unitaire='5.00')
+        valuation.build_checkpoint(date(2025, 1, 31))
+
+        self.january.type = 'FACTURE'
+        self.january.save()
+        self.assertMatchesReplay()
+
+        self.january.type = 'BON'
+        self.january.date = date(2025, 3, 1)
+        self.january.save()
+        self.assertMatchesReplay()
+
+        self.january.date = date(2025, 1, 5)
+        self.january.save()
+        valuation.build_checkpoint(date(2025, 1, 31))
+        self.january.delete()
+        self.assertMatchesReplay()
+
+
+class SupplierSpendRollupTests(TestCase):
+    def setUp(self):
+        self.alpha = Fournisseur.objects.create(nom='Alpha', matricule_fiscal='1')
+        self.beta = Fournisseur.objects.create(nom='Beta', matricule_fiscal='2')
+        self.bon = Document.objects.create(date=date(2025, 5, 3), fournisseur=self.alpha, type='BON')
+        self.facture = Document.objects.create(date=date(2025, 6, 3), fournisseur=self.beta, type='FACTURE')
+
+    def assertMatchesRebuild(self):
+        incremental = spend_rows()
+        spend.rebuild()
+        self.assertEqual(incremental, spend_rows())
+
+    def test_articles(self):
+        article = Article.objects.create(document=self.bon, code='X', quantite=2, prix_unitaire='10.00')
+        Article.objects.create(document=self.facture, quantite=1, prix_unitaire='5.00')
+        self.assertMatchesRebuild()
+
+        article.quantite = 3
+        article.prix_unitaire = '12.50'
+        article.save()
+        self.assertMatchesRebuild()
+
+        article.document = self.facture
+        article.save()
+        self.assertMatchesRebuild()
+
+        article.delete()
+        self.assertMatchesRebuild()
+
+    def test_documents(self):
+        Article.objects.create(document=self.bon, code='X', quantite=2, prix_unitaire='10.00')
+        Article.objects.create(document=self.bon, code='Y', quantite=1, prix_unitaire='1.00')
+
+        self.bon.date = date(2025, 7, 1)
+        self.bon.save()
+        self.assertMatchesRebuild()
+
+        self.bon.type = 'FACTURE'
+        self.bon.fournisseur = self.beta
+        self.bon.save()
+        self.assertMatchesRebuild()
+
+        self.bon.fournisseur = None
+        self.bon.save()
+        self.assertMatchesRebuild()
+
+        self.bon.fournisseur = self.alpha
+        self.bon.save()
+        self.bon.delete()
+        self.assertMatchesRebuild()
+
+
+class DocumentListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='stock'))
+        self.fournisseur = Fournisseur.objects.create(nom='Alpha', matricule_fiscal='1')
+
+    def create_documents(self, count):
+        for day in range(1, count + 1):
+            document = Document.objects.create(
+                ref=f'BL-{day}', date=date(2025, 6, day), fournisseur=self.fournisseur, type='BON',
+            )
+            Article.objects.create(document=document, code='A', quantite=1, prix_unitaire='1.00')
+            Article.objects.create(document=document, code='B', quantite=2, prix_unitaire='1.00')
+
+    def test_list_has_line_counts_and_a_fixed_number_of_queries(self):
+        self.create_documents(2)
+        with self.assertNumQueries(1):
+            self.client.get('/stock/documents/')
+        self.create_documents(8)
+        with self.assertNumQueries(1):
+            results = self.client.get('/stock/documents/').json()['results']
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results[0]['article_count'], 2)
+        self.assertEqual(results[0]['fournisseur'], {'id': self.fournisseur.pk, 'nom': 'Alpha'})
+        self.assertNotIn('articles', results[0])
+
+    def test_articles_on_request(self):
+        self.create_documents(3)
+        with self.assertNumQueries(2):
+            results = self.client.get('/stock/documents/?include=articles').json()['results']
+        self.assertEqual([article['code'] for article in results[0]['articles']], ['A', 'B'])
+
+    def test_pages_newest_first(self):
+        self.create_documents(5)
+        first = self.client.get('/stock/documents/?page_size=2').json()
+        self.assertEqual([document['ref'] for document in first['results']], ['BL-5', 'BL-4'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([document['ref'] for document in second['results']], ['BL-3', 'BL-2'])
+
+    def test_filters(self):
+        self.create_documents(5)
+        response = self.client.get('/stock/documents/?date_from=2025-06-02&date_to=2025-06-03&type=BON')
+        self.assertEqual([document['ref'] for document in response.json()['results']], ['BL-3', 'BL-2'])
+        self.assertEqual(self.client.get('/stock/documents/?fournisseur=x').status_code, 400)
+        self.assertEqual(self.client.get('/stock/documents/?date_from=juin').status_code, 400)
+
+
+class DocumentBulkTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='stock'))
+
+    def post(self, articles, **fields):
+        payload = {'ref': 'BL-1', 'date': '2025-06-03', 'type': 'BON', 'articles': articles, **fields}
+        return self.client.post('/stock/documents/bulk/', payload, format='json')
+
+    def test_creates_the_document_and_its_lines(self):
+        lines = [{'code': f'C{index % 3}', 'quantite': index + 1, 'prix_unitaire': '2.00'} for index in range(10)]
+        response = self.post(lines)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['articles']), 10)
+        self.assertEqual(Article.objects.filter(document_id=response.json()['id']).count(), 10)
+        # Stock positions follow bulk-created lines too.
+        self.assertEqual(positions(), replayed())
+
+    def test_rejects_empty_and_oversized_batches(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        line = {'code': 'A', 'quantite': 1, 'prix_unitaire': '1.00'}
+        response = self.post([line] * (DocumentBulkSerializer.MAX_ARTICLES + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Document.objects.exists())
+
+    def test_one_invalid_line_creates_nothing(self):
+        response = self.post([
+            {'code': 'A', 'quantite': 1, 'prix_unitaire': '1.00'},
+            {'code': 'B', 'quantite': -1, 'prix_unitaire': '1.00'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('articles', response.json())
+        self.assertFalse(Document.objects.exists())
+        self.assertFalse(Article.objects.exists())
+
+
+class ReconciliationTests(TestCase):
+    def setUp(self):
+        self.alpha = Fournisseur.objects.create(nom='Alpha', matricule_fiscal='1')
+
+    def line(self, day, doc_type, code, quantite, prix):
+        document = Document.objects.create(date=day, fournisseur=self.alpha, type=doc_type)
+        Article.objects.create(document=document, code=code, quantite=quantite, prix_unitaire=prix)
+
+    def june(self):
+        return reconciliation.reconcile(date(2025, 6, 1), date(2025, 6, 30))['suppliers']
+
+    def test_over_and_under_billing(self):
+        self.line(date(2025, 6, 2), 'BON', 'A', 10, '2.00')
+        self.line(date(2025, 6, 20), 'FACTURE', 'A', 12, '2.50')
+        self.line(date(2025, 6, 5), 'BON', 'B', 5, '1.00')
+        [supplier] = self.june()
+        self.assertEqual(
+            (supplier['fournisseur'], supplier['over_billed'], supplier['under_billed'], supplier['price_variance']),
+            ('Alpha', 2, 5, Decimal('6.000')),
+        )
+        a, b = supplier['lines']
+        self.assertEqual((a['code'], a['over_billed'], a['under_billed']), ('A', 2, 0))
+        self.assertEqual((a['delivery_price'], a['invoice_price']), (Decimal('2.000'), Decimal('2.500')))
+        self.assertEqual((b['code'], b['over_billed'], b['under_billed']), ('B', 0, 5))
+        self.assertIsNone(b['invoice_price'])
+        self.assertIsNone(b['price_variance'])
+
+    def test_deliveries_carried_from_earlier_months(self):
+        self.line(date(2025, 5, 20), 'BON', 'A', 4, '3.00')
+        self.line(date(2025, 5, 21), 'BON', 'C', 1, '3.00')
+        self.line(date(2025, 5, 22), 'FACTURE', 'C', 1, '3.00')
+        self.line(date(2025, 6, 3), 'FACTURE', 'A', 4, '3.00')
+        [supplier] = self.june()
+        # C was settled in May and does not show up.
+        [line] = supplier['lines']
+        self.assertEqual(
+            (line['code'], line['carried_over'], line['delivered'], line['billed']), ('A', 4, 0, 4),
+        )
+        self.assertEqual((line['over_billed'], line['under_billed'], line['price_variance']), (0, 0, Decimal('0.000')))
 
-# Create your tests here.
+    def test_endpoint(self):
+        self.line(date(2025, 6, 2), 'BON', 'A', 1, '1.00')
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='stock'))
+        response = client.get(f'/stock/reconciliation/?month=2025-06&fournisseur={self.alpha.pk}')
+        self.assertEqual(response.json()['suppliers'][0]['under_billed'], 1)
+        self.assertEqual(client.get('/stock/reconciliation/').status_code, 400)
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DocumentViewSet, ArticleViewSet
+from .views import DocumentViewSet, ArticleViewSet, StockValuationAPIView, ReconciliationAPIView
 
 router = DefaultRouter()
 router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'articles', ArticleViewSet, basename='article')
 
 urlpatterns = [
+    path('reconciliation/', ReconciliationAPIView.as_view(), name='stock-reconciliation'),
+    path('valuation/', StockValuationAPIView.as_view(), name='stock-valuation'),
     path('', include(router.urls)),
 ]
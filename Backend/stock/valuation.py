@@ -0,0 +1,150 @@
+"""
+Weighted average cost valuation of incoming stock, per article code.
+
+Running totals live in StockPosition and are updated as articles are
+recorded. Valuations at a past date start from the closest
+ValuationCheckpoint and replay only the movements dated after it.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from .models import Article, StockPosition, ValuationCheckpoint, ValuationCheckpointLine
+
+# Delivery notes bring goods in; invoices only bill them.
+INCOMING_TYPES = ('BON',)
+
+ZERO = Decimal('0.00')
+COST_PRECISION = Decimal('0.001')
+
+LINE_VALUE = ExpressionWrapper(
+    F('quantite') * F('prix_unitaire'),
+    output_field=DecimalField(max_digits=18, decimal_places=2),
+)
+
+
+def as_decimal(value):
+    """Model instances may still hold the raw value they were created with (e.g. '12.50')."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class ValuationLedger:
+    """In-memory running quantity and value per code."""
+    __slots__ = ('positions',)
+
+    def __init__(self, positions=None):
+        # code -> [quantite, valeur]
+        self.positions = positions if positions is not None else {}
+
+    def add(self, code, quantite, valeur):
+        position = self.positions.get(code)
+        if position is None:
+            self.positions[code] = [quantite, valeur]
+        else:
+            position[0] += quantite
+            position[1] += valeur
+
+    def add_article(self, article, sign=1):
+        if article.code:
+            quantite = int(article.quantite)
+            self.add(article.code, sign * quantite, sign * quantite * as_decimal(article.prix_unitaire))
+
+    def __bool__(self):
+        return bool(self.positions)
+
+    def report(self):
+        items = []
+        total = ZERO
+        for code in sorted(self.positions):
+            quantite, valeur = self.positions[code]
+            if quantite == 0 and valeur == 0:
+                continue
+            cout_moyen = (valeur / quantite).quantize(COST_PRECISION) if quantite else None
+            items.append({
+                'code': code,
+                'quantite': quantite,
+                'valeur': valeur,
+                'cout_moyen': cout_moyen,
+            })
+            total += valeur
+        return {'total_value': total, 'items': items}
+
+
+def incoming_articles():
+    return Article.objects.filter(document__type__in=INCOMING_TYPES).exclude(code__isnull=True).exclude(code='')
+
+
+def replay(ledger, after=None, until=None):
+    """Add the grouped incoming movements dated in (after, until] to the ledger."""
+    queryset = incoming_articles()
+    if after is not None:
+        queryset = queryset.filter(document__date__gt=after)
+    if until is not None:
+        queryset = queryset.filter(document__date__lte=until)
+    rows = queryset.values('code').annotate(q=Sum('quantite'), v=Sum(LINE_VALUE)).order_by()
+    for row in rows:
+        ledger.add(row['code'], row['q'], row['v'] or ZERO)
+    return ledger
+
+
+def apply_deltas(ledger):
+    """Persist a ledger of deltas into StockPosition (one read, one update, one insert)."""
+    if not ledger:
+        return
+    with transaction.atomic():
+        existing = StockPosition.objects.select_for_update().in_bulk(list(ledger.positions), field_name='code')
+        to_update, to_create = [], []
+        for code, (quantite, valeur) in ledger.positions.items():
+            position = existing.get(code)
+            if position is None:
+                to_create.append(StockPosition(code=code, quantite=quantite, valeur=valeur))
+            else:
+                position.quantite += quantite
+                position.valeur += valeur
+                to_update.append(position)
+        if to_update:
+            StockPosition.objects.bulk_update(to_update, ['quantite', 'valeur'], batch_size=500)
+        if to_create:
+            StockPosition.objects.bulk_create(to_create, batch_size=500)
+
+
+def invalidate_checkpoints(since):
+    """Drop checkpoints that a movement dated ``since`` would change."""
+    ValuationCheckpoint.objects.filter(as_of__gte=since).delete()
+
+
+def current_valuation():
+    ledger = ValuationLedger({
+        code: [quantite, valeur]
+        for code, quantite, valeur in StockPosition.objects.values_list('code', 'quantite', 'valeur')
+    })
+    return ledger
+
+
+def valuation_at(as_of):
+    """Return (ledger, checkpoint date or None) for the end of ``as_of``."""
+    checkpoint = ValuationCheckpoint.objects.filter(as_of__lte=as_of).order_by('-as_of').first()
+    ledger = ValuationLedger()
+    after = None
+    if checkpoint is not None:
+        after = checkpoint.as_of
+        for code, quantite, valeur in checkpoint.lines.values_list('code', 'quantite', 'valeur'):
+            ledger.add(code, quantite, valeur)
+    replay(ledger, after=after, until=as_of)
+    return ledger, after
+
+
+@transaction.atomic
+def build_checkpoint(as_of):
+    ledger, _ = valuation_at(as_of)
+    ValuationCheckpoint.objects.filter(as_of=as_of).delete()
+    checkpoint = ValuationCheckpoint.objects.create(as_of=as_of)
+    ValuationCheckpointLine.objects.bulk_create(
+        [
+            ValuationCheckpointLine(checkpoint=checkpoint, code=code, quantite=quantite, valeur=valeur)
+            for code, (quantite, valeur) in ledger.positions.items()
+        ],
+        batch_size=1000,
+    )
+    return checkpoint
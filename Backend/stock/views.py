@@ -1,37 +1,122 @@
-from rest_framework import viewsets
+from django.db.models import Count, Prefetch
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from gestion.periods import date_param, month_param
+from . import reconciliation, valuation
 from .models import Document, Article
-from .serializers import DocumentSerializer, ArticleSerializer
+from .serializers import (
+    DocumentSerializer, DocumentListSerializer, DocumentBulkSerializer, ArticleSerializer,
+)
+
 
 class DocumentViewSet(viewsets.ModelViewSet):
-    queryset = Document.objects.all().order_by('-date')
+    queryset = Document.objects.select_related('fournisseur').order_by('-date', '-id')
     serializer_class = DocumentSerializer
+    default_ordering = ('-date', '-id')
     # permission_classes = [IsAuthenticated]
 
+    def include_articles(self):
+        """Line items are always returned on detail, and on list only with ?include=articles."""
+        if self.action != 'list':
+            return True
+        include = self.request.query_params.get('include', '')
+        return 'articles' in include.split(',')
+
+    def get_serializer_class(self):
+        if self.include_articles():
+            return DocumentSerializer
+        return DocumentListSerializer
+
     def get_queryset(self):
         """
-        Optionally filter by type (BON or FACTURE) using query param.
-        Example: /api/documents/?type=BON
+        Optionally filter by type (BON or FACTURE), supplier and date range.
+        Example: /api/documents/?type=BON&fournisseur=3&date_from=2025-01-01&date_to=2025-01-31
         """
         queryset = super().get_queryset()
-        doc_type = self.request.query_params.get('type')
+        params = self.request.query_params
+
+        doc_type = params.get('type')
         if doc_type in ['BON', 'FACTURE']:
             queryset = queryset.filter(type=doc_type)
+
+        fournisseur_id = params.get('fournisseur')
+        if fournisseur_id:
+            if not fournisseur_id.isdigit():
+                raise ValidationError({'fournisseur': "Identifiant fournisseur invalide."})
+            queryset = queryset.filter(fournisseur_id=fournisseur_id)
+
+        date_from = date_param(params, 'date_from')
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        date_to = date_param(params, 'date_to')
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+
+        if self.include_articles():
+            queryset = queryset.prefetch_related(
+                Prefetch('articles', queryset=Article.objects.order_by('id'))
+            )
+        else:
+            queryset = queryset.annotate(article_count=Count('articles'))
         return queryset
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create a delivery note or invoice with all of its lines in one request.
+        Example: POST /api/documents/bulk/ {"ref": ..., "date": ..., "articles": [...]}
+        """
+        serializer = DocumentBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        document = serializer.save()
+        document = (
+            Document.objects.select_related('fournisseur')
+            .prefetch_related(Prefetch('articles', queryset=Article.objects.order_by('id')))
+            .get(pk=document.pk)
+        )
+        return Response(DocumentSerializer(document).data, status=status.HTTP_201_CREATED)
+
 
 class ArticleViewSet(viewsets.ModelViewSet):
+    """Optionally filter articles by document, e.g. /api/articles/?document_id=1"""
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
+    filter_fields = {'document_id': 'document'}
+    default_ordering = ('id',)
     # permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
+
+class StockValuationAPIView(APIView):
+    def get(self, request):
         """
-        Optionally filter articles by document ID using query param.
-        Example: /api/articles/?document_id=1
+        Weighted average cost valuation per article code.
+        Without a date the running positions are returned, otherwise the
+        valuation at the end of that day. Example: /api/valuation/?date=2025-06-30
         """
-        queryset = super().get_queryset()
-        document_id = self.request.query_params.get('document_id')
-        if document_id:
-            queryset = queryset.filter(document_id=document_id)
-        return queryset
+        as_of = date_param(request.query_params, 'date')
+        if as_of is None:
+            ledger, checkpoint = valuation.current_valuation(), None
+        else:
+            ledger, checkpoint = valuation.valuation_at(as_of)
+        return Response({
+            'date': as_of,
+            'checkpoint': checkpoint,
+            **ledger.report(),
+        })
+
+
+class ReconciliationAPIView(APIView):
+    def get(self, request):
+        """
+        Match a month of supplier invoices against delivery notes by article code.
+        Example: /api/reconciliation/?month=2025-06&fournisseur=3
+        """
+        bounds = month_param(request.query_params, required=True)
+        fournisseur_id = request.query_params.get('fournisseur')
+        if fournisseur_id and not fournisseur_id.isdigit():
+            raise ValidationError({'fournisseur': "Identifiant fournisseur invalide."})
+        return Response(reconciliation.reconcile(*bounds, fournisseur_id=fournisseur_id or None))
@@ -0,0 +1,224 @@
+"""
+Batch rendering of withholding-tax certificates.
+
+All data is read up front (one query for the payments, the company from
+the cached profile in company.profile) and turned into plain dicts, so
+rendering is a pure function. Requests render in-process, one certificate
+at a time as the ZIP archive streams out. Only the generate_tax_certificates
+command hands large batches to a process pool. Rendered certificates are
+cached on disk (TAX_CERTIFICATE_DIR, or MEDIA_ROOT) per payment and payload
+hash, and shared by every worker.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from html import escape
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from company.profile import company_fields
+
+# Bump when the template changes so cached certificates are re-rendered. The
+# cache of an older version is left in its own directory and can be deleted.
+CERTIFICATE_VERSION = 1
+# HTML rendering is cheap (see generate_tax_certificates --synthetic): below
+# this many certificates starting a pool costs more than it saves.
+POOL_THRESHOLD = 2000
+# Archive members are compressed and sent in pieces of this size.
+ZIP_CHUNK_SIZE = 64 * 1024
+
+COMPANY_FIELDS = ('name', 'legal_name', 'tax_identification', 'address', 'phone_number', 'email')
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>Certificat de retenue à la source {reference}</title></head>
+<body>
+<h1>Certificat de retenue à la source</h1>
+<section>
+  <h2>Payeur</h2>
+  <p>{company_name}<br>Matricule fiscal : {company_tax_id}<br>{company_address}</p>
+</section>
+<section>
+  <h2>Bénéficiaire</h2>
+  <p>{client_name}<br>Matricule fiscal : {client_tax_id}<br>{client_address}</p>
+</section>
+<table>
+  <tr><th>Bon de commande</th><td>{reference}</td></tr>
+  <tr><th>Date de paiement</th><td>{payment_date}</td></tr>
+  <tr><th>Nature de la retenue</th><td>{tax_type} ({rate} %)</td></tr>
+  <tr><th>Montant TTC</th><td>{total_ttc} DT</td></tr>
+  <tr><th>Montant retenu</th><td>{amount} DT</td></tr>
+  <tr><th>Net payé</th><td>{net} DT</td></tr>
+</table>
+<p>Certificat n° {payment_id}</p>
+</body>
+</html>
+"""
+
+
+def company_payload():
+    return company_fields(*COMPANY_FIELDS)
+
+
+def payment_payload(payment, company):
+    """Plain, picklable data for one payment (needs purchase_order__client and tax_type loaded)."""
+    order = payment.purchase_order
+    client = order.client
+    return {
+        'payment_id': payment.pk,
+        'reference': order.reference,
+        'payment_date': payment.payment_date.isoformat(),
+        'tax_type': payment.tax_type.name,
+        'rate': str(payment.tax_type.rate),
+        'total_ttc': str(order.total_ttc),
+        'amount': str(payment.amount),
+        'net': str(order.total_ttc - payment.amount),
+        'client_name': client.name,
+        'client_tax_id': client.tax_identification,
+        'client_address': client.address,
+        'company_name': company.get('legal_name') or company.get('name') or '',
+        'company_tax_id': company.get('tax_identification') or '',
+        'company_address': company.get('address') or '',
+    }
+
+
+def cache_dir():
+    directory = getattr(settings, 'TAX_CERTIFICATE_DIR', None)
+    if directory:
+        return directory
+    if not settings.MEDIA_ROOT:
+        raise ImproperlyConfigured("Set TAX_CERTIFICATE_DIR or MEDIA_ROOT to cache tax certificates.")
+    return os.path.join(settings.MEDIA_ROOT, 'taxes', 'certificates')
+
+
+def cache_path(payload):
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir(), f'v{CERTIFICATE_VERSION}', digest[:2], f"{payload['payment_id']}-{digest}.html")
+
+
+def _read_cached(path):
+    try:
+        with open(path, 'rb') as source:
+            return source.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_cached(path, content):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Renamed into place so a concurrent reader never sees a partial file.
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as target:
+            target.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def render_certificate(payload):
+    """Pure function: payload dict -> certificate HTML as bytes."""
+    values = {
+        key: escape(str(value)).replace('\n', '<br>') if value is not None else ''
+        for key, value in payload.items()
+    }
+    return TEMPLATE.format(**values).encode('utf-8')
+
+
+def render_many(payloads, executor=None, use_cache=True):
+    """
+    Return [(payload, content)] using the disk cache. Misses are rendered
+    in-process, or mapped on ``executor`` (e.g. a ProcessPoolExecutor) when given.
+    """
+    paths = [cache_path(payload) for payload in payloads] if use_cache else None
+    contents = [_read_cached(path) for path in paths] if use_cache else [None] * len(payloads)
+    missing = [index for index, content in enumerate(contents) if content is None]
+
+    jobs = [payloads[index] for index in missing]
+    if executor is not None and len(jobs) > 1:
+        rendered = executor.map(render_certificate, jobs, chunksize=max(1, len(jobs) // 64))
+    else:
+        rendered = map(render_certificate, jobs)
+    for index, content in zip(missing, rendered):
+        contents[index] = content
+        if use_cache:
+            _write_cached(paths[index], content)
+    return list(zip(payloads, contents))
+
+
+def iter_rendered(payloads, use_cache=True):
+    """Yield (payload, content) one certificate at a time, through the disk cache."""
+    for payload in payloads:
+        path = cache_path(payload) if use_cache else None
+        content = _read_cached(path) if use_cache else None
+        if content is None:
+            content = render_certificate(payload)
+            if use_cache:
+                _write_cached(path, content)
+        yield payload, content
+
+
+def certificate_filename(payload):
+    safe_reference = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in payload['reference'])
+    return f"certificat-{payload['payment_id']}-{safe_reference}.html"
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes over to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return b''.join(chunks)
+
+
+def stream_zip(rendered):
+    """Yield a ZIP archive of (payload, content) pairs chunk by chunk."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for payload, content in rendered:
+            with archive.open(certificate_filename(payload), mode='w') as member:
+                for start in range(0, len(content), ZIP_CHUNK_SIZE):
+                    member.write(content[start:start + ZIP_CHUNK_SIZE])
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def batch_payloads(payments):
+    """Payments queryset -> payload dicts, with a fixed number of queries."""
+    company = company_payload()
+    return [
+        payment_payload(payment, company)
+        for payment in payments.select_related('purchase_order__client', 'tax_type').order_by('payment_date', 'id')
+    ]
+
+
+def build_batch(payments):
+    """Payments queryset -> lazy (payload, content) pairs; the query runs here."""
+    return iter_rendered(batch_payloads(payments))
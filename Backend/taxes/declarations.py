@@ -0,0 +1,183 @@
+"""
+Monthly withholding-tax declarations built from WithholdingTaxRollup.
+
+Rollups hold one row per (month, tax type, client type) and are adjusted
+by the receivers in taxes.receivers whenever a payment, its order or the
+order's client changes, so a declaration reads a handful of rows whatever
+the volume of payments. ``rebuild_period`` recomputes a month from the
+payments.
+"""
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from clients.models import Client
+from .models import WithholdingTaxPayment, WithholdingTaxRollup
+
+ZERO = Decimal('0.000')
+CLIENT_TYPE_LABELS = dict(Client.CLIENT_TYPE_CHOICES)
+AMOUNT_FIELDS = ('payment_count', 'amount', 'order_total_ttc', 'order_withholding_amount')
+
+
+def period_of(day):
+    return date(day.year, day.month, 1)
+
+
+def payment_key(payment):
+    """(period, tax_type_id, client_type) a payment instance rolls up into."""
+    return period_of(payment.payment_date), payment.tax_type_id, payment.purchase_order.client.client_type
+
+
+def add_to_rollup(key, **deltas):
+    """Add ``deltas`` to the rollup row for ``key``, creating it if needed."""
+    period, tax_type_id, client_type = key
+    rows = WithholdingTaxRollup.objects.filter(period=period, tax_type_id=tax_type_id, client_type=client_type)
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            WithholdingTaxRollup.objects.create(
+                period=period, tax_type_id=tax_type_id, client_type=client_type, **deltas,
+            )
+    except IntegrityError:
+        # Created concurrently, the update now finds it.
+        rows.update(**updates)
+
+
+def add_payment(totals, key, sign, amount, order_total_ttc, order_withholding_amount):
+    """Accumulate one payment's contribution (``sign`` 1 or -1) to ``key`` into ``totals``."""
+    deltas = totals.setdefault(key, dict.fromkeys(AMOUNT_FIELDS, 0))
+    deltas['payment_count'] += sign
+    deltas['amount'] += sign * amount
+    deltas['order_total_ttc'] += sign * order_total_ttc
+    deltas['order_withholding_amount'] += sign * order_withholding_amount
+
+
+def apply_totals(totals):
+    """add_to_rollup every non-zero entry of ``totals`` (key -> deltas)."""
+    for key, deltas in totals.items():
+        if any(deltas.values()):
+            add_to_rollup(key, **deltas)
+
+
+def move_clients(changes):
+    """
+    Move the payments of clients whose type changed from the old client type's
+    rollups to the new one's. ``changes`` maps client id -> (old type, new type).
+    """
+    changes = {client_id: types for client_id, types in changes.items() if types[0] != types[1]}
+    if not changes:
+        return
+    payments = WithholdingTaxPayment.objects.filter(purchase_order__client_id__in=list(changes)).values_list(
+        'purchase_order__client_id', 'payment_date', 'tax_type_id', 'amount',
+        'purchase_order__total_ttc', 'purchase_order__withholding_tax_amount',
+    )
+    totals = {}
+    for client_id, payment_date, tax_type_id, *values in payments:
+        old_type, new_type = changes[client_id]
+        add_payment(totals, (period_of(payment_date), tax_type_id, old_type), -1, *values)
+        add_payment(totals, (period_of(payment_date), tax_type_id, new_type), 1, *values)
+    apply_totals(totals)
+
+
+@transaction.atomic
+def rebuild_period(period):
+    """Recompute every rollup of the month starting at ``period`` with one grouped query."""
+    end = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+    WithholdingTaxRollup.objects.filter(period=period).delete()
+    rows = (
+        WithholdingTaxPayment.objects.filter(payment_date__gte=period, payment_date__lt=end)
+        .values('tax_type_id', 'purchase_order__client__client_type')
+        .annotate(
+            payment_count=Count('id'),
+            amount_sum=Sum('amount'),
+            order_total_ttc_sum=Sum('purchase_order__total_ttc'),
+            order_withholding_sum=Sum('purchase_order__withholding_tax_amount'),
+        )
+        .order_by()
+    )
+    WithholdingTaxRollup.objects.bulk_create([
+        WithholdingTaxRollup(
+            period=period,
+            tax_type_id=row['tax_type_id'],
+            client_type=row['purchase_order__client__client_type'],
+            payment_count=row['payment_count'],
+            amount=row['amount_sum'] or ZERO,
+            order_total_ttc=row['order_total_ttc_sum'] or ZERO,
+            order_withholding_amount=row['order_withholding_sum'] or ZERO,
+        )
+        for row in rows
+    ])
+
+
+def _totals():
+    return {'payment_count': 0, 'amount': ZERO, 'order_total_ttc': ZERO, 'order_withholding_amount': ZERO}
+
+
+def _accumulate(target, rollup):
+    for field in AMOUNT_FIELDS:
+        target[field] += getattr(rollup, field)
+
+
+def declaration(period):
+    """Declaration for the month starting at ``period``, read from the rollups only."""
+    by_tax_type, by_client_type, total = {}, {}, _totals()
+    rollups = WithholdingTaxRollup.objects.filter(period=period).select_related('tax_type').order_by(
+        'tax_type__code', 'client_type',
+    )
+    for rollup in rollups:
+        tax_type = rollup.tax_type
+        entry = by_tax_type.setdefault(tax_type.pk, {
+            'tax_type_id': tax_type.pk,
+            'code': tax_type.code,
+            'name': tax_type.name,
+            'rate': tax_type.rate,
+            **_totals(),
+        })
+        _accumulate(entry, rollup)
+        client_entry = by_client_type.setdefault(rollup.client_type, {
+            'client_type': rollup.client_type,
+            'label': CLIENT_TYPE_LABELS.get(rollup.client_type, rollup.client_type),
+            **_totals(),
+        })
+        _accumulate(client_entry, rollup)
+        _accumulate(total, rollup)
+    return {
+        'period': period.strftime('%Y-%m'),
+        'by_tax_type': list(by_tax_type.values()),
+        'by_client_type': list(by_client_type.values()),
+        'total': total,
+    }
+
+
+def declaration_csv(data):
+    """Render a declaration as CSV text (semicolon separated, as expected by spreadsheets here)."""
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=';')
+    writer.writerow(['Période', data['period']])
+    writer.writerow([])
+    writer.writerow(['Code', 'Type de retenue', 'Taux', 'Nombre', 'Montant retenu', 'Total TTC', 'Retenue calculée'])
+    for row in data['by_tax_type']:
+        writer.writerow([
+            row['code'], row['name'], row['rate'], row['payment_count'],
+            row['amount'], row['order_total_ttc'], row['order_withholding_amount'],
+        ])
+    writer.writerow([])
+    writer.writerow(['Type de client', '', '', 'Nombre', 'Montant retenu', 'Total TTC', 'Retenue calculée'])
+    for row in data['by_client_type']:
+        writer.writerow([
+            row['label'], '', '', row['payment_count'],
+            row['amount'], row['order_total_ttc'], row['order_withholding_amount'],
+        ])
+    total = data['total']
+    writer.writerow([])
+    writer.writerow([
+        'Total', '', '', total['payment_count'],
+        total['amount'], total['order_total_ttc'], total['order_withholding_amount'],
+    ])
+    return out.getvalue()
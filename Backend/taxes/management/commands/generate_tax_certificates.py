@@ -0,0 +1,70 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.periods import month_bounds
+from taxes import certificates
+from taxes.models import WithholdingTaxPayment
+
+
+class Command(BaseCommand):
+    help = "Render withholding-tax certificates for a month into a ZIP file and report documents per second."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Payments of this month (YYYY-MM).")
+        parser.add_argument('--output', help="ZIP file to write.")
+        parser.add_argument('--workers', type=int, help="Process pool size (default: CPU count, 1 = serial).")
+        parser.add_argument(
+            '--synthetic', type=int, metavar='N',
+            help="Benchmark: render N generated certificates, bypassing the database and the cache.",
+        )
+
+    def handle(self, *args, **options):
+        if options['synthetic']:
+            return self._benchmark(options['synthetic'], options['workers'])
+
+        bounds = month_bounds(options['month'])
+        if bounds is None or not options['output']:
+            raise CommandError("--month YYYY-MM and --output are required.")
+        payments = WithholdingTaxPayment.objects.filter(payment_date__range=bounds)
+
+        started = time.perf_counter()
+        payloads = certificates.batch_payloads(payments)
+        workers = options['workers'] if len(payloads) >= certificates.POOL_THRESHOLD else 1
+        with self._executor(workers) as executor:
+            rendered = certificates.render_many(payloads, executor=executor)
+        with open(options['output'], 'wb') as fh:
+            for chunk in certificates.stream_zip(rendered):
+                fh.write(chunk)
+        self._report(len(rendered), time.perf_counter() - started)
+
+    def _benchmark(self, count, workers):
+        payloads = [
+            {
+                'payment_id': pk, 'reference': f"BC-{pk:06d}", 'payment_date': date(2025, 6, 1).isoformat(),
+                'tax_type': "Retenue a la source 1,5%", 'rate': '1.50', 'total_ttc': '1190.000',
+                'amount': '17.850', 'net': str(Decimal('1190.000') - Decimal('17.850')),
+                'client_name': f"Client {pk}", 'client_tax_id': '1234567/A/M/000', 'client_address': 'Tunis',
+                'company_name': 'Entreprise', 'company_tax_id': '7654321/B/N/000', 'company_address': 'Sfax',
+            }
+            for pk in range(count)
+        ]
+        for label, pool_workers in (('serial', 1), ('pool', workers)):
+            started = time.perf_counter()
+            with self._executor(pool_workers) as executor:
+                certificates.render_many(payloads, executor=executor, use_cache=False)
+            self.stdout.write(f"{label}: ", ending='')
+            self._report(count, time.perf_counter() - started)
+
+    def _executor(self, workers):
+        workers = workers or os.cpu_count() or 1
+        return ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+
+    def _report(self, count, elapsed):
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"{count} certificate(s) in {elapsed:.2f}s ({rate:,.0f} documents/s)"))
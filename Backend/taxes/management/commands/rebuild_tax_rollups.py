@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from gestion.periods import month_bounds
+from taxes import declarations
+from taxes.models import WithholdingTaxPayment
+
+
+class Command(BaseCommand):
+    help = "Recompute withholding-tax rollups month by month from the payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help="First month (YYYY-MM), default: first payment.")
+        parser.add_argument('--to', dest='end', help="Last month (YYYY-MM), default: last payment.")
+
+    def _month(self, value, fallback):
+        if not value:
+            return fallback
+        bounds = month_bounds(value)
+        if bounds is None:
+            raise CommandError(f"Invalid month {value!r}, expected YYYY-MM.")
+        return bounds[0]
+
+    def handle(self, *args, **options):
+        span = WithholdingTaxPayment.objects.aggregate(first=Min('payment_date'), last=Max('payment_date'))
+        if span['first'] is None and not (options['start'] and options['end']):
+            self.stdout.write("No payments, nothing to rebuild.")
+            return
+        start = self._month(options['start'], span['first'] and declarations.period_of(span['first']))
+        end = self._month(options['end'], span['last'] and declarations.period_of(span['last']))
+
+        period, months = start, 0
+        while period <= end:
+            # One transaction and one grouped query per month.
+            declarations.rebuild_period(period)
+            self.stdout.write(f"{period:%Y-%m} rebuilt")
+            period = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+            months += 1
+        self.stdout.write(self.style.SUCCESS(f"{months} month(s) rebuilt."))
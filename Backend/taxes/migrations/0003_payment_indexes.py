@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxes', '0002_insert_default_tax_types'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='withholdingtaxpayment',
+            index=models.Index(fields=['payment_date', 'id'], name='taxes_pay_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withholdingtaxpayment',
+            index=models.Index(fields=['is_paid_to_treasury', 'payment_date', 'id'], name='taxes_pay_treasury_date_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxes', '0003_payment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WithholdingTaxRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('client_type', models.CharField(max_length=20)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('order_total_ttc', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('order_withholding_amount', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('tax_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='taxes.withholdingtaxtype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='withholdingtaxrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'tax_type', 'client_type'), name='taxes_rollup_period_uniq'),
+        ),
+    ]
@@ -24,5 +24,30 @@ class WithholdingTaxPayment(models.Model):
     is_paid_to_treasury = models.BooleanField(default=False)
     treasury_payment_ref = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['payment_date', 'id'], name='taxes_pay_date_id_idx'),
+            models.Index(fields=['is_paid_to_treasury', 'payment_date', 'id'], name='taxes_pay_treasury_date_idx'),
+        ]
+
     def __str__(self):
         return f"Retenue {self.tax_type} - {self.amount} DT"
+
+
+class WithholdingTaxRollup(models.Model):
+    """Running monthly totals per tax type and client type, fed by WithholdingTaxPayment."""
+    period = models.DateField()  # first day of the month
+    tax_type = models.ForeignKey(WithholdingTaxType, on_delete=models.CASCADE, related_name='rollups')
+    client_type = models.CharField(max_length=20)
+    payment_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    order_total_ttc = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    order_withholding_amount = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'tax_type', 'client_type'], name='taxes_rollup_period_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.period:%Y-%m} {self.tax_type.code} {self.client_type}: {self.amount} DT"
@@ -0,0 +1,127 @@
+"""Keep WithholdingTaxRollup in step with payments, their orders and the orders' clients."""
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from clients.models import Client
+from clients.signals import client_types_changed
+from orders.models import PurchaseOrder
+from . import declarations
+from .models import WithholdingTaxPayment
+
+PREVIOUS_PAYMENT_FIELDS = (
+    'payment_date', 'tax_type_id', 'amount', 'purchase_order__client__client_type',
+    'purchase_order__total_ttc', 'purchase_order__withholding_tax_amount',
+)
+
+
+def _contribution(payment):
+    order = payment.purchase_order
+    return declarations.payment_key(payment), {
+        'payment_count': 1,
+        'amount': payment.amount,
+        'order_total_ttc': order.total_ttc,
+        'order_withholding_amount': order.withholding_tax_amount,
+    }
+
+
+def _negate(deltas):
+    return {field: -value for field, value in deltas.items()}
+
+
+@receiver(pre_save, sender=WithholdingTaxPayment)
+def remember_previous_payment(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = WithholdingTaxPayment.objects.filter(pk=instance.pk).values(*PREVIOUS_PAYMENT_FIELDS).first()
+    if previous is not None:
+        key = (
+            declarations.period_of(previous['payment_date']),
+            previous['tax_type_id'],
+            previous['purchase_order__client__client_type'],
+        )
+        instance._rollup_previous = (key, {
+            'payment_count': -1,
+            'amount': -previous['amount'],
+            'order_total_ttc': -previous['purchase_order__total_ttc'],
+            'order_withholding_amount': -previous['purchase_order__withholding_tax_amount'],
+        })
+
+
+@receiver(post_save, sender=WithholdingTaxPayment)
+def record_payment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        declarations.add_to_rollup(previous[0], **previous[1])
+    key, deltas = _contribution(instance)
+    declarations.add_to_rollup(key, **deltas)
+
+
+@receiver(pre_delete, sender=WithholdingTaxPayment)
+def forget_payment(sender, instance, **kwargs):
+    key, deltas = _contribution(instance)
+    declarations.add_to_rollup(key, **_negate(deltas))
+
+
+@receiver(pre_save, sender=PurchaseOrder)
+def remember_previous_order(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous = (
+        PurchaseOrder.objects.filter(pk=instance.pk)
+        .values('total_ttc', 'withholding_tax_amount', 'client__client_type').first()
+    )
+
+
+@receiver(post_save, sender=PurchaseOrder)
+def record_order_change(sender, instance, raw=False, **kwargs):
+    """Re-file the order's payments when its totals or its client's type changed."""
+    previous = getattr(instance, '_rollup_previous', None)
+    if raw or previous is None:
+        return
+    client_type = instance.client.client_type
+    if (
+        instance.total_ttc == previous['total_ttc']
+        and instance.withholding_tax_amount == previous['withholding_tax_amount']
+        and client_type == previous['client__client_type']
+    ):
+        return
+    payments = WithholdingTaxPayment.objects.filter(purchase_order_id=instance.pk).values_list(
+        'payment_date', 'tax_type_id', 'amount',
+    )
+    totals = {}
+    for payment_date, tax_type_id, amount in payments:
+        period = declarations.period_of(payment_date)
+        declarations.add_payment(
+            totals, (period, tax_type_id, previous['client__client_type']), -1,
+            amount, previous['total_ttc'], previous['withholding_tax_amount'],
+        )
+        declarations.add_payment(
+            totals, (period, tax_type_id, client_type), 1,
+            amount, instance.total_ttc, instance.withholding_tax_amount,
+        )
+    declarations.apply_totals(totals)
+
+
+@receiver(pre_save, sender=Client)
+def remember_previous_client_type(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous_type = None
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous_type = Client.objects.filter(pk=instance.pk).values_list('client_type', flat=True).first()
+
+
+@receiver(post_save, sender=Client)
+def record_client_type(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_rollup_previous_type', None)
+    if raw or previous is None:
+        return
+    declarations.move_clients({instance.pk: (previous, instance.client_type)})
+
+
+@receiver(client_types_changed, sender=Client)
+def record_imported_client_types(sender, changes, **kwargs):
+    declarations.move_clients(changes)
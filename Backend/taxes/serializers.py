@@ -30,4 +30,53 @@ class WithholdingTaxPaymentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = WithholdingTaxPayment
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class WithholdingTaxPaymentListSerializer(serializers.ModelSerializer):
+    """Flat payment row for list pages; needs select_related('purchase_order__client', 'tax_type')."""
+    order_reference = serializers.CharField(source='purchase_order.reference', read_only=True)
+    order_total_ttc = serializers.DecimalField(
+        source='purchase_order.total_ttc', max_digits=12, decimal_places=3, read_only=True,
+    )
+    client_id = serializers.IntegerField(source='purchase_order.client_id', read_only=True)
+    client_name = serializers.CharField(source='purchase_order.client.name', read_only=True)
+    tax_type_code = serializers.CharField(source='tax_type.code', read_only=True)
+    tax_type_name = serializers.CharField(source='tax_type.name', read_only=True)
+    tax_type_rate = serializers.DecimalField(source='tax_type.rate', max_digits=5, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = WithholdingTaxPayment
+        fields = [
+            'id',
+            'purchase_order_id',
+            'order_reference',
+            'order_total_ttc',
+            'client_id',
+            'client_name',
+            'tax_type_id',
+            'tax_type_code',
+            'tax_type_name',
+            'tax_type_rate',
+            'amount',
+            'payment_date',
+            'is_paid_to_treasury',
+            'treasury_payment_ref',
+        ]
+
+
+
+class TreasuryReconciliationSerializer(serializers.Serializer):
+    """Either payment_ids or a month selects the payments covered by one treasury receipt."""
+    treasury_payment_ref = serializers.CharField(max_length=100)
+    payment_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=10000,
+    )
+    month = serializers.RegexField(r'^\d{4}-\d{2}$', required=False)
+    tax_type_id = serializers.IntegerField(required=False, min_value=1)
+    expected_total = serializers.DecimalField(max_digits=14, decimal_places=3, required=False)
+
+    def validate(self, attrs):
+        if ('payment_ids' in attrs) == ('month' in attrs):
+            raise serializers.ValidationError("Indiquez soit payment_ids, soit month.")
+        return attrs
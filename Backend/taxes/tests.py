@@ -1,3 +1,234 @@
-from django.test import TestCase
+import datetime
+import io
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from clients.importer import ClientImporter
+from clients.models import Client
+from orders.models import PurchaseOrder, PurchaseOrderProduct
+from products.models import Product
+from . import certificates, declarations
+from .models import WithholdingTaxPayment, WithholdingTaxRollup, WithholdingTaxType
+
+
+def rollup_rows():
+    """Non-empty rollup rows, as comparable tuples."""
+    return {
+        (row.period, row.tax_type_id, row.client_type, row.payment_count,
+         row.amount, row.order_total_ttc, row.order_withholding_amount)
+        for row in WithholdingTaxRollup.objects.all()
+        if row.payment_count or row.amount or row.order_total_ttc or row.order_withholding_amount
+    }
+
+
+class TaxTestCase(TestCase):
+    def setUp(self):
+        self.tax_type = WithholdingTaxType.objects.first()
+        self.product = Product.objects.create(name='P', prix_unit=1000)
+        self.company = Client.objects.create(name='Société', client_type='COMPANY', tax_identification='1/A/M/000')
+        self.government = Client.objects.create(name='Ministère', client_type='GOVERNMENT')
+
+    def order(self, client, reference, quantity=1):
+        order = PurchaseOrder.objects.create(reference=reference, client=client)
+        PurchaseOrderProduct.objects.create(order=order, product=self.product, quantity=quantity)
+        order.refresh_from_db()
+        return order
+
+    def pay(self, order, day, amount='17.850'):
+        return WithholdingTaxPayment.objects.create(
+            purchase_order=order, tax_type=self.tax_type, amount=Decimal(amount), payment_date=day,
+        )
+
+
+
+
+class WithholdingTaxRollupTests(TaxTestCase):
+    def assertMatchesRebuild(self):
+        incremental = rollup_rows()
+        for period in {row[0] for row in incremental} | {
+            declarations.period_of(day) for day in WithholdingTaxPayment.objects.values_list('payment_date', flat=True)
+        }:
+            declarations.rebuild_period(period)
+        self.assertEqual(incremental, rollup_rows())
+
+    def test_create_edit_move_and_delete_payments(self):
+        first = self.order(self.company, 'BC-1')
+        second = self.order(self.government, 'BC-2', quantity=3)
+        payment = self.pay(first, datetime.date(2025, 6, 3))
+        other = self.pay(second, datetime.date(2025, 6, 20))
+        self.assertMatchesRebuild()
+
+        payment.amount = Decimal('10.000')
+        payment.payment_date = datetime.date(2025, 7, 1)
+        payment.save()
+        self.assertMatchesRebuild()
+
+        payment.purchase_order = second
+        payment.save()
+        self.assertMatchesRebuild()
+
+        other.delete()
+        self.assertMatchesRebuild()
+
+    def test_order_totals_change(self):
+        order = self.order(self.company, 'BC-1')
+        self.pay(order, datetime.date(2025, 6, 3))
+        PurchaseOrderProduct.objects.create(order=order, product=self.product, quantity=2)
+        self.assertMatchesRebuild()
+
+    def test_order_moved_to_a_client_of_another_type(self):
+        order = self.order(self.company, 'BC-1')
+        self.pay(order, datetime.date(2025, 6, 3))
+        self.pay(order, datetime.date(2025, 7, 3))
+        order.client = self.government
+        order.save()
+        self.assertMatchesRebuild()
+        self.assertFalse(any(row[2] == 'COMPANY' for row in rollup_rows()))
+
+    def test_client_type_change(self):
+        order = self.order(self.company, 'BC-1')
+        self.pay(order, datetime.date(2025, 6, 3))
+        self.company.client_type = 'GOVERNMENT'
+        self.company.save()
+        self.assertMatchesRebuild()
+
+    def test_client_type_change_through_import(self):
+        order = self.order(self.company, 'BC-1')
+        self.pay(order, datetime.date(2025, 6, 3))
+        ClientImporter().run([{
+            'name': 'Société', 'tax_identification': '1/A/M/000', 'client_type': 'GOVERNMENT',
+        }])
+        self.assertMatchesRebuild()
+
+
+class TaxAPITestCase(TaxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='manager'))
+        self.june = [
+            self.pay(self.order(self.company, 'BC-1'), datetime.date(2025, 6, 3)),
+            self.pay(self.order(self.government, 'BC-2', quantity=2), datetime.date(2025, 6, 20), amount='35.700'),
+        ]
+        self.july = self.pay(self.order(self.company, 'BC-3'), datetime.date(2025, 7, 1))
+
+
+class PaymentListTests(TaxAPITestCase):
+    def test_flat_rows(self):
+        with self.assertNumQueries(1):
+            results = self.client.get('/taxes/payments/').json()['results']
+        self.assertEqual([row['order_reference'] for row in results], ['BC-3', 'BC-2', 'BC-1'])
+        self.assertEqual(results[1]['client_name'], 'Ministère')
+        self.assertEqual(results[1]['amount'], '35.700')
+        self.assertNotIn('purchase_order', results[0])
+
+    def test_nested_detail_on_request(self):
+        self.pay(self.order(self.company, 'BC-4', quantity=4), datetime.date(2025, 7, 2))
+        # Payments with their orders, then prefetched items and products, whatever the number of rows.
+        with self.assertNumQueries(3):
+            results = self.client.get('/taxes/payments/?include=purchase_order').json()['results']
+        self.assertEqual(results[0]['purchase_order']['reference'], 'BC-4')
+
+    def test_filters(self):
+        WithholdingTaxPayment.objects.filter(pk=self.june[0].pk).update(is_paid_to_treasury=True)
+
+        def ids(query):
+            return [row['id'] for row in self.client.get(f'/taxes/payments/{query}').json()['results']]
+
+        self.assertEqual(ids('?month=2025-06'), [self.june[1].pk, self.june[0].pk])
+        self.assertEqual(ids('?month=2025-06&is_paid_to_treasury=false'), [self.june[1].pk])
+        self.assertEqual(ids('?date_from=2025-06-10&date_to=2025-07-01'), [self.july.pk, self.june[1].pk])
+        self.assertEqual(self.client.get('/taxes/payments/?month=2025-13').status_code, 400)
+
+
+class CertificateBatchTests(TaxAPITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(TAX_CERTIFICATE_DIR=directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def archive(self, query):
+        response = self.client.get(f'/taxes/certificates/{query}')
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_zip_of_a_month(self):
+        archive = self.archive('?month=2025-06')
+        first, second = self.june
+        self.assertEqual(archive.namelist(), [
+            f'certificat-{first.pk}-BC-1.html', f'certificat-{second.pk}-BC-2.html',
+        ])
+        content = archive.read(f'certificat-{second.pk}-BC-2.html').decode()
+        self.assertIn('Ministère', content)
+        self.assertIn('35.700 DT', content)
+
+    def test_cached_certificates_are_not_rendered_again(self):
+        first = self.archive(f'?ids={self.july.pk}').read(f'certificat-{self.july.pk}-BC-3.html')
+        with mock.patch.object(certificates, 'render_certificate') as render:
+            second = self.archive(f'?ids={self.july.pk}').read(f'certificat-{self.july.pk}-BC-3.html')
+        render.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_a_selection_is_required(self):
+        self.assertEqual(self.client.get('/taxes/certificates/').status_code, 400)
+        self.assertEqual(self.client.get('/taxes/certificates/?ids=1,x').status_code, 400)
+
+    def test_cache_directory_must_be_configured(self):
+        with override_settings(TAX_CERTIFICATE_DIR='', MEDIA_ROOT=''):
+            with self.assertRaises(ImproperlyConfigured):
+                certificates.cache_dir()
+        with override_settings(TAX_CERTIFICATE_DIR='', MEDIA_ROOT='/srv/media'):
+            self.assertEqual(certificates.cache_dir(), '/srv/media/taxes/certificates')
+
+
+class TreasuryReconciliationTests(TaxAPITestCase):
+    def reconcile(self, **data):
+        return self.client.post('/taxes/payments/treasury/', data, format='json')
+
+    def test_month_against_the_declaration(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.reconcile(treasury_payment_ref='Q-2025-06', month='2025-06').data
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 1)
+        self.assertEqual((data['matched'], data['updated']), (2, 2))
+        self.assertEqual(data['reconciled_total'], Decimal('53.550'))
+        self.assertEqual(data['difference'], 0)
+        self.assertEqual(
+            set(WithholdingTaxPayment.objects.filter(is_paid_to_treasury=True).values_list('treasury_payment_ref', flat=True)),
+            {'Q-2025-06'},
+        )
+
+    def test_ids_already_paid_missing_and_filtered_out(self):
+        first, second = self.june
+        WithholdingTaxPayment.objects.filter(pk=first.pk).update(is_paid_to_treasury=True, treasury_payment_ref='OLD')
+        other_type = WithholdingTaxType.objects.exclude(pk=self.tax_type.pk).first()
+        WithholdingTaxPayment.objects.filter(pk=self.july.pk).update(tax_type=other_type)
+        data = self.reconcile(
+            treasury_payment_ref='Q-1', payment_ids=[first.pk, second.pk, self.july.pk, 999999],
+            tax_type_id=self.tax_type.pk, expected_total='50.000',
+        ).data
+        self.assertEqual((data['matched'], data['updated']), (2, 1))
+        self.assertEqual(data['missing_ids'], [999999])
+        self.assertEqual(data['filtered_out_ids'], [self.july.pk])
+        self.assertEqual(data['already_paid_elsewhere']['ids'], [first.pk])
+        self.assertEqual(data['reconciled_total'], Decimal('35.700'))
+        self.assertEqual(data['difference'], Decimal('-14.300'))
+        first.refresh_from_db()
+        self.assertEqual(first.treasury_payment_ref, 'OLD')
+
+    def test_payment_ids_or_month(self):
+        self.assertEqual(self.reconcile(treasury_payment_ref='Q').status_code, 400)
+        self.assertEqual(self.reconcile(treasury_payment_ref='Q', month='2025-06', payment_ids=[1]).status_code, 400)
+        self.assertEqual(self.reconcile(treasury_payment_ref='Q', month='2025-13').status_code, 400)
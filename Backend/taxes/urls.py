@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import WithholdingTaxTypeAPIView, WithholdingTaxPaymentAPIView
+from .views import WithholdingTaxTypeAPIView, WithholdingTaxPaymentAPIView, WithholdingTaxDeclarationAPIView, \
+    WithholdingTaxCertificateBatchAPIView, TreasuryReconciliationAPIView
 
 urlpatterns = [
     # Tax Types endpoints
@@ -9,4 +10,13 @@ urlpatterns = [
     # Tax Payments endpoints
     path('payments/', WithholdingTaxPaymentAPIView.as_view(), name='tax-payment-list'),
     path('payments/<int:pk>/', WithholdingTaxPaymentAPIView.as_view(), name='tax-payment-detail'),
+    path('payments/treasury/', TreasuryReconciliationAPIView.as_view(), name='tax-payment-treasury'),
+
+    # Certificates
+    path('certificates/', WithholdingTaxCertificateBatchAPIView.as_view(), name='tax-certificates'),
+
+    # Monthly declarations
+    path('declarations/<str:month>/', WithholdingTaxDeclarationAPIView.as_view(), name='tax-declaration'),
+    path('declarations/<str:month>/export/', WithholdingTaxDeclarationAPIView.as_view(),
+         {'export': True}, name='tax-declaration-export'),
 ]
\ No newline at end of file
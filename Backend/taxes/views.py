@@ -1,21 +1,33 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
+from gestion.listing import IndexedListMixin
+from gestion.periods import date_param, month_bounds, month_param
+from . import certificates, declarations
 from .models import WithholdingTaxType, WithholdingTaxPayment
-from .serializers import WithholdingTaxTypeSerializer, WithholdingTaxPaymentSerializer
+from .serializers import (
+    WithholdingTaxTypeSerializer, WithholdingTaxPaymentSerializer, WithholdingTaxPaymentListSerializer,
+    TreasuryReconciliationSerializer,
+)
 
 
-class WithholdingTaxTypeAPIView(APIView):
+class WithholdingTaxTypeAPIView(IndexedListMixin, APIView):
+    list_model = WithholdingTaxType
+    default_ordering = ('id',)
+
     def get(self, request, pk=None):
         if pk:
             tax_type = get_object_or_404(WithholdingTaxType, pk=pk)
             serializer = WithholdingTaxTypeSerializer(tax_type)
             return Response(serializer.data)
 
-        tax_types = WithholdingTaxType.objects.all()
-        serializer = WithholdingTaxTypeSerializer(tax_types, many=True)
-        return Response(serializer.data)
+        return self.list_response(WithholdingTaxType.objects.all(), WithholdingTaxTypeSerializer)
 
     def post(self, request):
         serializer = WithholdingTaxTypeSerializer(data=request.data)
@@ -38,16 +50,57 @@ class WithholdingTaxTypeAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class WithholdingTaxPaymentAPIView(APIView):
+def with_order_detail(payments):
+    """Everything WithholdingTaxPaymentSerializer touches, in a fixed number of queries."""
+    return payments.select_related('purchase_order__client', 'tax_type').prefetch_related(
+        'purchase_order__items__product',
+    )
+
+
+def filter_payments(payments, params):
+    """
+    Filter payments by period and treasury status.
+    Example: ?month=2025-06 or ?date_from=2025-06-01&date_to=2025-06-30, and ?is_paid_to_treasury=false
+    """
+    month = month_param(params)
+    if month:
+        payments = payments.filter(payment_date__range=month)
+    date_from = date_param(params, 'date_from')
+    if date_from:
+        payments = payments.filter(payment_date__gte=date_from)
+    date_to = date_param(params, 'date_to')
+    if date_to:
+        payments = payments.filter(payment_date__lte=date_to)
+    paid = params.get('is_paid_to_treasury')
+    if paid in ('1', 'true', 'True'):
+        payments = payments.filter(is_paid_to_treasury=True)
+    elif paid in ('0', 'false', 'False'):
+        payments = payments.filter(is_paid_to_treasury=False)
+    return payments
+
+
+class WithholdingTaxPaymentAPIView(IndexedListMixin, APIView):
+    # Period and treasury filters come from filter_payments, over the same indexes.
+    list_model = WithholdingTaxPayment
+    default_ordering = ('-payment_date', '-id')
+    page_size = 100
+    max_page_size = 1000
+
     def get(self, request, pk=None):
         if pk:
-            payment = get_object_or_404(WithholdingTaxPayment, pk=pk)
+            payment = get_object_or_404(with_order_detail(WithholdingTaxPayment.objects.all()), pk=pk)
             serializer = WithholdingTaxPaymentSerializer(payment)
             return Response(serializer.data)
 
-        payments = WithholdingTaxPayment.objects.select_related('purchase_order', 'tax_type').all()
-        serializer = WithholdingTaxPaymentSerializer(payments, many=True)
-        return Response(serializer.data)
+        # Flat rows by default, nested order detail only with ?include=purchase_order
+        payments = filter_payments(WithholdingTaxPayment.objects.all(), request.query_params)
+        if 'purchase_order' in request.query_params.get('include', '').split(','):
+            payments, serializer_class = with_order_detail(payments), WithholdingTaxPaymentSerializer
+        else:
+            payments = payments.select_related('purchase_order__client', 'tax_type')
+            serializer_class = WithholdingTaxPaymentListSerializer
+
+        return self.list_response(payments, serializer_class)
 
     def post(self, request):
         serializer = WithholdingTaxPaymentSerializer(data=request.data)
@@ -70,6 +123,123 @@ class WithholdingTaxPaymentAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class TreasuryReconciliationAPIView(APIView):
+    """
+    Mark the payments covered by a treasury receipt as paid in one UPDATE.
+    Example: POST /taxes/payments/treasury/ {"treasury_payment_ref": "Q-2025-06", "month": "2025-06"}
+    Payments already paid under another receipt are left alone and reported.
+    With payment_ids, ids that do not exist are listed in missing_ids and ids
+    excluded by tax_type_id in filtered_out_ids.
+    """
+    MAX_LISTED_IDS = 100
+
+    def post(self, request):
+        serializer = TreasuryReconciliationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        ref = data['treasury_payment_ref']
+
+        payments = WithholdingTaxPayment.objects.all()
+        period = None
+        if 'month' in data:
+            period = month_bounds(data['month'])
+            if period is None:
+                raise ValidationError({'month': "Mois invalide, format attendu AAAA-MM."})
+            payments = payments.filter(payment_date__range=period)
+        else:
+            payments = payments.filter(pk__in=data['payment_ids'])
+        if 'tax_type_id' in data:
+            payments = payments.filter(tax_type_id=data['tax_type_id'])
+
+        conflict = Q(is_paid_to_treasury=True) & ~Q(treasury_payment_ref=ref)
+        with transaction.atomic():
+            # Locked first, then aggregated: FOR UPDATE cannot be combined with aggregates on every backend.
+            locked = list(payments.select_for_update().values_list('pk', flat=True))
+            payments = WithholdingTaxPayment.objects.filter(pk__in=locked)
+            summary = payments.aggregate(
+                count=Count('id'),
+                total=Sum('amount'),
+                conflict_count=Count('id', filter=conflict),
+                conflict_total=Sum('amount', filter=conflict),
+            )
+            conflicting_ids = list(payments.filter(conflict).values_list('id', flat=True)[:self.MAX_LISTED_IDS])
+            updated = payments.exclude(conflict).update(is_paid_to_treasury=True, treasury_payment_ref=ref)
+
+        zero = Decimal('0.000')
+        reconciled_total = (summary['total'] or zero) - (summary['conflict_total'] or zero)
+        expected = data.get('expected_total')
+        if expected is None and period is not None and 'tax_type_id' not in data:
+            expected = declarations.declaration(period[0])['total']['amount']
+
+        missing_ids, filtered_out_ids = [], []
+        if 'payment_ids' in data:
+            matched = set(locked)
+            existing = set(WithholdingTaxPayment.objects.filter(pk__in=data['payment_ids']).values_list('id', flat=True))
+            missing_ids = [pk for pk in data['payment_ids'] if pk not in existing][:self.MAX_LISTED_IDS]
+            filtered_out_ids = [
+                pk for pk in data['payment_ids'] if pk in existing and pk not in matched
+            ][:self.MAX_LISTED_IDS]
+
+        return Response({
+            'treasury_payment_ref': ref,
+            'matched': summary['count'],
+            'updated': updated,
+            'reconciled_total': reconciled_total,
+            'expected_total': expected,
+            'difference': reconciled_total - expected if expected is not None else None,
+            'missing_ids': missing_ids,
+            'filtered_out_ids': filtered_out_ids,
+            'already_paid_elsewhere': {
+                'count': summary['conflict_count'],
+                'total': summary['conflict_total'] or zero,
+                'ids': conflicting_ids,
+            },
+        })
+
+
+class WithholdingTaxDeclarationAPIView(APIView):
+    """
+    Monthly declaration totals per tax type and client type, read from the rollups.
+    Example: /taxes/declarations/2025-06/ or /taxes/declarations/2025-06/export/ for CSV
+    """
+    def get(self, request, month, export=False):
+        bounds = month_bounds(month)
+        if bounds is None:
+            raise ValidationError({'month': "Mois invalide, format attendu AAAA-MM."})
+        data = declarations.declaration(bounds[0])
+        if not export:
+            return Response(data)
+        response = HttpResponse(declarations.declaration_csv(data), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="declaration-retenues-{month}.csv"'
+        return response
+
+
+class WithholdingTaxCertificateBatchAPIView(APIView):
+    """
+    ZIP of certificates for the payments matching the list filters, or ?ids=1,2,3.
+    Example: /taxes/certificates/?month=2025-06
+    """
+    MAX_CERTIFICATES = 5000
+
+    def get(self, request):
+        payments = filter_payments(WithholdingTaxPayment.objects.all(), request.query_params)
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                payments = payments.filter(pk__in=[int(pk) for pk in ids.split(',')])
+            except ValueError:
+                raise ValidationError({'ids': "Liste d'identifiants invalide."})
+        elif not set(request.query_params) & {'month', 'date_from', 'date_to'}:
+            raise ValidationError({'month': "Précisez une période ou une liste d'identifiants."})
+        if payments.count() > self.MAX_CERTIFICATES:
+            raise ValidationError({'detail': f"Au plus {self.MAX_CERTIFICATES} certificats par lot."})
+
+        rendered = certificates.build_batch(payments)
+        response = StreamingHttpResponse(certificates.stream_zip(rendered), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="certificats-retenue.zip"'
+        return response
+
+
 from django.shortcuts import render
 
 # Create your views here.
@@ -0,0 +1,40 @@
+"""
+Maintenance scheduling for tools.
+
+``Tool.next_maintenance_due`` is stored and indexed so due and overdue
+lists are range scans. It is recomputed on save, and for every tool of a
+type when that type's MaintenanceInterval changes (see tools.receivers).
+"""
+from datetime import date, timedelta
+
+from django.db.models import Q
+
+from .models import MaintenanceInterval, Tool
+
+
+def reschedule(tool_type):
+    """Recompute next_maintenance_due for every tool of ``tool_type``; return the number changed."""
+    interval = MaintenanceInterval.days_for(tool_type)
+    tools = Tool.objects.filter(Q(type=tool_type) if tool_type else Q(type='') | Q(type__isnull=True))
+    changed = []
+    for tool in tools.only('id', 'purchase_date', 'last_maintenance', 'next_maintenance_due'):
+        due = tool.compute_next_maintenance_due(interval)
+        if due != tool.next_maintenance_due:
+            tool.next_maintenance_due = due
+            changed.append(tool)
+    Tool.objects.bulk_update(changed, ['next_maintenance_due'], batch_size=500)
+    return len(changed)
+
+
+def due_tools(within_days=7, overdue_only=False, location=None, condition=None, today=None):
+    """Tools due within ``within_days`` (overdue ones included), or strictly overdue."""
+    today = today or date.today()
+    if overdue_only:
+        tools = Tool.objects.filter(next_maintenance_due__lt=today)
+    else:
+        tools = Tool.objects.filter(next_maintenance_due__lte=today + timedelta(days=within_days))
+    if location:
+        tools = tools.filter(location=location)
+    if condition:
+        tools = tools.filter(condition=condition)
+    return tools
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:57
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+# MaintenanceInterval.DEFAULT_DAYS: no interval exists yet when this runs.
+DEFAULT_DAYS = 180
+
+
+def populate_next_due(apps, schema_editor):
+    Tool = apps.get_model('tools', 'Tool')
+    rows = list(Tool.objects.only('id', 'purchase_date', 'last_maintenance'))
+    for row in rows:
+        base = row.last_maintenance or row.purchase_date
+        row.next_maintenance_due = base + timedelta(days=DEFAULT_DAYS) if base else None
+    Tool.objects.bulk_update(rows, ['next_maintenance_due'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tool_type', models.CharField(max_length=255, unique=True)),
+                ('interval_days', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='next_maintenance_due',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['next_maintenance_due', 'id'], name='tools_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['location', 'next_maintenance_due'], name='tools_location_due_idx'),
+        ),
+        migrations.RunPython(populate_next_due, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0002_maintenance_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolAuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.UUIDField(db_index=True)),
+                ('operation', models.CharField(max_length=30)),
+                ('field', models.CharField(max_length=30)),
+                ('old_value', models.CharField(blank=True, max_length=255, null=True)),
+                ('new_value', models.CharField(blank=True, max_length=255, null=True)),
+                ('username', models.CharField(blank=True, default='', max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tool', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_entries', to='tools.tool')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='toolauditentry',
+            index=models.Index(fields=['tool', 'created_at'], name='tools_audit_tool_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0003_tool_audit'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['name', 'id'], name='tools_name_id_idx'),
+        ),
+    ]
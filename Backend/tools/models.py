@@ -1,11 +1,31 @@
+from datetime import timedelta
+
 from django.db import models
 
+
+class MaintenanceInterval(models.Model):
+    """Days between two maintenances for every tool of a given ``Tool.type``."""
+    DEFAULT_DAYS = 180
+
+    tool_type = models.CharField(max_length=255, unique=True)
+    interval_days = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.tool_type}: {self.interval_days} j"
+
+    @classmethod
+    def days_for(cls, tool_type):
+        days = cls.objects.filter(tool_type=tool_type or '').values_list('interval_days', flat=True).first()
+        return cls.DEFAULT_DAYS if days is None else days
+
+
 class Tool(models.Model):
     CONDITION_CHOICES = [
         ('good', 'Good'),
         ('repair', 'Needs Repair'),
         ('broken', 'Broken'),
     ]
+    SCHEDULE_FIELDS = ('type', 'purchase_date', 'last_maintenance')
 
     name = models.CharField(max_length=255)
     type = models.CharField(max_length=255, blank=True, null=True)  # e.g., drill, saw
@@ -16,6 +36,47 @@ class Tool(models.Model):
     condition = models.CharField(max_length=20, choices=CONDITION_CHOICES, default='good')
     location = models.CharField(max_length=255, blank=True, null=True)
     last_maintenance = models.DateField(blank=True, null=True)
+    # Derived from last_maintenance (or purchase_date) and the type's interval.
+    next_maintenance_due = models.DateField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_maintenance_due', 'id'], name='tools_due_idx'),
+            models.Index(fields=['location', 'next_maintenance_due'], name='tools_location_due_idx'),
+            models.Index(fields=['name', 'id'], name='tools_name_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.quantity})"
+
+    def compute_next_maintenance_due(self, interval_days):
+        base = self.last_maintenance or self.purchase_date
+        return base + timedelta(days=interval_days) if base else None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.SCHEDULE_FIELDS):
+            self.next_maintenance_due = self.compute_next_maintenance_due(MaintenanceInterval.days_for(self.type))
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'next_maintenance_due'}
+        super().save(*args, **kwargs)
+
+
+class ToolAuditEntry(models.Model):
+    """One field change made to one tool by a bulk operation."""
+    batch = models.UUIDField(db_index=True)
+    tool = models.ForeignKey(Tool, on_delete=models.SET_NULL, null=True, related_name='audit_entries')
+    operation = models.CharField(max_length=30)
+    field = models.CharField(max_length=30)
+    old_value = models.CharField(max_length=255, blank=True, null=True)
+    new_value = models.CharField(max_length=255, blank=True, null=True)
+    username = models.CharField(max_length=150, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tool', 'created_at'], name='tools_audit_tool_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} {self.field}: {self.old_value} -> {self.new_value}"
@@ -0,0 +1,99 @@
+"""
+Bulk inventory operations on tools.
+
+Each operation is one set-based UPDATE inside a transaction. The previous
+values are read once under a row lock and written to ToolAuditEntry with a
+single bulk_create, one entry per changed field (maintenance also moves
+next_maintenance_due).
+"""
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.fields import DateField
+
+from .models import MaintenanceInterval, Tool, ToolAuditEntry
+
+OPERATION_FIELDS = {
+    'relocate': 'location',
+    'condition': 'condition',
+    'adjust_quantity': 'quantity',
+    'maintenance': 'last_maintenance',
+}
+# Fields an operation changes besides its own, recorded in the audit too.
+DERIVED_FIELDS = {
+    'maintenance': ('next_maintenance_due',),
+}
+
+
+class OperationError(Exception):
+    pass
+
+
+def _maintenance_updates(tools, performed_on):
+    """
+    last_maintenance plus next_maintenance_due, one CASE branch per tool type.
+    A NULL type shares the interval of '', as in MaintenanceInterval.days_for.
+    """
+    types = {tool_type or '' for tool_type in tools.values_list('type', flat=True).distinct()}
+    intervals = dict(MaintenanceInterval.objects.filter(tool_type__in=types).values_list(
+        'tool_type', 'interval_days',
+    ))
+    default_due = performed_on + timedelta(days=MaintenanceInterval.DEFAULT_DAYS)
+    return {
+        'last_maintenance': performed_on,
+        'next_maintenance_due': Case(
+            *[
+                When(
+                    Q(type=tool_type) | Q(type__isnull=True) if tool_type == '' else Q(type=tool_type),
+                    then=Value(performed_on + timedelta(days=days)),
+                )
+                for tool_type, days in intervals.items()
+            ],
+            default=Value(default_due),
+            output_field=DateField(),
+        ),
+    }
+
+
+def apply(operation, tools, value, username=''):
+    """Apply ``operation`` with ``value`` to the ``tools`` queryset; return a summary."""
+    field = OPERATION_FIELDS[operation]
+    fields = (field,) + DERIVED_FIELDS.get(operation, ())
+    batch = uuid.uuid4()
+    with transaction.atomic():
+        before = {pk: values for pk, *values in tools.select_for_update().values_list('id', *fields)}
+        targets = Tool.objects.filter(pk__in=list(before))
+        if operation == 'adjust_quantity':
+            if value < 0 and targets.filter(quantity__lt=-value).exists():
+                raise OperationError("La quantité deviendrait négative pour au moins un outil.")
+            updates = {'quantity': F('quantity') + value}
+        elif operation == 'maintenance':
+            updates = _maintenance_updates(targets, value)
+        else:
+            updates = {field: value}
+        updated = targets.update(**updates)
+
+        if operation == 'adjust_quantity':
+            after = {pk: [old + value] for pk, (old,) in before.items()}
+        elif len(fields) > 1:
+            # Derived values come from the CASE, read them back.
+            after = {pk: [value, *derived] for pk, *derived in targets.values_list('id', *fields[1:])}
+        else:
+            after = {pk: [value] for pk in before}
+        ToolAuditEntry.objects.bulk_create([
+            ToolAuditEntry(
+                batch=batch,
+                tool_id=pk,
+                operation=operation,
+                field=name,
+                old_value=None if old is None else str(old),
+                new_value=None if new is None else str(new),
+                username=username,
+            )
+            for pk, old_values in before.items()
+            for name, old, new in zip(fields, old_values, after[pk])
+            if old != new
+        ], batch_size=1000)
+    return {'batch': batch, 'operation': operation, 'matched': len(before), 'updated': updated}
@@ -0,0 +1,31 @@
+"""Reschedule tools when their type's maintenance interval changes."""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import maintenance
+from .models import MaintenanceInterval
+
+
+@receiver(pre_save, sender=MaintenanceInterval)
+def remember_previous_type(sender, instance, raw=False, **kwargs):
+    instance._previous_tool_type = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_tool_type = (
+        MaintenanceInterval.objects.filter(pk=instance.pk).values_list('tool_type', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=MaintenanceInterval)
+def reschedule_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_tool_type', None)
+    if previous is not None and previous != instance.tool_type:
+        maintenance.reschedule(previous)
+    maintenance.reschedule(instance.tool_type)
+
+
+@receiver(post_delete, sender=MaintenanceInterval)
+def reschedule_on_delete(sender, instance, **kwargs):
+    maintenance.reschedule(instance.tool_type)
@@ -1,7 +1,64 @@
 from rest_framework import serializers
-from .models import Tool
+from .models import Tool, MaintenanceInterval, ToolAuditEntry
+from .operations import OPERATION_FIELDS
 
 class ToolSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tool
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class MaintenanceIntervalSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MaintenanceInterval
+        fields = ('id', 'tool_type', 'interval_days')
+        # Upserted by tool_type in MaintenanceIntervalAPIView.post.
+        extra_kwargs = {'tool_type': {'validators': []}}
+
+    def validate_interval_days(self, value):
+        if value < 1:
+            raise serializers.ValidationError("L'intervalle doit être d'au moins un jour.")
+        return value
+
+
+
+class ToolSelectionFilterSerializer(serializers.Serializer):
+    location = serializers.CharField(required=False, allow_blank=True)
+    condition = serializers.ChoiceField(choices=Tool.CONDITION_CHOICES, required=False)
+    type = serializers.CharField(required=False, allow_blank=True)
+
+
+class ToolBulkOperationSerializer(serializers.Serializer):
+    """
+    {"operation": "relocate", "ids": [1, 2], "location": "Dépôt"}
+    {"operation": "condition", "filter": {"location": "Atelier"}, "condition": "repair"}
+    {"operation": "adjust_quantity", "ids": [3], "delta": -1}
+    {"operation": "maintenance", "filter": {"type": "perceuse"}, "date": "2025-06-30"}
+    """
+    operation = serializers.ChoiceField(choices=list(OPERATION_FIELDS))
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False,
+                                max_length=10000)
+    filter = ToolSelectionFilterSerializer(required=False)
+    location = serializers.CharField(required=False, allow_blank=True, allow_null=True, max_length=255)
+    condition = serializers.ChoiceField(choices=Tool.CONDITION_CHOICES, required=False)
+    delta = serializers.IntegerField(required=False)
+    date = serializers.DateField(required=False)
+
+    VALUE_FIELDS = {'relocate': 'location', 'condition': 'condition', 'adjust_quantity': 'delta', 'maintenance': 'date'}
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Indiquez soit ids, soit filter.")
+        if 'filter' in attrs and not attrs['filter']:
+            raise serializers.ValidationError({'filter': "Au moins un critère est requis."})
+        value_field = self.VALUE_FIELDS[attrs['operation']]
+        if value_field not in attrs:
+            raise serializers.ValidationError({value_field: "Champ obligatoire pour cette opération."})
+        attrs['value'] = attrs[value_field]
+        return attrs
+
+
+class ToolAuditEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ToolAuditEntry
+        fields = ('id', 'batch', 'operation', 'field', 'old_value', 'new_value', 'username', 'created_at')
@@ -1,3 +1,120 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import MaintenanceInterval, Tool, ToolAuditEntry
+
+
+class ToolAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='magasinier'))
+        self.today = date.today()
+
+    def tool(self, name, days_ago=None, **fields):
+        if days_ago is not None:
+            fields['last_maintenance'] = self.today - timedelta(days=days_ago)
+        return Tool.objects.create(name=name, **fields)
+
+
+class MaintenanceScheduleTests(ToolAPITestCase):
+    def setUp(self):
+        super().setUp()
+        MaintenanceInterval.objects.create(tool_type='perceuse', interval_days=30)
+        # Due in 2 days, overdue by 5 days, due in 3 days elsewhere, then far off and unscheduled.
+        self.drill = self.tool('Perceuse', days_ago=28, type='perceuse', location='Atelier')
+        self.saw = self.tool('Scie', days_ago=MaintenanceInterval.DEFAULT_DAYS + 5, location='Atelier',
+                             condition='repair')
+        self.grinder = self.tool('Meuleuse', days_ago=27, type='perceuse', location='Dépôt')
+        self.tool('Niveau', days_ago=1, location='Atelier')
+        self.tool('Marteau', location='Atelier')
+
+    def names(self, url):
+        names = []
+        while url:
+            page = self.client.get(url).json()
+            names += [tool['name'] for tool in page['results']]
+            url = page['next']
+        return names
+
+    def test_due_date_is_kept_on_save(self):
+        self.assertEqual(self.drill.next_maintenance_due, self.today + timedelta(days=2))
+        self.drill.last_maintenance = self.today
+        self.drill.save(update_fields=['last_maintenance'])
+        self.drill.refresh_from_db()
+        self.assertEqual(self.drill.next_maintenance_due, self.today + timedelta(days=30))
+        self.assertIsNone(Tool.objects.get(name='Marteau').next_maintenance_due)
+
+    def test_interval_changes_reschedule_the_type(self):
+        response = self.client.post('/tools/maintenance/intervals/', {'tool_type': 'perceuse', 'interval_days': 60})
+        self.assertEqual(response.status_code, 200)
+        self.grinder.refresh_from_db()
+        self.assertEqual(self.grinder.next_maintenance_due, self.today + timedelta(days=33))
+        MaintenanceInterval.objects.all().delete()
+        self.grinder.refresh_from_db()
+        self.assertEqual(
+            self.grinder.next_maintenance_due, self.today + timedelta(days=MaintenanceInterval.DEFAULT_DAYS - 27),
+        )
+
+    def test_due_and_overdue(self):
+        self.assertEqual(self.names('/tools/maintenance/due/?page_size=1'), ['Scie', 'Perceuse', 'Meuleuse'])
+        self.assertEqual(self.names('/tools/maintenance/due/?within=2'), ['Scie', 'Perceuse'])
+        self.assertEqual(self.names('/tools/maintenance/overdue/'), ['Scie'])
+        self.assertEqual(self.names('/tools/maintenance/due/?location=Atelier&condition=good'), ['Perceuse'])
+        self.assertEqual(self.client.get('/tools/maintenance/due/?within=x').status_code, 400)
+        self.assertEqual(self.client.get('/tools/maintenance/due/?condition=lost').status_code, 400)
+
+
+class BulkOperationTests(ToolAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.drill = self.tool('Perceuse', type='perceuse', location='Atelier', quantity=3)
+        self.saw = self.tool('Scie', type='', location='Atelier', quantity=1)
+        self.level = self.tool('Niveau', location='Dépôt', quantity=2)
+
+    def bulk(self, **data):
+        return self.client.post('/tools/bulk/', data, format='json')
+
+    def test_relocate_by_ids_with_one_audit_row_per_change(self):
+        data = self.bulk(operation='relocate', ids=[self.drill.pk, self.level.pk, 999], location='Dépôt').json()
+        self.assertEqual((data['matched'], data['updated'], data['missing_ids']), (2, 2, [999]))
+        self.assertEqual(set(Tool.objects.filter(location='Dépôt').values_list('name', flat=True)), {'Perceuse', 'Niveau'})
+        # Niveau was already there: nothing to record.
+        entries = ToolAuditEntry.objects.all()
+        self.assertEqual(
+            [(entry.tool_id, entry.field, entry.old_value, entry.new_value, entry.username) for entry in entries],
+            [(self.drill.pk, 'location', 'Atelier', 'Dépôt', 'magasinier')],
+        )
+        history = self.client.get(f'/tools/{self.drill.pk}/history/').json()
+        self.assertEqual(history[0]['batch'], data['batch'])
+
+    def test_negative_quantities_are_rejected(self):
+        response = self.bulk(operation='adjust_quantity', filter={'location': 'Atelier'}, delta=-2)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(Tool.objects.order_by('id').values_list('quantity', flat=True)), [3, 1, 2])
+        self.assertFalse(ToolAuditEntry.objects.exists())
+
+        response = self.bulk(operation='adjust_quantity', filter={'location': 'Atelier'}, delta=-1)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(list(Tool.objects.order_by('id').values_list('quantity', flat=True)), [2, 0, 2])
+        self.assertEqual(ToolAuditEntry.objects.filter(field='quantity').count(), 2)
+
+    def test_empty_criteria_match_null(self):
+        MaintenanceInterval.objects.create(tool_type='', interval_days=10)
+        response = self.bulk(operation='maintenance', filter={'type': ''}, date=str(self.today))
+        self.assertEqual(response.json()['updated'], 2)
+        self.level.refresh_from_db()
+        self.assertEqual(
+            (self.level.last_maintenance, self.level.next_maintenance_due), (self.today, self.today + timedelta(days=10)),
+        )
+        self.assertEqual(
+            set(ToolAuditEntry.objects.filter(tool=self.level).values_list('field', flat=True)),
+            {'last_maintenance', 'next_maintenance_due'},
+        )
 
-# Create your tests here.
+    def test_invalid_requests(self):
+        self.assertEqual(self.bulk(operation='relocate', location='Dépôt').status_code, 400)
+        self.assertEqual(self.bulk(operation='relocate', filter={}, location='Dépôt').status_code, 400)
+        self.assertEqual(self.bulk(operation='condition', ids=[self.drill.pk]).status_code, 400)
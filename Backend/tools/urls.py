@@ -1,9 +1,19 @@
 from django.urls import path
-from .views import ToolAPIView
+from .views import (
+    ToolAPIView, ToolMaintenanceDueAPIView, MaintenanceIntervalAPIView, ToolBulkOperationAPIView, ToolHistoryAPIView,
+)
 
 urlpatterns = [
     # List and create tools
     path('', ToolAPIView.as_view()),
     # Retrieve, update, delete a single tool by pk
     path('<int:pk>/', ToolAPIView.as_view()),
+    path('<int:pk>/history/', ToolHistoryAPIView.as_view()),
+    # Inventory operations over many tools
+    path('bulk/', ToolBulkOperationAPIView.as_view()),
+    # Maintenance schedule
+    path('maintenance/due/', ToolMaintenanceDueAPIView.as_view()),
+    path('maintenance/overdue/', ToolMaintenanceDueAPIView.as_view(overdue=True)),
+    path('maintenance/intervals/', MaintenanceIntervalAPIView.as_view()),
+    path('maintenance/intervals/<int:pk>/', MaintenanceIntervalAPIView.as_view()),
 ]
@@ -1,20 +1,31 @@
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Tool
-from .serializers import ToolSerializer
+from rest_framework.exceptions import ValidationError
+from gestion.listing import IndexedListMixin
+from . import operations
+from .maintenance import due_tools
+from .models import Tool, MaintenanceInterval, ToolAuditEntry
+from .serializers import (
+    ToolSerializer, MaintenanceIntervalSerializer, ToolBulkOperationSerializer, ToolAuditEntrySerializer,
+)
+
+class ToolAPIView(IndexedListMixin, APIView):
+    """Example: /tools/?location=Atelier&ordering=-name"""
+    list_model = Tool
+    filter_fields = {'location': 'location'}
+    ordering_fields = {'name': 'name'}
+    default_ordering = ('name', 'id')
 
-class ToolAPIView(APIView):
     def get(self, request, pk=None):
         if pk:
             tool = get_object_or_404(Tool, pk=pk)
             serializer = ToolSerializer(tool)
             return Response(serializer.data)
 
-        tools = Tool.objects.all()
-        serializer = ToolSerializer(tools, many=True)
-        return Response(serializer.data)
+        return self.list_response(self.filter_list(Tool.objects.all()), ToolSerializer)
 
     def post(self, request):
         serializer = ToolSerializer(data=request.data)
@@ -35,3 +46,101 @@ class ToolAPIView(APIView):
         tool = get_object_or_404(Tool, pk=pk)
         tool.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ToolMaintenanceDueAPIView(IndexedListMixin, APIView):
+    """
+    Tools due for maintenance, most urgent first, through the next_maintenance_due index.
+    /tools/maintenance/due/?within=7&location=Atelier&condition=good
+    /tools/maintenance/overdue/?location=Atelier
+    """
+    list_model = Tool
+    default_ordering = ('next_maintenance_due', 'id')
+    # due_tools() filters on next_maintenance_due, unscheduled tools are never listed.
+    non_null_fields = ('next_maintenance_due',)
+    overdue = False
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            within = int(params.get('within', 7))
+        except ValueError:
+            within = -1
+        if within < 0:
+            raise ValidationError({'within': "Nombre de jours invalide."})
+        condition = params.get('condition')
+        if condition and condition not in dict(Tool.CONDITION_CHOICES):
+            raise ValidationError({'condition': "État invalide."})
+
+        tools = due_tools(within, overdue_only=self.overdue, location=params.get('location'), condition=condition)
+        return self.list_response(tools, ToolSerializer)
+
+
+class MaintenanceIntervalAPIView(APIView):
+    """Maintenance interval per tool type. POST creates or replaces the interval of a type."""
+
+    def get(self, request):
+        intervals = MaintenanceInterval.objects.order_by('tool_type')
+        return Response({
+            'default_interval_days': MaintenanceInterval.DEFAULT_DAYS,
+            'intervals': MaintenanceIntervalSerializer(intervals, many=True).data,
+        })
+
+    def post(self, request):
+        serializer = MaintenanceIntervalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        interval = MaintenanceInterval.objects.filter(tool_type=serializer.validated_data['tool_type']).first()
+        created = interval is None
+        if created:
+            interval = MaintenanceInterval(tool_type=serializer.validated_data['tool_type'])
+        interval.interval_days = serializer.validated_data['interval_days']
+        # Saving reschedules every tool of the type, see tools.receivers.
+        interval.save()
+        return Response(
+            MaintenanceIntervalSerializer(interval).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def delete(self, request, pk):
+        get_object_or_404(MaintenanceInterval, pk=pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+
+def selection_filter(criteria):
+    """Q for a bulk selection; an empty value also matches NULL, both mean "not set"."""
+    query = Q()
+    for field, value in criteria.items():
+        query &= Q(**{field: value}) | Q(**{f'{field}__isnull': True}) if value == '' else Q(**{field: value})
+    return query
+
+
+class ToolBulkOperationAPIView(APIView):
+    """Relocate, change condition, adjust quantity or record maintenance for many tools at once."""
+
+    def post(self, request):
+        serializer = ToolBulkOperationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if 'ids' in data:
+            tools = Tool.objects.filter(pk__in=data['ids'])
+        else:
+            tools = Tool.objects.filter(selection_filter(data['filter']))
+        username = request.user.get_username() if request.user.is_authenticated else ''
+        try:
+            result = operations.apply(data['operation'], tools, data['value'], username=username)
+        except operations.OperationError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if 'ids' in data:
+            found = set(tools.values_list('id', flat=True))
+            result['missing_ids'] = [pk for pk in data['ids'] if pk not in found]
+        return Response(result)
+
+
+class ToolHistoryAPIView(APIView):
+    LIMIT = 100
+
+    def get(self, request, pk):
+        get_object_or_404(Tool, pk=pk)
+        entries = ToolAuditEntry.objects.filter(tool_id=pk).order_by('-created_at', '-id')[:self.LIMIT]
+        return Response(ToolAuditEntrySerializer(entries, many=True).data)
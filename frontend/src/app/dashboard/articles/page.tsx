@@ -23,6 +23,7 @@ import {
 } from "@mui/material";
 import { Add, Delete, Search } from "@mui/icons-material";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 import Swal from "sweetalert2";
 import Protected from "@/components/Protected";
 
@@ -71,9 +72,7 @@ export default function ArticlesPage() {
   // --- Fetchers
   const fetchCategories = async () => {
     try {
-      const res = await fetch(`${API_BASE}/categories/`);
-      if (!res.ok) return;
-      const data = await res.json();
+      const data = await fetchAll<Categorie>(`${API_BASE}/categories/`);
       setCategories(data);
     } catch (error) {
       console.error("Erreur lors du chargement des catégories:", error);
@@ -83,9 +82,7 @@ export default function ArticlesPage() {
 
   const fetchArticles = async () => {
     try {
-      const res = await fetch(`${API_BASE}/`);
-      if (!res.ok) return;
-      const data: ApiArticle[] = await res.json();
+      const data = await fetchAll<ApiArticle>(`${API_BASE}/`);
 
       // Adapter à notre shape UI (category_id en write-only)
       const mapped: Article[] = data.map((a) => ({
@@ -25,6 +25,7 @@ import {
   Menu,
 } from '@mui/material';
 import { config } from '@/config';
+import { fetchAll } from '@/lib/fetch-all';
 import AddIcon from '@mui/icons-material/Add';
 import SearchIcon from '@mui/icons-material/Search';
 import MoreVertIcon from '@mui/icons-material/MoreVert';
@@ -69,8 +70,7 @@ export default function ClientsPage() {
 
   const fetchClients = async () => {
     try {
-      const res = await fetch(`${API_BASE}/clients/`);
-      const data = await res.json();
+      const data = await fetchAll<Client>(`${API_BASE}/clients/`);
       setClients(data);
     } catch (err) {
       console.error('Erreur lors du chargement des clients', err);
@@ -35,6 +35,7 @@ import MoreVertIcon from "@mui/icons-material/MoreVert";
 import AddIcon from "@mui/icons-material/Add";
 import PrintIcon from "@mui/icons-material/Print";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 import Swal from "sweetalert2";
 import Protected from "@/components/Protected";
 
@@ -155,8 +156,7 @@ export default function OrdersPage() {
   }, [openAddProductDialog]);
 
   const fetchOrders = () => {
-    fetch(`${API_BASE}/`)
-      .then((res) => res.json())
+    fetchAll<any>(`${API_BASE}/`)
       .then((data) => {
         const processedOrders = data.map((order: any) => ({
           ...order,
@@ -173,31 +173,33 @@ export default function OrdersPage() {
           }))
         }));
         setOrders(processedOrders);
-      });
+      })
+      .catch((err) => console.error("Failed to fetch orders", err));
   };
 
   const fetchClients = () => {
-    fetch(`${config.apiBaseUrl}/clients/`).then((res) => res.json()).then(setClients);
+    fetchAll<Client>(`${config.apiBaseUrl}/clients/`)
+      .then(setClients)
+      .catch((err) => console.error("Failed to fetch clients", err));
   };
 
   const fetchProducts = () => {
-    fetch(`${config.apiBaseUrl}/products/`).then((res) => res.json()).then((data) => {
-      const processedProducts = data.map((product: any) => ({
-        ...product,
-        prix_unit: Number(product.prix_unit),
-        tva_rate: Number(product.tva_rate)
-      }));
-      setProducts(processedProducts);
-    });
+    fetchAll<any>(`${config.apiBaseUrl}/products/`)
+      .then((data) => {
+        const processedProducts = data.map((product: any) => ({
+          ...product,
+          prix_unit: Number(product.prix_unit),
+          tva_rate: Number(product.tva_rate)
+        }));
+        setProducts(processedProducts);
+      })
+      .catch((err) => console.error("Failed to fetch products", err));
   };
 
   const fetchCategories = () => {
-    fetch(CATEGORIES_API).then((res) => {
-      if (res.ok) {
-        return res.json().then(setCategories);
-      }
-      console.error("Failed to fetch categories");
-    });
+    fetchAll<ProductCategory>(CATEGORIES_API)
+      .then(setCategories)
+      .catch(() => console.error("Failed to fetch categories"));
   };
 
   const handleMenuOpen = (event: React.MouseEvent<HTMLButtonElement>, order: Order) => {
@@ -21,6 +21,7 @@ import {
 } from "@mui/material";
 import MoreVertIcon from "@mui/icons-material/MoreVert";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 import Swal from "sweetalert2";
 import Protected from "@/components/Protected";
 
@@ -52,8 +53,7 @@ export default function EmployesPage() {
 
   const fetchEmployees = async () => {
     try {
-      const res = await fetch(API_URL);
-      const data = await res.json();
+      const data = await fetchAll<Employee>(API_URL);
       setEmployees(data);
       setFiltered(data);
     } catch (error) {
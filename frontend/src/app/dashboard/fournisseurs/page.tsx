@@ -26,6 +26,7 @@ import {
 import MoreVertIcon from "@mui/icons-material/MoreVert";
 import SearchIcon from "@mui/icons-material/Search";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 import Swal from "sweetalert2";
 import Protected from "@/components/Protected";
 
@@ -91,9 +92,7 @@ export default function FournisseursPage(): React.JSX.Element {
   const fetchFournisseurs = async () => {
     setLoading(true);
     try {
-      const res = await fetch(`${API_BASE}/fournisseurs/`);
-      if (!res.ok) throw new Error("Failed to fetch fournisseurs");
-      const data = await res.json();
+      const data = await fetchAll<Fournisseur>(`${API_BASE}/fournisseurs/`);
       setFournisseurs(data);
     } catch (error) {
       showErrorAlert("Erreur lors du chargement des fournisseurs");
@@ -29,6 +29,7 @@ import {
 import MoreVertIcon from "@mui/icons-material/MoreVert";
 import SearchIcon from "@mui/icons-material/Search";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 import Swal from "sweetalert2";
 
 type Tool = {
@@ -101,9 +102,7 @@ export default function ToolsPage(): React.JSX.Element {
   const fetchTools = async () => {
     setLoading(true);
     try {
-      const res = await fetch(`${API_BASE}/tools/`);
-      if (!res.ok) throw new Error("Failed to fetch tools");
-      const data = await res.json();
+      const data = await fetchAll<Tool>(`${API_BASE}/tools/`);
       setTools(data);
     } catch (error) {
       showErrorAlert("Erreur lors du chargement des outils");
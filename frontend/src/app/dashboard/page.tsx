@@ -5,6 +5,7 @@ import Alert from '@mui/material/Alert';
 import Box from '@mui/material/Box';
 
 import { config } from '@/config';
+import type { Page as ListPage } from '@/lib/fetch-all';
 import { Budget } from '@/components/dashboard/overview/budget';
 import { LatestOrders } from '@/components/dashboard/overview/latest-orders';
 import { LatestProducts } from '@/components/dashboard/overview/latest-products';
@@ -17,6 +18,9 @@ import Protected from '@/components/Protected';
 
 export const metadata = { title: `Overview | Dashboard | ${config.site.name}` } satisfies Metadata;
 
+const LATEST_ORDERS = 7;
+const LATEST_ARTICLES = 5;
+
 /**
  * Generic fetch that returns both data and an error (if any).
  * It does NOT substitute "nice" defaults — it returns real server values (including 0).
@@ -46,10 +50,11 @@ async function fetchData<T>(url: string): Promise<{ data: T | null; error?: stri
  */
 
 async function getOrders(): Promise<{ data: any[] | null; error?: string }> {
-  const res = await fetchData<any[]>(`${config.apiBaseUrl}/orders`);
-  if (res.data === null) return res;
+  // Only the rows shown: orders are listed newest first. Counts come from the count endpoints.
+  const res = await fetchData<ListPage<any>>(`${config.apiBaseUrl}/orders/?page_size=${LATEST_ORDERS}`);
+  if (res.data === null) return { data: null, error: res.error };
 
-  const mapped = res.data.map((order: any) => ({
+  const mapped = res.data.results.map((order: any) => ({
     id: order.reference ?? (order.id ? `ORD-${order.id}` : undefined),
     customer: { name: order.client_name ?? 'Client inconnu' },
     // keep server value even if it's 0 or "0.0"
@@ -62,10 +67,10 @@ async function getOrders(): Promise<{ data: any[] | null; error?: string }> {
 }
 
 async function getArticles(): Promise<{ data: any[] | null; error?: string }> {
-  const res = await fetchData<any[]>(`${config.apiBaseUrl}/products`);
-  if (res.data === null) return res;
+  const res = await fetchData<ListPage<any>>(`${config.apiBaseUrl}/products/?ordering=-id&page_size=${LATEST_ARTICLES}`);
+  if (res.data === null) return { data: null, error: res.error };
 
-  const mapped = res.data.map((article: any) => ({
+  const mapped = res.data.results.map((article: any) => ({
     id: article.id?.toString() ?? `ART-${Math.random().toString(36).substr(2, 9)}`,
     code: article.code ?? 'N/A',
     designation: article.name ?? 'Article sans nom',
@@ -219,8 +224,8 @@ export default async function Page(): Promise<React.JSX.Element> {
   const fournisseursData = fournisseursRes.data ?? { count: null, diff: undefined };
   const profitData = profitRes.data ?? { value: '—', raw: undefined };
 
-  const latestOrders = (orders as any[]).slice(0, 7);
-  const latestArticles = (articles as any[]).slice(0, 5);
+  const latestOrders = (orders as any[]).slice(0, LATEST_ORDERS);
+  const latestArticles = (articles as any[]).slice(0, LATEST_ARTICLES);
 
   // Format the customer count for display; show '—' when count is null to indicate missing data / error
   const formattedCustomerCount = typeof customersData.count === 'number'
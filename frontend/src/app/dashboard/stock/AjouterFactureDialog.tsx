@@ -12,6 +12,7 @@ import {
   Stack,
 } from "@mui/material";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 
 const API_BASE = config.apiBaseUrl;
 
@@ -49,8 +50,7 @@ export default function AjouterFactureDialog({ open, onClose, onFactureAdded }:
 
   const fetchFournisseurs = async () => {
     try {
-      const res = await fetch(`${API_BASE}/fournisseurs/`);
-      const data = await res.json();
+      const data = await fetchAll<Fournisseur>(`${API_BASE}/fournisseurs/`);
       setFournisseurs(data);
     } catch (error) {
       alert("Erreur lors du chargement des fournisseurs");
@@ -32,6 +32,7 @@ import { AdapterDateFns } from "@mui/x-date-pickers/AdapterDateFns";
 import { fr } from "date-fns/locale";
 import Swal from "sweetalert2";
 import { config } from "@/config";
+import { fetchAll } from "@/lib/fetch-all";
 
 const API_BASE = `${config.apiBaseUrl}/stock`;
 
@@ -47,7 +48,8 @@ type Document = {
   description: string;
   fournisseur: Fournisseur | null;
   type: "BON" | "FACTURE";
-  articles: Article[];
+  articles?: Article[];
+  article_count?: number;
 };
 
 type Article = {
@@ -132,9 +134,7 @@ export default function StockPage() {
   async function fetchData() {
     setLoading(true);
     try {
-      const res = await fetch(`${API_BASE}/documents/`);
-      if (!res.ok) throw new Error("Erreur chargement des documents");
-      const data = await res.json();
+      const data = await fetchAll<Document>(`${API_BASE}/documents/`);
       setDocuments(data);
     } catch (error) {
       console.error("Error fetching documents:", error);
@@ -150,9 +150,7 @@ export default function StockPage() {
 
   async function fetchFournisseurs() {
     try {
-      const res = await fetch(`${config.apiBaseUrl}/fournisseurs/`);
-      if (!res.ok) throw new Error("Erreur chargement fournisseurs");
-      const data = await res.json();
+      const data = await fetchAll<Fournisseur>(`${config.apiBaseUrl}/fournisseurs/`);
       setFournisseurs(data);
     } catch (error) {
       console.error("Error fetching fournisseurs:", error);
@@ -530,7 +528,7 @@ const handleSaveArticle = async () => {
                   <TableCell>{document.description || "—"}</TableCell>
                   <TableCell>{document.fournisseur?.nom || "Aucun"}</TableCell>
                   <TableCell>
-                    {document.articles?.length || 0}
+                    {document.article_count ?? document.articles?.length ?? 0}
                   </TableCell>
                   <TableCell align="right">
                     <IconButton
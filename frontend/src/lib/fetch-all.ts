@@ -0,0 +1,46 @@
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Largest page the API accepts, so a list is loaded in as few requests as possible.
+const PAGE_SIZE = '500';
+
+/**
+ * Load every page of a cursor-paginated list endpoint and return all results.
+ * Only the query string of `next` is followed, so the requests keep the scheme
+ * and host of `url` whatever the API sees behind its proxy.
+ *
+ * The API bounds each request, not what a screen loads: the pages using this
+ * still hold the whole table because they search, filter and page client-side.
+ * Counts and totals must come from the aggregate endpoints (e.g. /clients/count/,
+ * /orders/status-count/), never from the length of a list.
+ */
+export async function fetchAll<T>(url: string, init?: RequestInit): Promise<T[]> {
+  const target = new URL(url);
+  if (!target.searchParams.has('page_size')) {
+    target.searchParams.set('page_size', PAGE_SIZE);
+  }
+
+  const items: T[] = [];
+  let next: string | null = target.toString();
+  while (next) {
+    const res = await fetch(next, init);
+    if (!res.ok) {
+      throw new Error(`HTTP ${res.status} on ${url}`);
+    }
+    const data = (await res.json()) as Page<T> | T[];
+    if (Array.isArray(data)) {
+      return [...items, ...data];
+    }
+    items.push(...data.results);
+    if (data.next) {
+      target.search = new URL(data.next).search;
+      next = target.toString();
+    } else {
+      next = null;
+    }
+  }
+  return items;
+}